@@ -18,6 +18,7 @@ import subprocess
 import sys
 import tarfile
 from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from dataclasses import dataclass
 from glob import glob
@@ -71,6 +72,14 @@ PIN_PREFIX = "pin@"
 YARN_DEFAULT_REGISTRY = "https://registry.yarnpkg.com"
 
 
+# Maximal number of npm package metadata fetched at once
+METADATA_FETCH_WORKERS = 8
+
+
+# A package of the npm registry, with an optional version or range
+REGISTRY_PACKAGE = re.compile(r"^((?:@[^@/\s]+/)?[^@/\s:]+)(?:@[^/:]+)?$")
+
+
 class ProgressProcess(Process):
     def __init__(
         self,
@@ -471,6 +480,23 @@ def install_extension(
     return handler.install_extension(extension, pin=pin)
 
 
+def install_extensions(
+    extensions: list[str],
+    app_options: AppOptionsLike = None,
+    pins: list[str | None] | None = None,
+) -> bool:
+    """Install several extension packages into JupyterLab.
+
+    The registry packages are downloaded by a single `npm pack`.
+
+    Returns `True` if a rebuild is recommended, `False` otherwise.
+    """
+    app_options = _ensure_options(app_options)
+    _node_check(app_options.logger)
+    handler = _AppHandler(app_options)
+    return handler.install_extensions(extensions, pins=pins)
+
+
 def uninstall_extension(
     name: str | None = None, app_options: AppOptionsLike = None, all_: bool = False
 ) -> bool:
@@ -592,6 +618,20 @@ def disable_extension(
     return handler.toggle_extension(extension, True, level=level)
 
 
+def toggle_extensions(
+    extensions: dict[str, bool], app_options: AppOptionsLike = None, level: str = "sys_prefix"
+) -> list[str]:
+    """Enable or disable a set of JupyterLab extensions/plugins at once.
+
+    ``extensions`` maps each extension/plugin name to its requested disabled
+    state. The page config of ``level`` is written at most once.
+
+    Returns the names whose status actually changed.
+    """
+    handler = _AppHandler(app_options)
+    return handler.toggle_extensions(extensions, level=level)
+
+
 def check_extension(
     extension: str, installed: bool = False, app_options: AppOptionsLike = None
 ) -> bool:
@@ -633,6 +673,17 @@ def list_extensions(app_options: AppOptionsLike = None) -> None:
     return handler.list_extensions()
 
 
+def get_extensions_status(
+    app_options: AppOptionsLike = None, build_check: bool = False
+) -> dict[str, Any]:
+    """Get the status of the extensions as JSON-serializable data.
+
+    The build check is only run if ``build_check`` is True.
+    """
+    handler = _AppHandler(app_options)
+    return handler.get_extensions_status(build_check=build_check)
+
+
 def link_package(path: str | os.PathLike[str], app_options: AppOptionsLike = None) -> bool:
     """Link a package against the JupyterLab build.
 
@@ -667,6 +718,7 @@ def get_latest_compatible_package_versions(
 
 def read_package(target: str | os.PathLike[str]) -> dict[str, Any]:
     """Read the package data in a given target tarball."""
+    _count_metric("TARBALL_READS_TOTAL", operation="package")
     with tarfile.open(target, "r") as tar:
         package_json = tar.extractfile("package/package.json")
         if package_json is None:
@@ -686,6 +738,7 @@ def read_package(target: str | os.PathLike[str]) -> dict[str, Any]:
 class _AppHandler:
     def __init__(self, options: AppOptionsLike) -> None:
         """Create a new _AppHandler object"""
+        _count_metric("APP_HANDLER_CREATED_TOTAL")
         options = _ensure_options(options)
         self._options = options
         self.app_dir = options.app_dir
@@ -728,7 +781,6 @@ class _AppHandler:
         Returns `True` if a rebuild is recommended, `False` otherwise.
         """
         extension = _normalize_path(extension)
-        extensions = self.info["extensions"]
 
         # Check for a core extensions.
         if extension in self.info["core_extensions"]:
@@ -749,7 +801,85 @@ class _AppHandler:
         with TemporaryDirectory() as tempdir:
             info = self._install_extension(extension, tempdir, pin=pin)
 
+        self._register_extension(info)
+        return True
+
+    def install_extensions(
+        self, extensions: list[str], pins: list[str | None] | None = None
+    ) -> bool:
+        """Install several extension packages into JupyterLab.
+
+        The unpinned registry packages are downloaded by a single `npm pack`;
+        the other extensions (core extensions, local paths, pinned or other
+        sources) are installed one by one. The extensions are installed in
+        the given order.
+
+        Returns `True` if a rebuild is recommended, `False` otherwise.
+        """
+        pins = pins or []
+        targets = [
+            (extension, pins[i] if i < len(pins) else None)
+            for i, extension in enumerate(extensions)
+        ]
+        batch: dict[str, str] = {}
+        for extension, pin in targets:
+            name = self._get_registry_package_name(extension)
+            if not pin and name is not None:
+                batch.setdefault(name, extension)
+
+        should_rebuild = False
+        with TemporaryDirectory() as tempdir:
+            packed = self._pack_packages(list(batch.values()), tempdir) if batch else {}
+            invalid = set(batch.values()) - set(packed)
+            if packed:
+                self._ensure_app_dirs()
+            for extension, pin in targets:
+                info = packed.pop(extension, None)
+                if info is not None:
+                    self._register_extension(self._install_extracted_package(extension, info))
+                    should_rebuild = True
+                elif extension in invalid:
+                    msg = f'"{extension}" is not a valid npm package'
+                    raise ValueError(msg)
+                else:
+                    should_rebuild = self.install_extension(extension, pin=pin) or should_rebuild
+        return should_rebuild
+
+    def _install_packages(self, specs: list[str], skip_invalid: bool = False) -> bool:
+        """Install registry packages downloaded by a single `npm pack`.
+
+        If `skip_invalid` is True, the packages that are not compatible
+        extensions are skipped with a warning instead of raising an error.
+
+        Returns `True` if a rebuild is recommended, `False` otherwise.
+        """
+        if not specs:
+            return False
+
+        self._ensure_app_dirs()
+        should_rebuild = False
+        with TemporaryDirectory() as tempdir:
+            packed = self._pack_packages(specs, tempdir)
+            for spec in specs:
+                try:
+                    if spec not in packed:
+                        msg = f'"{spec}" is not a valid npm package'
+                        raise ValueError(msg)
+                    installed = self._install_extracted_package(spec, packed[spec])
+                except ValueError:
+                    if not skip_invalid:
+                        raise
+                    name = self._get_registry_package_name(spec) or spec
+                    self.logger.warning(f"No compatible version found for {name}!")
+                    continue
+                self._register_extension(installed)
+                should_rebuild = True
+        return should_rebuild
+
+    def _register_extension(self, info: dict[str, Any]) -> None:
+        """Record an installed extension package in the app directory."""
         name = info["name"]
+        extensions = self.info["extensions"]
 
         # Local directories get name mangled and stored in metadata.
         if info["is_dir"]:
@@ -764,8 +894,6 @@ class _AppHandler:
             if other["path"] != info["path"] and other["location"] == "app":
                 os.remove(other["path"])
 
-        return True
-
     def build(
         self,
         name: str | None = None,
@@ -911,6 +1039,71 @@ class _AppHandler:
             for item in messages:
                 logger.info(f"    {item}")
 
+    def get_extensions_status(self, build_check: bool = False) -> dict[str, Any]:
+        """Get the status of the extensions as JSON-serializable data.
+
+        Unlike :meth:`list_extensions`, nothing is logged and the build check is
+        only run if ``build_check`` is True; the status then has a ``build``
+        entry with whether a build is recommended and why.
+        """
+        self._ensure_disabled_info()
+        info = self.info
+        compat_errors = self._get_extension_compat()
+
+        def get_status(name: str, data: dict[str, Any], source: str, location: str) -> dict:
+            lock_status = _is_locked(name, info["locked"])
+            return {
+                "name": name,
+                "version": data["version"],
+                "description": data["description"],
+                "source": source,
+                "location": location,
+                "install": data.get("install"),
+                "is_local": data["is_local"],
+                "enabled": not _is_disabled(name, info["disabled"]),
+                "disabled_plugins": sorted(
+                    key
+                    for key, value in info["disabled"].items()
+                    if value and key.partition(":")[0] == name and key != name
+                ),
+                "locked": lock_status.entire_extension_locked,
+                "locked_plugins": sorted(lock_status.locked_plugins or []),
+                "compat_errors": [
+                    {"package": package, "jupyterlab": core, "extension": requirement}
+                    for package, core, requirement in compat_errors[name]
+                ],
+            }
+
+        extensions = [
+            get_status(name, data, "prebuilt", data["ext_path"])
+            for name, data in info["federated_extensions"].items()
+        ]
+        extensions.extend(
+            get_status(name, data, "source", data["path"])
+            for name, data in info["extensions"].items()
+        )
+
+        all_exts = (
+            list(info["federated_extensions"])
+            + list(info["extensions"])
+            + list(info["core_extensions"])
+        )
+        status = {
+            "version": info["version"],
+            "app_dir": self.app_dir,
+            "extensions": extensions,
+            "local_extensions": dict(info["local_extensions"]),
+            "linked_packages": {
+                key: value["source"] for key, value in info["linked_packages"].items()
+            },
+            "uninstalled_core": sorted(info["uninstalled_core"]),
+            "disabled": sorted(i for i in info["disabled"] if i.partition(":")[0] in all_exts),
+        }
+        if build_check:
+            messages = self.build_check(fast=True)
+            status["build"] = {"needed": bool(messages), "messages": messages}
+        return status
+
     def build_check(self, fast: bool | None = None) -> list[str]:  # noqa
         """Determine whether JupyterLab should be built.
 
@@ -1063,16 +1256,31 @@ class _AppHandler:
     def update_all_extensions(self) -> bool:
         """Update all non-local extensions.
 
+        The latest compatible versions are resolved concurrently and the
+        updates are downloaded by a single `npm pack`.
+
         Returns `True` if a rebuild is recommended, `False` otherwise.
         """
-        should_rebuild = False
-        for extname in self.info["extensions"]:
+        names = []
+        for extname, data in self.info["extensions"].items():
             if extname in self.info["local_extensions"]:
                 continue
-            updated = self._update_extension(extname)
-            # Rebuild if at least one update happens:
-            should_rebuild = should_rebuild or updated
-        return should_rebuild
+            if data["alias_package_source"]:
+                self.logger.warning(f"Skipping updating pinned extension '{extname}'.")
+                continue
+            names.append(extname)
+
+        specs = []
+        for name, latest in self._resolve_latest_compatible_versions(names).items():
+            if latest is None:
+                self.logger.warning(f"No compatible version found for {name}!")
+            elif latest == self.info["extensions"][name]["version"]:
+                self.logger.info(f"Extension {name!r} already up to date")
+            else:
+                self.logger.info(f"Updating {name} to version {latest}")
+                specs.append(f"{name}@{latest}")
+
+        return self._install_packages(specs, skip_invalid=True)
 
     def update_extension(self, name: str | None) -> bool:
         """Update an extension by name.
@@ -1198,18 +1406,32 @@ class _AppHandler:
 
         Returns `True` if a rebuild is recommended, `False` otherwise.
         """
+        return extension in self.toggle_extensions({extension: value}, level=level)
+
+    def toggle_extensions(
+        self, extensions: dict[str, bool], level: str = "sys_prefix"
+    ) -> list[str]:
+        """Enable or disable a set of lab extensions.
+
+        The static page config is read once per level and the page config of
+        ``level`` is written at most once, whatever the number of extensions.
+
+        Returns the list of extensions whose status changed.
+        """
         app_settings_dir = osp.join(self.app_dir, "settings")
 
-        # If extension is locked at a higher level, we don't toggle it.
+        # If an extension is locked at a higher level, we don't toggle it.
         # The highest level at which an extension can be locked is system,
         # so we do not need to check levels above that one.
+        locked = {}
         if level != "system":
             allowed = get_allowed_levels()
-            if self._is_extension_locked(
-                extension, level=allowed[allowed.index(level) + 1], include_higher_levels=True
-            ):
-                self.logger.info("Extension locked at a higher level, cannot toggle status")
-                return False
+            locked = get_static_page_config(
+                app_settings_dir=app_settings_dir,
+                logger=self.logger,
+                level=allowed[allowed.index(level) + 1],
+                include_higher_levels=True,
+            ).get("lockedExtensions", {})
 
         complete_page_config = get_static_page_config(
             app_settings_dir=app_settings_dir, logger=self.logger, level="all"
@@ -1221,20 +1443,27 @@ class _AppHandler:
 
         disabled = complete_page_config.get("disabledExtensions", {})
         disabled_at_level = level_page_config.get("disabledExtensions", {})
-        did_something = False
-        is_disabled = disabled.get(extension, False)
+        changed = []
+
+        for extension, value in extensions.items():
+            if locked.get(extension, False):
+                self.logger.info(
+                    f"Extension {extension} locked at a higher level, cannot toggle status"
+                )
+                continue
 
-        if value and not is_disabled:
-            disabled_at_level[extension] = True
-            did_something = True
-        elif not value and is_disabled:
-            disabled_at_level[extension] = False
-            did_something = True
+            is_disabled = disabled.get(extension, False)
+            if value and not is_disabled:
+                disabled_at_level[extension] = True
+                changed.append(extension)
+            elif not value and is_disabled:
+                disabled_at_level[extension] = False
+                changed.append(extension)
 
-        if did_something:
+        if changed:
             level_page_config["disabledExtensions"] = disabled_at_level
             write_page_config(level_page_config, level=level)
-        return did_something
+        return changed
 
     def _maybe_mirror_disabled_in_locked(
         self,
@@ -1969,6 +2198,10 @@ class _AppHandler:
     ) -> dict[str, Any]:
         """Install an extension with validation and return the name and path."""
         info = self._extract_package(extension, tempdir, pin=pin)
+        return self._install_extracted_package(extension, info)
+
+    def _install_extracted_package(self, extension: str, info: dict[str, Any]) -> dict[str, Any]:
+        """Validate an extracted extension package and move it to the app directory."""
         data = info["data"]
 
         # Check for compatible version unless:
@@ -2069,13 +2302,61 @@ class _AppHandler:
 
         return info
 
-    def _latest_compatible_package_version(self, name: str) -> str | None:
-        """Get the latest compatible version of a package"""
-        core_data = self.info["core_data"]
-        try:
-            metadata = _fetch_package_metadata(self.registry, name, self.logger)
-        except URLError:
+    def _pack_packages(self, specs: list[str], tempdir: str) -> dict[str, dict[str, Any]]:
+        """Call `npm pack` once for several registry packages.
+
+        The packages must have different names. If the single `npm pack` fails,
+        e.g. for an invalid package, the packages are packed one by one.
+
+        Returns the package info per spec, like `_extract_package`; the specs
+        that could not be packed are missing.
+        """
+        ret = self._run([which("npm"), "pack", *specs], cwd=tempdir)
+        if ret != 0:
+            self.logger.warning("Failed to pack the packages at once; packing them one by one.")
+            infos = {}
+            for i, spec in enumerate(specs):
+                # Ignore the tarballs packed by the failed call
+                spec_dir = pjoin(tempdir, str(i))
+                os.mkdir(spec_dir)
+                try:
+                    infos[spec] = self._extract_package(spec, spec_dir)
+                except ValueError:
+                    continue
+            return infos
+
+        packed = {}
+        for path in glob(pjoin(tempdir, "*.tgz")):
+            data = read_package(path)
+            packed[data["name"]] = (path, data)
+
+        infos = {}
+        for spec in specs:
+            name = self._get_registry_package_name(spec)
+            if name not in packed:
+                continue
+            path, data = packed[name]
+            infos[spec] = {
+                "source": spec,
+                "is_dir": False,
+                "data": data,
+                "path": path,
+                "filename": osp.basename(path),
+                "name": data["name"],
+                "version": data["version"],
+            }
+        return infos
+
+    def _get_registry_package_name(self, extension: str) -> str | None:
+        """Get the name of a registry package, or None for other sources."""
+        if extension in self.info["core_extensions"] or osp.exists(extension):
             return None
+        match = REGISTRY_PACKAGE.match(extension)
+        return match.group(1) if match else None
+
+    def _latest_compatible_version(self, name: str, metadata: dict[str, Any]) -> str | None:
+        """Get the latest compatible and not deprecated version in package metadata"""
+        core_data = self.info["core_data"]
         versions = metadata.get("versions", {})
 
         # Sort pre-release first, as we will reverse the sort:
@@ -2093,67 +2374,68 @@ class _AppHandler:
                         f"Disregarding compatible version of package as it is deprecated: {name}@{version}"
                     )
                     continue
-                # Verify that the version is a valid extension.
-                with TemporaryDirectory() as tempdir:
-                    info = self._extract_package(f"{name}@{version}", tempdir)
-                if _validate_extension(info["data"]):
-                    # Invalid, do not consider other versions
-                    return None
-                # Valid
                 return version
 
         return None
 
-    def latest_compatible_package_versions(self, names: list[str]) -> dict[str, str]:
-        """Get the latest compatible versions of several packages
+    def _resolve_latest_compatible_versions(self, names: list[str]) -> dict[str, str | None]:
+        """Get the latest compatible versions of packages from their metadata fetched concurrently.
 
-        Like _latest_compatible_package_version, but optimized for
-        retrieving the latest version for several packages in one go.
+        The versions are not verified to be valid extensions.
         """
-        core_data = self.info["core_data"]
 
-        keys = []
-        for name in names:
+        def resolve(name: str) -> str | None:
             try:
                 metadata = _fetch_package_metadata(self.registry, name, self.logger)
             except URLError:
-                continue
-            versions = metadata.get("versions", {})
+                return None
+            return self._latest_compatible_version(name, metadata)
 
-            # Sort pre-release first, as we will reverse the sort:
-            def sort_key(key_value: tuple[str, dict[str, Any]]) -> tuple[Any, ...]:
-                return _semver_key(key_value[0], prerelease_first=True)
+        if not names:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(METADATA_FETCH_WORKERS, len(names))) as executor:
+            return dict(zip(names, executor.map(resolve, names), strict=True))
 
-            for version, data in sorted(versions.items(), key=sort_key, reverse=True):
-                # skip deprecated versions
-                if "deprecated" in data:
-                    continue
+    def _latest_compatible_package_version(self, name: str) -> str | None:
+        """Get the latest compatible version of a package"""
+        try:
+            metadata = _fetch_package_metadata(self.registry, name, self.logger)
+        except URLError:
+            return None
+        version = self._latest_compatible_version(name, metadata)
+        if version is None:
+            return None
+
+        # Verify that the version is a valid extension.
+        with TemporaryDirectory() as tempdir:
+            info = self._extract_package(f"{name}@{version}", tempdir)
+        if _validate_extension(info["data"]):
+            # Invalid, do not consider other versions
+            return None
+        # Valid
+        return version
 
-                deps = data.get("dependencies", {})
-                errors = _validate_compatibility(name, deps, core_data)
-                if not errors:
-                    # Found a compatible version
-                    keys.append(f"{name}@{version}")
-                    break  # break inner for
+    def latest_compatible_package_versions(self, names: list[str]) -> dict[str, str]:
+        """Get the latest compatible versions of several packages
+
+        Like _latest_compatible_package_version, but optimized for
+        retrieving the latest version for several packages in one go.
+        """
+        keys = [
+            f"{name}@{version}"
+            for name, version in self._resolve_latest_compatible_versions(names).items()
+            if version is not None
+        ]
 
         versions = {}
         if not keys:
             return versions
         with TemporaryDirectory() as tempdir:
-            ret = self._run([which("npm"), "pack", *keys], cwd=tempdir)
-            if ret != 0:
-                msg = f'"{keys}" is not a valid npm package'
-                raise ValueError(msg)
-
-            for key in keys:
-                fname = (
-                    key[0].replace("@", "") + key[1:].replace("@", "-").replace("/", "-") + ".tgz"
-                )
-                data = read_package(osp.join(tempdir, fname))
+            for info in self._pack_packages(keys, tempdir).values():
                 # Verify that the version is a valid extension.
-                if not _validate_extension(data):
+                if not _validate_extension(info["data"]):
                     # Valid
-                    versions[data["name"]] = data["version"]
+                    versions[info["name"]] = info["version"]
         return versions
 
     def _format_no_compatible_package_version(self, name: str) -> str:
@@ -2380,6 +2662,23 @@ def _validate_extension(data: dict[str, Any]) -> list[str]:  # noqa: PLR0912
     return messages
 
 
+def _count_metric(name: str, **labels: str) -> None:
+    """Increment a JupyterLab metrics counter.
+
+    The counters are only incremented once the metrics are loaded by the server;
+    the command line applications do not import nor register them.
+
+    Args:
+        name: Counter name in :mod:`jupyterlab.metrics`
+        **labels: Counter labels
+    """
+    metrics = sys.modules.get("jupyterlab.metrics")
+    if metrics is None:
+        return
+    counter = getattr(metrics, name)
+    (counter.labels(**labels) if labels else counter).inc()
+
+
 def _tarsum(input_file: str | os.PathLike[str]) -> str:
     """
     Compute the recursive sha sum of a tar file.
@@ -2387,6 +2686,7 @@ def _tarsum(input_file: str | os.PathLike[str]) -> str:
     chunk_size = 100 * 1024
     h = hashlib.new("sha1")  # noqa: S324
 
+    _count_metric("TARBALL_READS_TOTAL", operation="checksum")
     with tarfile.open(input_file, "r") as tar:
         for member in tar:
             if not member.isfile():
@@ -7,9 +7,15 @@ from importlib.metadata import entry_points
 
 from traitlets.config import Configurable
 
-from .manager import ActionResult, ExtensionManager, ExtensionPackage  # noqa: F401
+from .manager import (  # noqa: F401
+    ActionResult,
+    BatchActionResult,
+    ExtensionManager,
+    ExtensionPackage,
+)
 from .pypi import PyPIExtensionManager
 from .readonly import ReadOnlyExtensionManager
+from .wheelhouse import WheelhouseExtensionManager
 
 # Supported third-party services
 MANAGERS = {}
@@ -37,3 +43,12 @@ def get_pypi_manager(
 ) -> ExtensionManager:
     """PyPi Extension Manager factory"""
     return PyPIExtensionManager(app_options, ext_options, parent)
+
+
+def get_wheelhouse_manager(
+    app_options: dict | None = None,
+    ext_options: dict | None = None,
+    parent: Configurable | None = None,
+) -> ExtensionManager:
+    """Wheelhouse Extension Manager factory"""
+    return WheelhouseExtensionManager(app_options, ext_options, parent)
@@ -0,0 +1,130 @@
+"""Bounded executor to run blocking operations off the event loop."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, TypeVar
+
+R = TypeVar("R")
+
+
+@dataclass(frozen=True)
+class ExecutorMetrics:
+    """Executor metrics snapshot.
+
+    Attributes:
+        max_workers: Maximal number of operations executed concurrently
+        queued: Number of operations waiting for a worker
+        running: Number of operations being executed
+        completed: Number of operations that succeeded
+        failed: Number of operations that raised an exception
+        total_time: Cumulated execution time in seconds
+        max_time: Longest execution time in seconds
+    """
+
+    max_workers: int
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+class BoundedExecutor:
+    """Thread pool with a fixed number of workers and usage metrics.
+
+    Blocking operations awaited through :ref:`run` are executed on the
+    dedicated worker threads, never on the event loop.
+
+    Args:
+        max_workers: Maximal number of operations executed concurrently
+        thread_name_prefix: Prefix of the worker thread names
+    """
+
+    def __init__(self, max_workers: int = 1, thread_name_prefix: str = "jupyterlab") -> None:
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_time = 0.0
+        self._max_time = 0.0
+
+    @property
+    def metrics(self) -> ExecutorMetrics:
+        """Snapshot of the executor metrics."""
+        with self._lock:
+            return ExecutorMetrics(
+                max_workers=self.max_workers,
+                queued=self._queued,
+                running=self._running,
+                completed=self._completed,
+                failed=self._failed,
+                total_time=self._total_time,
+                max_time=self._max_time,
+            )
+
+    async def run(self, fn: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """Execute ``fn(*args, **kwargs)`` on a worker thread.
+
+        Args:
+            fn: Blocking function to execute
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+        Returns:
+            The function result
+        """
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(self._execute, partial(fn, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting new operations."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            # The operation never reached a worker
+            with self._lock:
+                self._queued -= 1
+
+    def _execute(self, fn: Callable[[], R]) -> R:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        start = time.perf_counter()
+        failed = False
+        try:
+            return fn()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._total_time += elapsed
+                self._max_time = max(self._max_time, elapsed)
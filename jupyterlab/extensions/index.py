@@ -0,0 +1,311 @@
+"""Sources of the index of available extensions."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import json
+import logging
+import re
+import time
+import xmlrpc.client
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import httpx
+
+from jupyterlab.extensions.ratelimit import RateLimiter
+from jupyterlab.metrics import PYPI_REQUEST_DURATION_SECONDS, PYPI_THROTTLED_TOTAL
+
+PREBUILT_CLASSIFIER = "Framework :: Jupyter :: JupyterLab :: Extensions :: Prebuilt"
+"""PyPI classifier of the prebuilt JupyterLab extensions"""
+
+
+@dataclass
+class IndexSnapshot:
+    """Extensions index snapshot.
+
+    Attributes:
+        projects: Latest version per project name
+        etag: [optional] Entity tag of the index document
+        last_modified: [optional] Last modification date of the index document
+    """
+
+    projects: dict[str, str] = field(default_factory=dict)
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class IndexSource:
+    """Source of the index of available extensions.
+
+    Sources are polled by the extension manager; they must return the previous
+    snapshot object when the index did not change so that nothing is re-indexed.
+
+    Attributes:
+        location: Index location, used as key to persist the index
+    """
+
+    location: str = ""
+
+    async def fetch(self, previous: IndexSnapshot | None) -> IndexSnapshot:
+        """Fetch the index.
+
+        Args:
+            previous: The previous snapshot returned by the source if any
+        Returns:
+            The index snapshot; ``previous`` if unchanged
+        """
+        raise NotImplementedError
+
+
+def _parse_projects(data: Any) -> dict[str, str]:  # noqa: ANN401
+    """Parse the projects of an index document.
+
+    The document is either ``{"projects": {name: version}}``, a mapping
+    ``{name: version}`` or a list of ``[name, version]`` pairs in which the
+    last pair of a project is its latest version.
+    """
+    if isinstance(data, dict):
+        data = data.get("projects", data)
+    if isinstance(data, dict):
+        return {str(name): str(version) for name, version in data.items()}
+    if isinstance(data, list):
+        return {str(name): str(version) for name, version in data}
+    msg = "Invalid extensions index document."
+    raise ValueError(msg)
+
+
+def _unchanged(previous: IndexSnapshot | None, snapshot: IndexSnapshot) -> IndexSnapshot:
+    """Return the previous snapshot if it has the same projects."""
+    if previous is not None and previous.projects == snapshot.projects:
+        return previous
+    return snapshot
+
+
+async def _conditional_get(
+    client: httpx.AsyncClient,
+    url: str,
+    etag: str | None,
+    last_modified: str | None,
+    headers: dict[str, str] | None = None,
+) -> httpx.Response | None:
+    """Request an URL if it was modified.
+
+    Args:
+        client: HTTP client
+        url: URL to request
+        etag: [optional] Entity tag of the known content
+        last_modified: [optional] Last modification date of the known content
+        headers: [optional] Additional request headers
+    Returns:
+        The response; None if the content was not modified
+    Raises:
+        httpx.HTTPStatusError: If the request failed
+    """
+    headers = dict(headers or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = await client.get(url, headers=headers)
+    if response.status_code == 304:  # noqa PLR2004
+        return None
+    response.raise_for_status()
+    return response
+
+
+class JSONIndexSource(IndexSource):
+    """Index stored in a JSON document.
+
+    The document is either served over HTTP(S), in which case it is requested
+    with ``If-None-Match`` and ``If-Modified-Since`` headers, or a local file,
+    in which case it is only read if its modification time changed. It is
+    meant for mirrors, air-gapped deployments and tests.
+
+    Args:
+        location: URL or path of the JSON document
+        client: HTTP client
+    """
+
+    def __init__(self, location: str, client: httpx.AsyncClient) -> None:
+        self.location = location
+        self._client = client
+
+    async def fetch(self, previous: IndexSnapshot | None) -> IndexSnapshot:
+        """Fetch the index.
+
+        Args:
+            previous: The previous snapshot returned by the source if any
+        Returns:
+            The index snapshot; ``previous`` if unchanged
+        """
+        parsed = urlparse(self.location)
+        if parsed.scheme in ("http", "https"):
+            return await self._fetch_url(previous)
+
+        path = Path(url2pathname(parsed.path) if parsed.scheme == "file" else self.location)
+        return await asyncio.to_thread(self._read_file, path, previous)
+
+    async def _fetch_url(self, previous: IndexSnapshot | None) -> IndexSnapshot:
+        response = await _conditional_get(
+            self._client,
+            self.location,
+            previous.etag if previous else None,
+            previous.last_modified if previous else None,
+            headers={"Accept": "application/json"},
+        )
+        if response is None:
+            return previous
+        snapshot = IndexSnapshot(
+            _parse_projects(json.loads(response.content)),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return _unchanged(previous, snapshot)
+
+    def _read_file(self, path: Path, previous: IndexSnapshot | None) -> IndexSnapshot:
+        modified = str(path.stat().st_mtime_ns)
+        if previous is not None and previous.last_modified == modified:
+            return previous
+        snapshot = IndexSnapshot(
+            _parse_projects(json.loads(path.read_text(encoding="utf-8"))),
+            last_modified=modified,
+        )
+        return _unchanged(previous, snapshot)
+
+
+class PyPIIndexSource(IndexSource):
+    """Index of the prebuilt extensions published on PyPI.
+
+    PyPI has no JSON endpoint filtering projects by classifier, so the projects
+    tagged with the prebuilt extension classifier are discovered with the XML-RPC
+    ``browse`` method, retried once when throttled. Additional projects, like the
+    language packs, are not tagged with the classifier; their latest version is
+    requested from the JSON API with conditional requests, so unchanged projects
+    cost a ``304 Not Modified`` response.
+
+    Args:
+        base_url: PyPI JSON API base URL
+        client: HTTP client
+        rpc_client: XML-RPC client of the PyPI API
+        extra_projects: Projects to add to the classifier ones
+        throttling: Throttling factor applied to the delay requested by PyPI
+        logger: Logger
+        rate_limiter: [optional] Rate limiter of the XML-RPC requests; the HTTP
+            requests are limited by the client
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        client: httpx.AsyncClient,
+        rpc_client: xmlrpc.client.ServerProxy,
+        extra_projects: Iterable[str] = (),
+        throttling: float = 1.0,
+        logger: logging.Logger | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        self.location = base_url
+        self._client = client
+        self._rpc_client = rpc_client
+        self.extra_projects = tuple(extra_projects)
+        self.throttling = throttling
+        self.log = logger or logging.getLogger(__name__)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Validators and latest version of the extra projects
+        self._validators: dict[str, tuple[str | None, str | None, str]] = {}
+
+    async def fetch(self, previous: IndexSnapshot | None) -> IndexSnapshot:
+        """Fetch the index.
+
+        Args:
+            previous: The previous snapshot returned by the source if any
+        Returns:
+            The index snapshot; ``previous`` if unchanged
+        """
+        self.log.debug("Requesting PyPI.org RPC API for prebuilt JupyterLab extensions.")
+        projects = _parse_projects(
+            await self._throttle_request(self._rpc_client.browse, [PREBUILT_CLASSIFIER])
+        )
+
+        extra_projects = [name for name in self.extra_projects if name not in projects]
+        versions = await asyncio.gather(
+            *(self._get_latest_version(name) for name in extra_projects),
+            return_exceptions=True,
+        )
+        for name, version in zip(extra_projects, versions, strict=True):
+            if isinstance(version, Exception):
+                self.log.info("Failed to fetch latest version for %s: %s", name, version)
+            elif version is not None:
+                projects[name] = version
+
+        return _unchanged(previous, IndexSnapshot(projects))
+
+    async def _get_latest_version(self, name: str) -> str | None:
+        etag, last_modified, version = self._validators.get(name, (None, None, None))
+        response = await _conditional_get(
+            self._client,
+            f"{self.location}/{name}/json",
+            etag,
+            last_modified,
+            headers={"Accept": "application/json"},
+        )
+        if response is None:
+            return version
+
+        version = json.loads(response.content).get("info", {}).get("version") or None
+        if version is not None:
+            self._validators[name] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                version,
+            )
+        return version
+
+    async def _throttle_request(self, fn: Callable, *args: Any) -> Any:  # noqa: ANN401
+        """Call a XML-RPC API method through the rate limiter.
+
+        The call is retried once if PyPI throttles it; the rate limiter then
+        pauses all the requests for the delay requested by PyPI.
+
+        Args:
+            fn: API method to call
+            *args: API method arguments
+        Returns:
+            Result of the method
+        Raises:
+            xmlrpc.client.Fault
+        """
+        current_loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            await self.rate_limiter.acquire()
+            start = time.monotonic()
+            try:
+                data = await current_loop.run_in_executor(None, fn, *args)
+            except xmlrpc.client.Fault as err:
+                throttled = err.faultCode == -32500 and err.faultString.startswith(  # noqa PLR2004
+                    "HTTPTooManyRequests:"
+                )
+                if throttled:
+                    PYPI_THROTTLED_TOTAL.labels(manager="PyPI", api="xmlrpc").inc()
+                if attempt > 0 or not throttled:
+                    raise
+                delay = 1.01
+                match = re.search(r"Limit may reset in (\d+) seconds.", err.faultString)
+                if match is not None:
+                    delay = int(match.group(1) or "1")
+                self.log.info(
+                    f"HTTPTooManyRequests - Perform next call to PyPI XMLRPC API in {delay}s."
+                )
+                self.rate_limiter.throttled(delay * self.throttling + 0.01)
+            else:
+                PYPI_REQUEST_DURATION_SECONDS.labels(manager="PyPI", api="xmlrpc").observe(
+                    time.monotonic() - start
+                )
+                self.rate_limiter.succeeded()
+                return data
@@ -0,0 +1,152 @@
+"""Python package installers used by the extension managers."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import logging
+import shutil
+import sys
+from subprocess import CompletedProcess
+
+
+class Installer:
+    """Python package installer of the running environment.
+
+    Installers only build the command lines; the extension manager runs them.
+
+    Attributes:
+        name: Installer name
+    """
+
+    name: str = ""
+
+    def install_command(
+        self, requirements: list[str], constraint: str, options: list[str] | None = None
+    ) -> list[str]:
+        """Get the command line installing requirements.
+
+        Args:
+            requirements: Requirements to install
+            constraint: Path of the constraint file
+            options: [optional] Additional install options, e.g. the packages source
+        Returns:
+            The command line
+        """
+        raise NotImplementedError
+
+    def uninstall_command(self, packages: list[str]) -> list[str]:
+        """Get the command line uninstalling packages without prompting.
+
+        Args:
+            packages: Names of the packages to uninstall
+        Returns:
+            The command line
+        """
+        raise NotImplementedError
+
+    def error_message(self, result: CompletedProcess) -> str:
+        """Get the error message of a failed command.
+
+        Args:
+            result: The completed command
+        Returns:
+            The message to display to the user
+        """
+        return result.stderr.decode("utf-8")
+
+
+class PipInstaller(Installer):
+    """pip installer running in the server Python interpreter."""
+
+    name = "pip"
+
+    def install_command(
+        self, requirements: list[str], constraint: str, options: list[str] | None = None
+    ) -> list[str]:
+        return [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--no-input",
+            "--progress-bar",
+            "off",
+            "--constraint",
+            constraint,
+            *(options or []),
+            *requirements,
+        ]
+
+    def uninstall_command(self, packages: list[str]) -> list[str]:
+        return [sys.executable, "-m", "pip", "uninstall", "--yes", "--no-input", *packages]
+
+
+class UvInstaller(Installer):
+    """``uv pip`` installer targeting the server Python interpreter.
+
+    Args:
+        executable: Path of the uv executable
+    """
+
+    name = "uv"
+
+    def __init__(self, executable: str) -> None:
+        self.executable = executable
+
+    @staticmethod
+    def find() -> str | None:
+        """Find the uv executable, either installed as Python package or on the PATH."""
+        try:
+            from uv import find_uv_bin  # noqa: PLC0415
+
+            return find_uv_bin()
+        except (ImportError, FileNotFoundError):
+            return shutil.which("uv")
+
+    def install_command(
+        self, requirements: list[str], constraint: str, options: list[str] | None = None
+    ) -> list[str]:
+        return [
+            self.executable,
+            "pip",
+            "install",
+            "--no-progress",
+            "--python",
+            sys.executable,
+            "--constraint",
+            constraint,
+            *(options or []),
+            *requirements,
+        ]
+
+    def uninstall_command(self, packages: list[str]) -> list[str]:
+        return [self.executable, "pip", "uninstall", "--python", sys.executable, *packages]
+
+    def error_message(self, result: CompletedProcess) -> str:
+        # uv also reports its progress on stderr; keep the error
+        lines = result.stderr.decode("utf-8").splitlines(keepends=True)
+        for index, line in enumerate(lines):
+            if line.lstrip().startswith(("error:", "\u00d7")):
+                return "".join(lines[index:])
+        return "".join(lines)
+
+
+def get_installer(name: str = "pip", logger: logging.Logger | None = None) -> Installer:
+    """Get an installer.
+
+    Args:
+        name: Installer name - ["pip", "uv", "auto"]; "auto" uses uv if it is
+            available and pip otherwise
+        logger: [optional] Logger
+    Returns:
+        The installer; pip if uv is requested but not found
+    """
+    if name in ("uv", "auto"):
+        executable = UvInstaller.find()
+        if executable is not None:
+            return UvInstaller(executable)
+        if name == "uv":
+            (logger or logging.getLogger(__name__)).warning(
+                "uv executable not found; falling back to pip to install extensions."
+            )
+    return PipInstaller()
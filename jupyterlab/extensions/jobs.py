@@ -0,0 +1,135 @@
+"""Background jobs installing or uninstalling extensions."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import dataclasses
+import time
+import uuid
+from collections.abc import AsyncIterator, Coroutine
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from jupyterlab.extensions.manager import ActionResult
+
+FINAL_PHASES = frozenset(("completed", "failed", "cancelled"))
+"""Phases of a finished job"""
+
+current_job: ContextVar["ExtensionJob | None"] = ContextVar("current_job", default=None)
+"""Job being executed in the current context.
+
+Extension managers use it to report the output of the package manager.
+"""
+
+
+class ExtensionJob:
+    """Job performing an action on an extension.
+
+    The job goes through the phases ``queued``, then ``installing`` or
+    ``uninstalling``, and finishes as ``completed``, ``failed`` or ``cancelled``.
+    Its phase changes and output lines are recorded as events that clients
+    can follow.
+
+    Args:
+        action: Action to perform - ["install", "uninstall"]
+        name: Extension name
+        version: [optional] Extension version to install
+
+    Attributes:
+        id: Job identifier
+        phase: Current phase
+        result: Action result once the job is finished
+        events: Phase changes ``{"type": "phase", "phase": ...}`` and output lines
+            ``{"type": "output", "line": ...}``
+    """
+
+    def __init__(self, action: str, name: str, version: str | None = None) -> None:
+        self.id = uuid.uuid4().hex
+        self.action = action
+        self.name = name
+        self.version = version
+        self.created = time.time()
+        self.phase = "queued"
+        self.result: ActionResult | None = None
+        self.events: list[dict[str, str]] = [{"type": "phase", "phase": "queued"}]
+        self._task: asyncio.Task | None = None
+        self._updated = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        """Whether the job is finished."""
+        return self.phase in FINAL_PHASES
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the job status."""
+        return {
+            "id": self.id,
+            "action": self.action,
+            "name": self.name,
+            "version": self.version,
+            "created": self.created,
+            "phase": self.phase,
+            "result": None if self.result is None else dataclasses.asdict(self.result),
+        }
+
+    def start(self, coroutine: Coroutine) -> None:
+        """Execute the job action in a task.
+
+        Args:
+            coroutine: Coroutine performing the action and finishing the job
+        """
+        self._task = asyncio.ensure_future(coroutine)
+
+    def cancel(self) -> bool:
+        """Cancel the job.
+
+        Returns:
+            Whether the job was running and has been cancelled
+        """
+        if self.done or self._task is None:
+            return False
+        return self._task.cancel()
+
+    def set_phase(self, phase: str) -> None:
+        """Change the job phase."""
+        self.phase = phase
+        self._emit({"type": "phase", "phase": phase})
+
+    def output(self, line: str) -> None:
+        """Record an output line of the action."""
+        self._emit({"type": "output", "line": line})
+
+    def finish(self, result: "ActionResult", phase: str | None = None) -> None:
+        """Finish the job.
+
+        Args:
+            result: Action result
+            phase: [optional] Final phase; default to ``failed`` for an error
+                result and ``completed`` otherwise
+        """
+        self.result = result
+        self.set_phase(phase or ("failed" if result.status == "error" else "completed"))
+
+    async def follow(self, start: int = 0) -> AsyncIterator[dict[str, str]]:
+        """Iterate over the job events until it is finished.
+
+        Args:
+            start: Index of the first event
+        Returns:
+            The job events
+        """
+        index = max(0, start)
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await self._updated.wait()
+
+    def _emit(self, event: dict[str, str]) -> None:
+        self.events.append(event)
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
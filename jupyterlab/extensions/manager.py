@@ -3,32 +3,39 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import asyncio
+import fnmatch
+import hashlib
 import json
+import logging
 import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field, fields, replace
+from functools import cached_property
 from pathlib import Path
 
 import tornado
 from jupyterlab_server.translation_utils import translator
-from traitlets import Enum
+from traitlets import CFloat, CInt, Enum
 from traitlets.config import Configurable, LoggingConfigurable
 
 from jupyterlab.commands import (
     AppOptions,
     _AppHandler,
     _ensure_options,
-    disable_extension,
-    enable_extension,
-    get_app_info,
+    toggle_extensions,
 )
+from jupyterlab.extensions.executor import BoundedExecutor
+from jupyterlab.extensions.jobs import ExtensionJob, current_job
+from jupyterlab.extensions.ratelimit import Priority, request_priority
+from jupyterlab.extensions.singleflight import SharedStream, SingleFlight
+from jupyterlab.metrics import EXTENSIONS_CACHE_REQUESTS_TOTAL
 
 PYTHON_TO_SEMVER = {"a": "-alpha.", "b": "-beta.", "rc": "-rc."}
-
-
-def _ensure_compat_errors(info: dict, app_options: AppOptions | dict | None):
-    """Ensure that the app info has compat_errors field"""
-    handler = _AppHandler(app_options)
-    info["compat_errors"] = handler._get_extension_compat()
+# Initial delay in seconds before fetching again the listing URIs that failed
+LISTINGS_RETRY_DELAY = 5
 
 
 _message_map = {
@@ -38,11 +45,8 @@ _message_map = {
 }
 
 
-def _build_check_info(app_options: AppOptions | dict | None) -> dict[str, list[str]]:
-    """Get info about packages scheduled for (un)install/update"""
-    handler = _AppHandler(app_options)
-    messages = handler.build_check(fast=True)
-    # Decode the messages into a dict:
+def _decode_build_check(messages: list[str]) -> dict[str, list[str]]:
+    """Decode the build check messages into a dict"""
     status = {"install": [], "uninstall": [], "update": []}
     for msg in messages:
         for key, pattern in _message_map.items():
@@ -52,6 +56,78 @@ def _build_check_info(app_options: AppOptions | dict | None) -> dict[str, list[s
     return status
 
 
+def _get_scheduled_uninstall_info(app_dir: str, name: str) -> dict | None:
+    """Get information about a package that is scheduled for uninstallation"""
+    target = Path(app_dir) / "staging" / "node_modules" / name / "package.json"
+    if target.exists():
+        with target.open() as fid:
+            return json.load(fid)
+    else:
+        return None
+
+
+def _get_installed_info(
+    app_options: AppOptions | dict | None,
+) -> tuple[dict, dict[str, list[str]], dict[str, dict]]:
+    """Get the app info with compat errors and the build check info from a single handler"""
+    handler = _AppHandler(app_options)
+    handler._ensure_disabled_info()
+    info = handler.info
+    build_check_info = _decode_build_check(handler.build_check(fast=True))
+    info["compat_errors"] = handler._get_extension_compat()
+    scheduled_uninstalls = {}
+    for name in build_check_info["uninstall"]:
+        data = _get_scheduled_uninstall_info(handler.app_dir, name)
+        if data is not None:
+            scheduled_uninstalls[name] = data
+    return info, build_check_info, scheduled_uninstalls
+
+
+class AsyncAppHandler:
+    """Asynchronous facade over the application handler operations.
+
+    The blocking operations (extensions scan, page config I/O, build check)
+    are executed on a bounded executor so they never stall the event loop.
+
+    Args:
+        app_options: Application options
+        executor: Executor running the operations
+
+    Attributes:
+        app_options: Application options
+        executor: Executor running the operations
+    """
+
+    def __init__(self, app_options: AppOptions, executor: BoundedExecutor) -> None:
+        self.app_options = app_options
+        self.executor = executor
+
+    async def get_installed_info(self) -> tuple[dict, dict[str, list[str]], dict[str, dict]]:
+        """Get the app info (including compat errors) and the build check info.
+
+        Returns:
+            The app information
+            The packages scheduled for (un)install/update
+            The package.json data of the packages scheduled for uninstallation
+        """
+        return await self.executor.run(_get_installed_info, self.app_options)
+
+    async def toggle_extensions(
+        self, extensions: dict[str, bool], level: str = "sys_prefix"
+    ) -> list[str]:
+        """Enable or disable a set of extensions/plugins.
+
+        Args:
+            extensions: Mapping of extension names to their requested disabled state
+            level: Level at which to toggle the extensions
+        Returns:
+            The names whose status changed
+        """
+        return await self.executor.run(
+            toggle_extensions, extensions, app_options=self.app_options, level=level
+        )
+
+
 @dataclass(frozen=True)
 class ExtensionPackage:
     """Extension package entry.
@@ -100,6 +176,11 @@ class ExtensionPackage:
     package_manager_url: str | None = None
     repository_url: str | None = None
 
+    @cached_property
+    def json_bytes(self) -> bytes:
+        """JSON serialization of the package, computed once."""
+        return json.dumps({f.name: getattr(self, f.name) for f in fields(self)}).encode("utf-8")
+
 
 @dataclass(frozen=True)
 class ActionResult:
@@ -118,6 +199,54 @@ class ActionResult:
     needs_restart: list[str] = field(default_factory=list)
 
 
+_FOLLOW_UPS_ORDER = ("frontend", "kernel", "server")
+_STATUS_SEVERITY = {"ok": 0, "warning": 1, "error": 2}
+
+
+@dataclass(frozen=True)
+class BatchActionResult:
+    """Result of an action on many extensions
+
+    Attributes:
+        status: Worst action status - ["ok", "warning", "error"]
+        results: Action result per extension
+        needs_restart: Required action follow-ups merged over all extensions
+    """
+
+    status: str
+    results: dict[str, ActionResult] = field(default_factory=dict)
+    needs_restart: list[str] = field(default_factory=list)
+
+    @classmethod
+    def merge(cls, results: dict[str, ActionResult]) -> "BatchActionResult":
+        """Merge the action results of many extensions.
+
+        Args:
+            results: Action result per extension
+        Returns:
+            The batch result
+        """
+        status = max(
+            (r.status for r in results.values()),
+            key=lambda s: _STATUS_SEVERITY.get(s, 2),
+            default="ok",
+        )
+        follow_ups = {f for r in results.values() for f in r.needs_restart}
+        return cls(
+            status=status,
+            results=results,
+            needs_restart=sorted(
+                follow_ups,
+                key=lambda f: (
+                    _FOLLOW_UPS_ORDER.index(f)
+                    if f in _FOLLOW_UPS_ORDER
+                    else len(_FOLLOW_UPS_ORDER),
+                    f,
+                ),
+            ),
+        )
+
+
 @dataclass(frozen=True)
 class PluginManagerOptions:
     """Plugin manager options.
@@ -165,6 +294,25 @@ class ExtensionManagerMetadata:
     install_path: str | None = None
 
 
+@dataclass(frozen=True)
+class SerializedPage:
+    """Serialized page of extensions
+
+    Attributes:
+        page: Extension list it was serialized from
+        policy: Listing policy it was filtered with
+        block_mode: Whether the listing policy is a blocklist
+        body: JSON array of the extensions
+        etag: Entity tag of the body
+    """
+
+    page: dict[str, ExtensionPackage]
+    policy: "ListingPolicy | None"
+    block_mode: bool
+    body: bytes
+    etag: str
+
+
 @dataclass
 class ExtensionsCache:
     """Extensions cache
@@ -176,6 +324,203 @@ class ExtensionsCache:
 
     cache: dict[int, dict[str, ExtensionPackage] | None] = field(default_factory=dict)
     last_page: int = 1
+    # Serialized page per page number
+    serialized: dict[int, SerializedPage] = field(default_factory=dict, repr=False)
+
+    @property
+    def size(self) -> int:
+        """Approximate size of the cache as its number of packages."""
+        return sum(len(page) for page in self.cache.values() if page is not None)
+
+
+class ExtensionsCacheStore:
+    """Bounded store of the extensions caches per query.
+
+    The least recently used entries are evicted when the number of entries
+    or the total number of packages exceeds its limit. Entries expire after
+    a time-to-live.
+
+    Args:
+        max_entries: Maximal number of entries; 0 for no limit
+        max_packages: Maximal number of packages over all entries; 0 for no limit
+        ttl: Entries time-to-live in seconds; 0 for no expiration
+
+    Attributes:
+        hits: Number of pages found in the store
+        misses: Number of pages not found in the store
+        evictions: Number of entries evicted or expired
+    """
+
+    def __init__(self, max_entries: int = 0, max_packages: int = 0, ttl: float = 0) -> None:
+        self.max_entries = max_entries
+        self.max_packages = max_packages
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str | None, tuple[float, ExtensionsCache]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, query: str | None) -> bool:
+        return self.get(query) is not None
+
+    @property
+    def size(self) -> int:
+        """Approximate size of the store as its number of packages."""
+        return sum(entry.size for _, entry in self._entries.values())
+
+    def stats(self) -> dict[str, int]:
+        """Get the store statistics."""
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, query: str | None) -> ExtensionsCache | None:
+        """Get the cache of a query if it has not expired.
+
+        Args:
+            query: The search query
+        Returns:
+            The query cache or None
+        """
+        item = self._entries.get(query)
+        if item is None:
+            return None
+        created, entry = item
+        if self.ttl > 0 and time.monotonic() - created > self.ttl:
+            del self._entries[query]
+            self.evictions += 1
+            return None
+        self._entries.move_to_end(query)
+        return entry
+
+    def has_page(self, query: str | None, page: int) -> bool:
+        """Whether a page of a query is cached; it is accounted as a hit or a miss.
+
+        Args:
+            query: The search query
+            page: The result page
+        Returns:
+            Whether the page is cached
+        """
+        entry = self.get(query)
+        found = entry is not None and page in entry.cache
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        EXTENSIONS_CACHE_REQUESTS_TOTAL.labels(result="hit" if found else "miss").inc()
+        return found
+
+    def set_page(
+        self,
+        query: str | None,
+        page: int,
+        extensions: dict[str, ExtensionPackage] | None,
+        last_page: int | None = None,
+    ) -> ExtensionsCache:
+        """Set a page of a query.
+
+        Args:
+            query: The search query
+            page: The result page
+            extensions: The page extensions; None to invalidate it
+            last_page: [optional] The results last page
+        Returns:
+            The query cache
+        """
+        entry = self.get(query)
+        if entry is None:
+            entry = ExtensionsCache()
+            self._entries[query] = (time.monotonic(), entry)
+        entry.cache[page] = extensions
+        entry.serialized.pop(page, None)
+        if last_page is not None:
+            entry.last_page = last_page
+        self._evict()
+        return entry
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        # The most recently used entry is never evicted.
+        while len(self._entries) > 1 and (
+            (self.max_entries > 0 and len(self._entries) > self.max_entries)
+            or (self.max_packages > 0 and self.size > self.max_packages)
+        ):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Characters marking a listing rule name as a pattern
+_PATTERN_CHARACTERS = frozenset("*?[]()|^$+{}\\")
+# Wildcard not following a regular expression atom, like in ``@jupyterlab/*``
+_GLOB_WILDCARD = re.compile(r"(?:^|[^.\])*])[*?]")
+
+
+class ListingPolicy:
+    """Listing rules precomputed for constant time lookups.
+
+    Rule names are canonicalized into a set; names containing pattern characters
+    are compiled into a single regular expression. Patterns using only the ``*``
+    and ``?`` wildcards are glob patterns (e.g. ``@jupyterlab/*``) unless all their
+    wildcards follow a regular expression atom (e.g. ``jupyterlab-.*``).
+
+    Args:
+        rules: Listing rules per name
+        canonicalize: Function canonicalizing the extension names
+        logger: [optional] Logger for the invalid patterns
+    """
+
+    def __init__(
+        self,
+        rules: dict[str, dict],
+        canonicalize: Callable[[str], str],
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.rules = rules
+        self._canonicalize = canonicalize
+        names = set()
+        patterns = []
+        for name in rules:
+            if _PATTERN_CHARACTERS.isdisjoint(name):
+                names.add(canonicalize(name))
+                continue
+            pattern = (
+                fnmatch.translate(name)
+                if _PATTERN_CHARACTERS.intersection(name) <= {"*", "?"}
+                and _GLOB_WILDCARD.search(name) is not None
+                else name
+            )
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                if logger is not None:
+                    logger.warning(
+                        f"Invalid listing pattern {name!r}; it is matched literally: {e}"
+                    )
+                names.add(canonicalize(name))
+            else:
+                patterns.append(f"(?:{pattern})")
+        self.names = frozenset(names)
+        self.pattern = re.compile("|".join(patterns), re.IGNORECASE) if patterns else None
+
+    def __contains__(self, name: str) -> bool:
+        canonical = self._canonicalize(name)
+        if canonical in self.names:
+            return True
+        return self.pattern is not None and (
+            self.pattern.fullmatch(name) is not None
+            or self.pattern.fullmatch(canonical) is not None
+        )
 
 
 class PluginManager(LoggingConfigurable):
@@ -187,10 +532,14 @@ class PluginManager(LoggingConfigurable):
         app_options: Application options
         ext_options: Plugin manager (subset of extension manager) options
         parent: Configurable parent
+        executor: [optional] Executor of the blocking application operations, to
+            share with another manager so the page config updates are serialized;
+            default a new one with :ref:`app_handler_workers` workers
 
     Attributes:
         app_options: Application options
         options: Plugin manager options
+        executor: Executor of the blocking application operations
     """
 
     level = Enum(
@@ -199,11 +548,19 @@ class PluginManager(LoggingConfigurable):
         help="Level at which to manage plugins: sys_prefix, user, system",
     ).tag(config=True)
 
+    app_handler_workers = CInt(
+        1,
+        help="""Number of worker threads executing the blocking application operations
+        (extensions scan, page config update, build check). A single worker serializes
+        page config updates.""",
+    ).tag(config=True)
+
     def __init__(
         self,
         app_options: dict | None = None,
         ext_options: dict | None = None,
         parent: Configurable | None = None,
+        executor: BoundedExecutor | None = None,
     ) -> None:
         super().__init__(parent=parent)
         self.log.debug(
@@ -217,6 +574,11 @@ class PluginManager(LoggingConfigurable):
             if option in plugin_options_field
         }
         self.options = PluginManagerOptions(**plugin_options)
+        self.executor = executor or BoundedExecutor(
+            max_workers=self.app_handler_workers,
+            thread_name_prefix=f"{self.__class__.__name__}-app-handler",
+        )
+        self.app_handler = AsyncAppHandler(self.app_options, self.executor)
 
     async def plugin_locks(self) -> dict:
         """Get information about locks on plugin enabling/disabling"""
@@ -254,22 +616,7 @@ class PluginManager(LoggingConfigurable):
             The action result
         """
         plugins = plugins if isinstance(plugins, list) else [plugins]
-        locked = self._find_locked(plugins)
-        trans = translator.load("jupyterlab")
-        if locked:
-            return ActionResult(
-                status="error",
-                message=trans.gettext(
-                    "The following plugins cannot be disabled as they are locked: "
-                )
-                + ", ".join(locked),
-            )
-        try:
-            for plugin in plugins:
-                disable_extension(plugin, app_options=self.app_options, level=self.level)
-            return ActionResult(status="ok", needs_restart=["frontend"])
-        except Exception as err:
-            return ActionResult(status="error", message=repr(err))
+        return await self.toggle(disable=plugins)
 
     async def enable(self, plugins: str | list[str]) -> ActionResult:
         """Enable a set of plugins (or an extension).
@@ -280,19 +627,55 @@ class PluginManager(LoggingConfigurable):
             The action result
         """
         plugins = plugins if isinstance(plugins, list) else [plugins]
-        locked = self._find_locked(plugins)
+        return await self.toggle(enable=plugins)
+
+    async def toggle(
+        self, enable: list[str] | None = None, disable: list[str] | None = None
+    ) -> ActionResult:
+        """Enable and disable sets of plugins (or extensions) in a single transaction.
+
+        The page config is written only once whatever the number of plugins;
+        nothing is changed if any of the plugins is locked.
+
+        Args:
+            enable: The list of plugins to enable
+            disable: The list of plugins to disable
+        Returns:
+            The action result
+        """
+        enable = enable or []
+        disable = disable or []
         trans = translator.load("jupyterlab")
-        if locked:
+        locked_enable = self._find_locked(enable)
+        locked_disable = self._find_locked(disable)
+        if locked_enable or locked_disable:
+            messages = []
+            if locked_disable:
+                messages.append(
+                    trans.gettext("The following plugins cannot be disabled as they are locked: ")
+                    + ", ".join(locked_disable)
+                )
+            if locked_enable:
+                messages.append(
+                    trans.gettext("The following plugins cannot be enabled as they are locked: ")
+                    + ", ".join(locked_enable)
+                )
+            return ActionResult(status="error", message="\n".join(messages))
+
+        overlap = set(enable) & set(disable)
+        if overlap:
             return ActionResult(
                 status="error",
-                message=trans.gettext(
-                    "The following plugins cannot be enabled as they are locked: "
-                )
-                + ", ".join(locked),
+                message=trans.gettext("The following plugins cannot be both enabled and disabled: ")
+                + ", ".join(sorted(overlap)),
             )
+
+        toggles = dict.fromkeys(enable, False)
+        toggles.update(dict.fromkeys(disable, True))
+        if not toggles:
+            return ActionResult(status="ok")
         try:
-            for plugin in plugins:
-                enable_extension(plugin, app_options=self.app_options, level=self.level)
+            await self.app_handler.toggle_extensions(toggles, level=self.level)
             return ActionResult(status="ok", needs_restart=["frontend"])
         except Exception as err:
             return ActionResult(status="error", message=repr(err))
@@ -326,6 +709,34 @@ class ExtensionManager(PluginManager):
         options: Extension manager options
     """
 
+    extensions_cache_entries = CInt(
+        100, help="Maximal number of search queries cached; 0 for no limit."
+    ).tag(config=True)
+
+    extensions_cache_packages = CInt(
+        10000, help="Maximal number of packages cached over all search queries; 0 for no limit."
+    ).tag(config=True)
+
+    extensions_cache_ttl = CFloat(
+        60 * 60.0, help="Time-to-live in seconds of a cached search query; 0 for no expiration."
+    ).tag(config=True)
+
+    latest_version_concurrency = CInt(
+        10, help="Maximal number of concurrent latest version lookups."
+    ).tag(config=True)
+
+    latest_version_timeout = CFloat(
+        10.0, help="Timeout in seconds of a latest version lookup."
+    ).tag(config=True)
+
+    listings_fetch_timeout = CFloat(
+        30.0, help="Timeout in seconds of the fetch of a listing URI."
+    ).tag(config=True)
+
+    finished_jobs_kept = CInt(
+        20, help="Number of finished install and uninstall jobs kept for status requests."
+    ).tag(config=True)
+
     def __init__(
         self,
         app_options: dict | None = None,
@@ -337,10 +748,35 @@ class ExtensionManager(PluginManager):
         self.app_dir = Path(self.app_options.app_dir)
         self.core_config = self.app_options.core_config
         self.options = ExtensionManagerOptions(**(ext_options or {}))
-        self._extensions_cache: dict[str | None, ExtensionsCache] = {}
-        self._listings_cache: dict | None = None
+        self._extensions_cache = ExtensionsCacheStore(
+            max_entries=self.extensions_cache_entries,
+            max_packages=self.extensions_cache_packages,
+            ttl=self.extensions_cache_ttl,
+        )
+        # Last known latest versions of the installed extensions
+        self._latest_versions: dict[str, str] = {}
+        self._latest_versions_task: asyncio.Task | None = None
+        # Installed extensions listed while the latest versions were being refreshed
+        self._latest_versions_pending: dict[str, ExtensionPackage] = {}
+        self._installed_revision = 0
+        self._refresh_flight = SingleFlight()
+        self._stream_flight = SingleFlight()
+        # Last page and packages of the pages being streamed
+        self._page_streams: dict[
+            tuple[str, int, int],
+            tuple[int | None, SharedStream[tuple[int, ExtensionPackage]]],
+        ] = {}
+        self._listing_policy: ListingPolicy | None = None
+        # Last good response (ETag, Last-Modified, rules) per listing URI
+        self._listing_responses: dict[str, tuple[str | None, str | None, list[dict]]] = {}
         self._listings_block_mode = True
+        # Listing URIs never fetched successfully, and when to fetch them again
+        self._failed_listing_uris: frozenset[str] = frozenset()
+        self._listings_retry_delay = 0.0
+        self._listings_retry_at = 0.0
         self._listing_fetch: tornado.ioloop.PeriodicCallback | None = None
+        self._jobs: OrderedDict[str, ExtensionJob] = OrderedDict()
+        self._job_lock = asyncio.Lock()
 
         if len(self.options.allowed_extensions_uris) or len(self.options.blocked_extensions_uris):
             self._listings_block_mode = len(self.options.allowed_extensions_uris) == 0
@@ -360,11 +796,37 @@ class ExtensionManager(PluginManager):
         if self._listing_fetch is not None:
             self._listing_fetch.stop()
 
+    @property
+    def _listings_cache(self) -> dict | None:
+        """Listing rules per name; None if not fetched."""
+        return None if self._listing_policy is None else self._listing_policy.rules
+
+    @_listings_cache.setter
+    def _listings_cache(self, rules: dict | None) -> None:
+        # The policy is built before being swapped in at once
+        self._listing_policy = (
+            None if rules is None else ListingPolicy(rules, self._canonicalize_name, self.log)
+        )
+
     @property
     def metadata(self) -> ExtensionManagerMetadata:
         """Extension manager metadata."""
         raise NotImplementedError
 
+    @property
+    def extensions_cache_stats(self) -> dict[str, int]:
+        """Statistics of the extensions cache (entries, size, hits, misses, evictions)."""
+        return self._extensions_cache.stats()
+
+    @property
+    def installed_revision(self) -> int:
+        """Revision of the installed extensions listing.
+
+        It is incremented each time the listing changes, including when the
+        latest versions are refreshed in the background.
+        """
+        return self._installed_revision
+
     async def get_latest_version(self, extension: str) -> str | None:
         """Return the latest available version for a given extension.
 
@@ -390,6 +852,32 @@ class ExtensionManager(PluginManager):
         """
         raise NotImplementedError
 
+    async def iter_packages(
+        self, query: str, page: int, per_page: int
+    ) -> tuple[int | None, AsyncIterator[tuple[int, ExtensionPackage]]]:
+        """List the available extensions as soon as they are ready.
+
+        Note:
+            This default implementation yields the extensions once all of
+            them are listed; managers fetching metadata per extension should
+            override it.
+
+        Args:
+            query: The search extension query
+            page: The result page
+            per_page: The number of results per page
+        Returns:
+            The results last page; None if the manager does not support pagination
+            The available extensions with their index in the page, in any order
+        """
+        extensions, last_page = await self.list_packages(query, page, per_page)
+
+        async def iterate() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+            for item in enumerate(extensions.values()):
+                yield item
+
+        return last_page, iterate()
+
     async def install(self, extension: str, version: str | None = None) -> ActionResult:
         """Install the required extension.
 
@@ -421,6 +909,102 @@ class ExtensionManager(PluginManager):
         """
         raise NotImplementedError
 
+    async def install_many(self, extensions: dict[str, str | None]) -> BatchActionResult:
+        """Install many extensions.
+
+        Note:
+            This default implementation installs the extensions one after the
+            other; managers able to resolve them at once should override it.
+
+        Args:
+            extensions: Version to install per extension name; None for the latest possible
+        Returns:
+            The batch result
+        """
+        results = {}
+        for name, version in extensions.items():
+            results[name] = await self.install(name, version)
+        return BatchActionResult.merge(results)
+
+    async def uninstall_many(self, extensions: list[str]) -> BatchActionResult:
+        """Uninstall many extensions.
+
+        Note:
+            This default implementation uninstalls the extensions one after the
+            other; managers able to remove them at once should override it.
+
+        Args:
+            extensions: The extension names
+        Returns:
+            The batch result
+        """
+        results = {}
+        for name in extensions:
+            results[name] = await self.uninstall(name)
+        return BatchActionResult.merge(results)
+
+    @property
+    def jobs(self) -> list[ExtensionJob]:
+        """Install and uninstall jobs, oldest first."""
+        return list(self._jobs.values())
+
+    def get_job(self, job_id: str) -> ExtensionJob | None:
+        """Get an install or uninstall job.
+
+        Args:
+            job_id: Job identifier
+        Returns:
+            The job; None if unknown
+        """
+        return self._jobs.get(job_id)
+
+    def start_job(self, action: str, name: str, version: str | None = None) -> ExtensionJob:
+        """Start installing or uninstalling an extension in the background.
+
+        The jobs are executed one at a time; a job stays queued until the
+        previous ones are finished.
+
+        Args:
+            action: Action to perform - ["install", "uninstall"]
+            name: Extension name
+            version: [optional] Version to install
+        Returns:
+            The job
+        """
+        if action not in ("install", "uninstall"):
+            msg = f"Unsupported job action {action!r}."
+            raise ValueError(msg)
+
+        job = ExtensionJob(action, name, version)
+        self._jobs[job.id] = job
+        finished = [j.id for j in self._jobs.values() if j.done]
+        for job_id in finished[: max(0, len(finished) - self.finished_jobs_kept)]:
+            del self._jobs[job_id]
+        job.start(self._run_job(job))
+        return job
+
+    async def _run_job(self, job: ExtensionJob) -> None:
+        """Execute a job once the previous ones are finished.
+
+        The package manager output is reported through :ref:`current_job`.
+        """
+        try:
+            # A single package manager process at a time modifies the environment
+            async with self._job_lock:
+                current_job.set(job)
+                job.set_phase(f"{job.action}ing")
+                if job.action == "install":
+                    result = await self.install(job.name, job.version)
+                else:
+                    result = await self.uninstall(job.name)
+        except asyncio.CancelledError:
+            job.finish(ActionResult(status="error", message="Cancelled"), "cancelled")
+            return
+        except Exception as e:
+            self.log.error(f"Failed to {job.action} {job.name}.", exc_info=e)
+            result = ActionResult(status="error", message=str(e))
+        job.finish(result)
+
     @staticmethod
     def get_semver_version(version: str) -> str:
         """Convert a Python version to Semver version.
@@ -464,6 +1048,10 @@ class ExtensionManager(PluginManager):
         This will return the extensions installed (if ``query`` is None) or
         available if allowed by the listing settings.
 
+        The installed extensions are returned immediately with the last known
+        latest versions; those are refreshed in the background and the
+        :ref:`installed_revision` is incremented once they are.
+
         Args:
             query: [optional] Query search term.
 
@@ -471,85 +1059,310 @@ class ExtensionManager(PluginManager):
             The extensions
             Last page of results
         """
-        if query not in self._extensions_cache or page not in self._extensions_cache[query].cache:
+        if not self._extensions_cache.has_page(query, page):
             await self.refresh(query, page, per_page)
+        entry = self._extensions_cache.get(query) or ExtensionsCache()
 
         # filter using listings settings
-        if self._listings_cache is None and self._listing_fetch is not None:
+        if self._listing_policy is None and self._listing_fetch is not None:
             await self._listing_fetch.callback()
 
-        cache = self._extensions_cache[query].cache[page]
+        cache = entry.cache.get(page)
         if cache is None:
             cache = {}
-        extensions = list(cache.values())
-        if query is not None and self._listings_cache is not None:
-            listing = list(self._listings_cache)
-            extensions = []
-            if self._listings_block_mode:
-                for name, ext in cache.items():
-                    if name not in listing:
-                        extensions.append(ext)
-                    elif ext.installed_version:
-                        self.log.warning(f"Blocked extension '{name}' is installed.")
-                        extensions.append(replace(ext, allowed=False))
-            else:
-                for name, ext in cache.items():
-                    if name in listing:
-                        extensions.append(ext)
-                    elif ext.installed_version:
-                        self.log.warning(f"Not allowed extension '{name}' is installed.")
-                        extensions.append(replace(ext, allowed=False))
+        if query is None:
+            extensions = list(cache.values())
+        else:
+            extensions = [
+                ext for ext in map(self._apply_listing, cache.values()) if ext is not None
+            ]
+
+        return extensions, entry.last_page
+
+    async def stream_extensions(
+        self, query: str, page: int = 1, per_page: int = 30, refresh: bool = False
+    ) -> tuple[int | None, AsyncIterator[tuple[int, ExtensionPackage]]]:
+        """List the available extensions for a ``query`` search term as soon as they are ready.
+
+        The page is cached once all its extensions have been listed. Concurrent
+        listings of the same page share a single fetch.
+
+        Args:
+            query: Query search term; None to list the installed extensions.
+            refresh: Whether to fetch the page again if it is cached.
+
+        Returns:
+            Last page of results
+            The extensions allowed by the listing settings with their index in the page, in any order
+        """
+        if query is None:
+            if refresh:
+                await self.refresh(query, page, per_page)
+            extensions, last_page = await self.list_extensions(query, page, per_page)
+
+            async def iterate_installed() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+                for item in enumerate(extensions):
+                    yield item
+
+            return last_page, iterate_installed()
+
+        if self._listing_policy is None and self._listing_fetch is not None:
+            await self._listing_fetch.callback()
+
+        if (query, page, per_page) in self._refresh_flight:
+            # Reuse the page being refreshed
+            await self.refresh(query, page, per_page)
+            refresh = False
+
+        if not refresh and self._extensions_cache.has_page(query, page):
+            entry = self._extensions_cache.get(query) or ExtensionsCache()
+            last_page, packages = entry.last_page, enumerate((entry.cache.get(page) or {}).values())
+
+            async def iterate_cache() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+                for item in packages:
+                    yield item
+
+            listed = iterate_cache()
+        else:
+            last_page, stream = await self._get_page_stream(query, page, per_page)
+            listed = stream.follow()
+
+        async def iterate() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+            try:
+                async for index, ext in listed:
+                    listed_ext = self._apply_listing(ext)
+                    if listed_ext is not None:
+                        yield index, listed_ext
+            finally:
+                await listed.aclose()
+
+        return last_page, iterate()
+
+    async def _get_page_stream(
+        self, query: str, page: int, per_page: int
+    ) -> tuple[int | None, SharedStream[tuple[int, ExtensionPackage]]]:
+        """Get the packages of a page being streamed, starting to stream it if needed."""
+        key = (query, page, per_page)
+        if key in self._page_streams:
+            return self._page_streams[key]
+        return await self._stream_flight.do(key, self._start_page_stream, query, page, per_page)
+
+    async def _start_page_stream(
+        self, query: str, page: int, per_page: int
+    ) -> tuple[int | None, SharedStream[tuple[int, ExtensionPackage]]]:
+        key = (query, page, per_page)
+        last_page, packages = await self.iter_packages(query, page, per_page)
+
+        async def iterate() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+            received = {}
+            try:
+                async for index, ext in packages:
+                    received[index] = ext
+                    yield index, ext
+                self._extensions_cache.set_page(
+                    query,
+                    page,
+                    {ext.name: ext for _, ext in sorted(received.items())},
+                    last_page or 1,
+                )
+            finally:
+                if self._page_streams.get(key, (None, None))[1] is stream:
+                    del self._page_streams[key]
+
+        stream = SharedStream(iterate())
+        self._page_streams[key] = (last_page, stream)
+        return last_page, stream
+
+    def _apply_listing(self, ext: ExtensionPackage) -> ExtensionPackage | None:
+        """Apply the listing settings to an available extension.
+
+        Args:
+            ext: The extension
+        Returns:
+            The extension, marked as not allowed if installed despite the settings;
+            None if it is not listed
+        """
+        listing = self._listing_policy
+        if listing is None:
+            return ext
+        if (ext.name not in listing) == self._listings_block_mode:
+            return ext
+        if ext.installed_version:
+            kind = "Blocked" if self._listings_block_mode else "Not allowed"
+            self.log.warning(f"{kind} extension '{ext.name}' is installed.")
+            return replace(ext, allowed=False)
+        return None
+
+    async def list_extensions_json(
+        self, query: str | None = None, page: int = 1, per_page: int = 30
+    ) -> tuple[bytes, str, int | None]:
+        """List extensions for a given ``query`` search term as a JSON array.
+
+        The serialized page is cached along the extensions cache entry; it is
+        encoded again only if the page or the listing policy changed.
+
+        Args:
+            query: [optional] Query search term.
 
-        return extensions, self._extensions_cache[query].last_page
+        Returns:
+            The JSON array of the extensions
+            Its entity tag
+            Last page of results
+        """
+        extensions, last_page = await self.list_extensions(query, page, per_page)
+        entry = self._extensions_cache.get(query)
+        cache = entry.cache.get(page) if entry is not None else None
+        policy = self._listing_policy if query is not None else None
+
+        serialized = entry.serialized.get(page) if entry is not None else None
+        if (
+            serialized is not None
+            and serialized.page is cache
+            and serialized.policy is policy
+            and serialized.block_mode == self._listings_block_mode
+        ):
+            return serialized.body, serialized.etag, last_page
+
+        body = b"[" + b", ".join(e.json_bytes for e in extensions) + b"]"
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'  # noqa: S324
+        if cache is not None:
+            entry.serialized[page] = SerializedPage(
+                cache, policy, self._listings_block_mode, body, etag
+            )
+        return body, etag, last_page
 
     async def refresh(self, query: str | None, page: int, per_page: int) -> None:
-        """Refresh the list of extensions."""
+        """Refresh the list of extensions.
+
+        Concurrent refreshes of the same page are merged in a single update.
+        """
+        await self._refresh_flight.do(
+            (query, page, per_page), self._refresh_page, query, page, per_page
+        )
+
+    async def _refresh_page(self, query: str | None, page: int, per_page: int) -> None:
+        key = (query, page, per_page)
+        if key in self._page_streams or key in self._stream_flight:
+            # Reuse the page being streamed
+            _, stream = await self._get_page_stream(query, page, per_page)
+            await stream.wait()
+            return
         if query in self._extensions_cache:
-            self._extensions_cache[query].cache[page] = None
+            self._extensions_cache.set_page(query, page, None)
         await self._update_extensions_list(query, page, per_page)
 
     async def _fetch_listings(self) -> None:
-        """Fetch the listings for the extension manager."""
-        rules = []
-        client = tornado.httpclient.AsyncHTTPClient()
+        """Fetch the listings for the extension manager.
+
+        The listing URIs are fetched concurrently; a URI failing keeps its last
+        good rules. A URI that was never fetched successfully fails closed: it
+        allows no extension, or blocks all of them. It is fetched again before
+        checking an installation after a delay doubling from ``LISTINGS_RETRY_DELAY``
+        up to :ref:`listings_refresh_seconds`.
+        """
         if self._listings_block_mode:
-            if len(self.options.blocked_extensions_uris):
-                self.log.info(
-                    f"Fetching blocked extensions from {self.options.blocked_extensions_uris}"
-                )
-                for blocked_extensions_uri in self.options.blocked_extensions_uris:
-                    r = await client.fetch(
-                        blocked_extensions_uri,
-                        **self.options.listings_tornado_options,
-                    )
-                    j = json.loads(r.body)
-                    rules.extend(j.get("blocked_extensions", []))
-        elif len(self.options.allowed_extensions_uris):
-            self.log.info(
-                f"Fetching allowed extensions from {self.options.allowed_extensions_uris}"
-            )
-            for allowed_extensions_uri in self.options.allowed_extensions_uris:
-                r = await client.fetch(
-                    allowed_extensions_uri,
-                    **self.options.listings_tornado_options,
-                )
-                j = json.loads(r.body)
-                rules.extend(j.get("allowed_extensions", []))
+            uris = list(self.options.blocked_extensions_uris)
+            key = "blocked_extensions"
+        else:
+            uris = list(self.options.allowed_extensions_uris)
+            key = "allowed_extensions"
 
+        rules = []
+        failed = set()
+        if uris:
+            self.log.info(f"Fetching {key.replace('_', ' ')} from {uris}")
+            client = tornado.httpclient.AsyncHTTPClient()
+            results = await asyncio.gather(
+                *(self._fetch_listing(client, uri, key) for uri in uris), return_exceptions=True
+            )
+            for uri, result in zip(uris, results, strict=True):
+                if isinstance(result, BaseException):
+                    self.log.error(f"Failed to fetch the listing {uri}.", exc_info=result)
+                    failed.add(uri)
+                else:
+                    rules.extend(result)
+
+        self._failed_listing_uris = frozenset(failed)
+        if failed:
+            self._listings_retry_delay = min(
+                max(2 * self._listings_retry_delay, LISTINGS_RETRY_DELAY),
+                self.options.listings_refresh_seconds,
+            )
+            self._listings_retry_at = time.monotonic() + self._listings_retry_delay
+        else:
+            self._listings_retry_delay = 0.0
         self._listings_cache = {r["name"]: r for r in rules}
 
+    async def _fetch_listing(
+        self, client: tornado.httpclient.AsyncHTTPClient, uri: str, key: str
+    ) -> list[dict]:
+        """Fetch the rules of a listing URI.
+
+        The URI is revalidated with the ETag and Last-Modified headers of its
+        last good response.
+
+        Args:
+            client: HTTP client
+            uri: Listing URI
+            key: Rules key in the listing document
+        Returns:
+            The listing rules
+        Raises:
+            Exception: If the fetch failed and there is no previous good rules
+        """
+        previous = self._listing_responses.get(uri)
+        options = dict(self.options.listings_tornado_options)
+        headers = dict(options.pop("headers", None) or {})
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            r = await asyncio.wait_for(
+                client.fetch(uri, headers=headers, raise_error=False, **options),
+                self.listings_fetch_timeout,
+            )
+            if previous is not None and r.code == 304:  # noqa PLR2004
+                return previous[2]
+            if r.code >= 400:  # noqa PLR2004
+                msg = f"HTTP {r.code}"
+                raise tornado.httpclient.HTTPClientError(r.code, msg)
+            rules = json.loads(r.body).get(key, [])
+        except Exception as e:
+            if previous is None:
+                raise
+            self.log.warning(
+                f"Failed to fetch the listing {uri}; keeping the last one.", exc_info=e
+            )
+            return previous[2]
+
+        self._listing_responses[uri] = (
+            r.headers.get("ETag"),
+            r.headers.get("Last-Modified"),
+            rules,
+        )
+        return rules
+
     async def _is_allowed_by_listing(self, name: str) -> bool:
         """Return whether the listing policy permits installing this extension."""
         if self._listing_fetch is None:
             return True
-        if self._listings_cache is None:
+        if self._listing_policy is None or (
+            self._failed_listing_uris and time.monotonic() >= self._listings_retry_at
+        ):
             await self._fetch_listings()
-        normalized = self._canonicalize_name(name)
-        normalized_cache = {self._canonicalize_name(k) for k in self._listings_cache}
-        if self._listings_block_mode:
-            return normalized not in normalized_cache
-        else:
-            return normalized in normalized_cache
+        if self._listings_block_mode and self._failed_listing_uris:
+            # The listings that could not be fetched may block the extension
+            self.log.warning(
+                f"Extension '{name}' is not allowed as the listings "
+                f"{sorted(self._failed_listing_uris)} could not be fetched."
+            )
+            return False
+        listed = name in self._listing_policy
+        return not listed if self._listings_block_mode else listed
 
     async def is_install_allowed(self, name: str, _version: str | None = None) -> bool:
         return await self._is_allowed_by_listing(name)
@@ -564,13 +1377,9 @@ class ExtensionManager(PluginManager):
         Returns:
             The installed extensions as a mapping {name: metadata}
         """
-        app_options = self.app_options
-        info = get_app_info(app_options=app_options)
-        build_check_info = _build_check_info(app_options)
-        _ensure_compat_errors(info, app_options)
+        info, build_check_info, scheduled_uninstalls = await self.app_handler.get_installed_info()
         extensions = {}
 
-        # TODO: the three for-loops below can be run concurrently
         for name, data in info["federated_extensions"].items():
             status = "ok"
             pkg_info = data
@@ -597,9 +1406,6 @@ class ExtensionManager(PluginManager):
                 repository_url=data.get("repository", {}).get("url", data.get("repository")),
             )
 
-            if get_latest_version:
-                pkg = replace(pkg, latest_version=await self.get_latest_version(pkg.name))
-
             extensions[normalized_name] = pkg
 
         for name, data in info["extensions"].items():
@@ -632,34 +1438,65 @@ class ExtensionManager(PluginManager):
                 bug_tracker_url=data.get("bugs", {}).get("url"),
                 repository_url=data.get("repository", {}).get("url", data.get("repository")),
             )
-            if get_latest_version:
-                pkg = replace(pkg, latest_version=await self.get_latest_version(pkg.name))
             extensions[normalized_name] = pkg
 
-        for name in build_check_info["uninstall"]:
-            data = self._get_scheduled_uninstall_info(name)
-            if data is not None:
-                normalized_name = self._normalize_name(name)
-                pkg = ExtensionPackage(
-                    name=normalized_name,
-                    description=data.get("description", ""),
-                    homepage_url=data.get("homepage", ""),
-                    installed=False,
-                    enabled=False,
-                    core=False,
-                    latest_version=ExtensionManager.get_semver_version(data["version"]),
-                    installed_version=ExtensionManager.get_semver_version(data["version"]),
-                    status="warning",
-                    pkg_type="prebuilt",
-                    author=data.get("author", {}).get("name", data.get("author")),
-                    license=data.get("license"),
-                    bug_tracker_url=data.get("bugs", {}).get("url"),
-                    repository_url=data.get("repository", {}).get("url", data.get("repository")),
-                )
-                extensions[normalized_name] = pkg
+        if get_latest_version:
+            extensions = await self._get_latest_versions(extensions)
+
+        for name, data in scheduled_uninstalls.items():
+            normalized_name = self._normalize_name(name)
+            pkg = ExtensionPackage(
+                name=normalized_name,
+                description=data.get("description", ""),
+                homepage_url=data.get("homepage", ""),
+                installed=False,
+                enabled=False,
+                core=False,
+                latest_version=ExtensionManager.get_semver_version(data["version"]),
+                installed_version=ExtensionManager.get_semver_version(data["version"]),
+                status="warning",
+                pkg_type="prebuilt",
+                author=data.get("author", {}).get("name", data.get("author")),
+                license=data.get("license"),
+                bug_tracker_url=data.get("bugs", {}).get("url"),
+                repository_url=data.get("repository", {}).get("url", data.get("repository")),
+            )
+            extensions[normalized_name] = pkg
 
         return extensions
 
+    async def _get_latest_versions(
+        self, extensions: dict[str, ExtensionPackage]
+    ) -> dict[str, ExtensionPackage]:
+        """Fetch concurrently the latest version of the extensions.
+
+        At most :ref:`latest_version_concurrency` lookups are running at the same
+        time. If a lookup fails, times out or returns no version, the extension is
+        kept unchanged (i.e. its latest version is the installed one).
+
+        Args:
+            extensions: The extensions as a mapping {name: metadata}
+        Returns:
+            The extensions with their latest version
+        """
+        semaphore = asyncio.Semaphore(max(1, self.latest_version_concurrency))
+
+        async def lookup(pkg: ExtensionPackage) -> ExtensionPackage:
+            async with semaphore:
+                try:
+                    latest_version = await asyncio.wait_for(
+                        self.get_latest_version(pkg.name), timeout=self.latest_version_timeout
+                    )
+                except Exception as e:
+                    self.log.debug(f"Failed to get the latest version of {pkg.name}", exc_info=e)
+                    return pkg
+            if not latest_version:
+                return pkg
+            return replace(pkg, latest_version=latest_version)
+
+        packages = await asyncio.gather(*(lookup(pkg) for pkg in extensions.values()))
+        return dict(zip(extensions.keys(), packages, strict=True))
+
     def _get_companion(self, data: dict) -> str | None:
         companion = None
         if "discovery" in data["jupyterlab"]:
@@ -669,15 +1506,6 @@ class ExtensionManager(PluginManager):
                 companion = "kernel"
         return companion
 
-    def _get_scheduled_uninstall_info(self, name: str) -> dict | None:
-        """Get information about a package that is scheduled for uninstallation"""
-        target = self.app_dir / "staging" / "node_modules" / name / "package.json"
-        if target.exists():
-            with target.open() as fid:
-                return json.load(fid)
-        else:
-            return None
-
     def _normalize_name(self, name: str) -> str:
         """Normalize extension name; by default does nothing.
 
@@ -701,11 +1529,68 @@ class ExtensionManager(PluginManager):
             # Get the available extensions
             extensions, last_page = await self.list_packages(query, page, per_page)
         else:
-            # Get the installed extensions
-            extensions = await self._get_installed_extensions()
+            # Get the installed extensions from local data; the latest versions
+            # are refreshed in the background
+            extensions = self._apply_latest_versions(
+                await self._get_installed_extensions(get_latest_version=False)
+            )
+            self._installed_revision += 1
+            self._refresh_latest_versions(extensions)
 
-        if query in self._extensions_cache:
-            self._extensions_cache[query].cache[page] = extensions
-            self._extensions_cache[query].last_page = last_page or 1
-        else:
-            self._extensions_cache[query] = ExtensionsCache({page: extensions}, last_page or 1)
+        self._extensions_cache.set_page(query, page, extensions, last_page or 1)
+
+    def _apply_latest_versions(
+        self, extensions: dict[str, ExtensionPackage]
+    ) -> dict[str, ExtensionPackage]:
+        """Set the last known latest versions on the installed extensions."""
+        return {
+            name: (
+                replace(pkg, latest_version=self._latest_versions[name])
+                if pkg.installed and name in self._latest_versions
+                else pkg
+            )
+            for name, pkg in extensions.items()
+        }
+
+    def _refresh_latest_versions(self, extensions: dict[str, ExtensionPackage]) -> None:
+        """Start refreshing the latest versions of the installed extensions in the background.
+
+        A refresh in flight is let finish; the extensions it does not cover are
+        looked up once it completes.
+        """
+        installed = {name: pkg for name, pkg in extensions.items() if pkg.installed}
+        if not installed:
+            return
+        if self._latest_versions_task is not None and not self._latest_versions_task.done():
+            self._latest_versions_pending.update(installed)
+            return
+        self._latest_versions_task = asyncio.ensure_future(self._update_latest_versions(installed))
+
+    async def _update_latest_versions(self, extensions: dict[str, ExtensionPackage]) -> None:
+        """Fetch the latest versions and update the installed extensions cache."""
+        # Let the interactive requests go first
+        request_priority.set(Priority.BACKGROUND)
+        while extensions:
+            try:
+                updated = await self._get_latest_versions(extensions)
+            except Exception as e:
+                self.log.debug("Failed to refresh the latest versions.", exc_info=e)
+            else:
+                # Unchanged packages are failed lookups; keep the previous known versions
+                self._latest_versions.update(
+                    {
+                        name: pkg.latest_version
+                        for name, pkg in updated.items()
+                        if pkg is not extensions[name]
+                    }
+                )
+                cache = self._extensions_cache.get(None)
+                if cache is not None:
+                    for page, entries in cache.cache.items():
+                        if entries is not None:
+                            cache.cache[page] = self._apply_latest_versions(entries)
+                            cache.serialized.pop(page, None)
+                self._installed_revision += 1
+
+            pending, self._latest_versions_pending = self._latest_versions_pending, {}
+            extensions = {name: pkg for name, pkg in pending.items() if name not in extensions}
@@ -4,34 +4,32 @@
 """Extension manager using pip as package manager and PyPi.org as packages source."""
 
 import asyncio
+import contextlib
 import http.client
-import io
+import importlib
+import importlib.metadata
 import json
 import math
-import re
 import sys
 import tempfile
+import time
+import weakref
 import xmlrpc.client
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import datetime, timedelta, timezone
 from functools import partial
-from itertools import groupby
 from os import environ
-from pathlib import Path
-from subprocess import CalledProcessError, run
-from tarfile import TarFile
-from typing import Any, Optional
+from subprocess import PIPE, CompletedProcess, Popen, TimeoutExpired
+from typing import IO, Any, Optional
 from urllib.parse import urlparse
-from zipfile import ZipFile
 
 import httpx
-import tornado
 from async_lru import alru_cache
 from packaging.specifiers import InvalidSpecifier, SpecifierSet
 from packaging.utils import InvalidName, canonicalize_name
 from packaging.version import InvalidVersion, Version
 from packaging.version import parse as parse_version
-from traitlets import CFloat, CInt, Unicode, config, observe
+from traitlets import CFloat, CInt, Enum, Unicode, config, observe
 
 try:
     from typing import override
@@ -39,12 +37,32 @@ except ImportError:
     from typing_extensions import override
 
 from jupyterlab._version import __version__
+from jupyterlab.extensions.index import (
+    IndexSnapshot,
+    IndexSource,
+    JSONIndexSource,
+    PyPIIndexSource,
+)
+from jupyterlab.extensions.installer import get_installer
+from jupyterlab.extensions.jobs import ExtensionJob, current_job
 from jupyterlab.extensions.manager import (
     ActionResult,
+    BatchActionResult,
     ExtensionManager,
     ExtensionManagerMetadata,
     ExtensionPackage,
 )
+from jupyterlab.extensions.ratelimit import (
+    Priority,
+    RateLimiter,
+    RateLimiterMetrics,
+    get_rate_limiter,
+    request_priority,
+)
+from jupyterlab.extensions.search import SearchIndex
+from jupyterlab.extensions.singleflight import SingleFlight
+from jupyterlab.extensions.store import MetadataStore
+from jupyterlab.metrics import PYPI_REQUEST_DURATION_SECONDS, PYPI_THROTTLED_TOTAL
 
 
 class ProxiedTransport(xmlrpc.client.Transport):
@@ -101,6 +119,28 @@ if http_proxy_url:
     xmlrpc_transport_override.set_proxy(proxy_host, proxy_port)
 
 
+class _AsyncClient(httpx.AsyncClient):
+    """HTTP client with a hook called on the requests failing to get a response.
+
+    Args:
+        on_request_error: Hook called with the request error before it is raised
+        **kwargs: ``httpx.AsyncClient`` arguments
+    """
+
+    def __init__(
+        self, on_request_error: Callable[[httpx.RequestError], None], **kwargs: Any
+    ) -> None:
+        super().__init__(**kwargs)
+        self._on_request_error = on_request_error
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        try:
+            return await super().send(request, **kwargs)
+        except httpx.RequestError as e:
+            self._on_request_error(e)
+            raise
+
+
 def _check_python_version_compatible(requires_python: str | None) -> tuple[bool, str | None]:
     """Check if the current Python version satisfies the requires_python specifier.
 
@@ -147,6 +187,7 @@ async def _fetch_package_metadata(
                 "bugtrack_url",
                 "docs_url",
                 "home_page",
+                "keywords",
                 "license",
                 "package_url",
                 "project_url",
@@ -159,6 +200,55 @@ async def _fetch_package_metadata(
         return {}
 
 
+def _get_installed_jupyterlab_metadata(name: str) -> dict | None:
+    """Get the JupyterLab metadata of an installed distribution.
+
+    The ``package.json`` files are looked up in the distribution ``RECORD``.
+
+    Args:
+        name: Distribution name
+    Returns:
+        The ``jupyterlab`` entry of the first ``package.json`` having one; None if not found
+    """
+    # The distribution may have been installed by a subprocess
+    importlib.invalidate_caches()
+    try:
+        dist = importlib.metadata.distribution(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+    for file in dist.files or []:
+        if file.name != "package.json":
+            continue
+        try:
+            data = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if data.get("jupyterlab") is not None:
+            return data["jupyterlab"]
+    return None
+
+
+def _get_follow_ups(jlab_metadata: dict | None) -> list[str]:
+    """Get the parts to restart after (un)installing an extension.
+
+    Args:
+        jlab_metadata: The ``jupyterlab`` entry of the extension package.json
+    Returns:
+        The parts to restart among frontend, kernel and server
+    """
+    follow_ups = [
+        "frontend",
+    ]
+    if jlab_metadata is not None:
+        discovery = jlab_metadata.get("discovery", {})
+        if "kernel" in discovery:
+            follow_ups.append("kernel")
+        if "server" in discovery:
+            follow_ups.append("server")
+    return follow_ups
+
+
 # Known language packs from https://github.com/jupyterlab/language-packs
 # These are not tagged with the prebuilt extension classifier on PyPI,
 # so they are listed explicitly.
@@ -195,6 +285,53 @@ LANGUAGE_PACKS = (
 )
 
 
+DEFAULT_PRIORITY = 3
+"""Organization priority of packages not from Project Jupyter or the JupyterLab Community"""
+
+# Example extensions sorted after all others
+EXCLUDED_URLS = (
+    "https://github.com/jupyterlab/jupyterlab_apod",
+    "https://github.com/jupyterlab/extension-examples",
+)
+
+
+def _get_organization_priority(data: dict) -> int:
+    """Get the organization priority of a package from its metadata.
+
+    Args:
+        data: Package metadata
+    Returns:
+        1 for Project Jupyter, 2 for JupyterLab Community, 4 for examples and 3 for others
+    """
+    package_urls = data.get("project_urls") or {}
+    source_url = package_urls.get("Source Code")
+    homepage_url = data.get("home_page") or package_urls.get("Homepage")
+    best_guess_home_url = (
+        homepage_url
+        or data.get("project_url")
+        or data.get("package_url")
+        or data.get("docs_url")
+        or package_urls.get("Documentation")
+        or source_url
+        or data.get("bugtrack_url")
+        or package_urls.get("Bug Tracker")
+    )
+
+    urls_to_check = [
+        str(url).lower() for url in [source_url, homepage_url, best_guess_home_url] if url
+    ]
+    for url in urls_to_check:
+        if url in EXCLUDED_URLS:
+            return 4
+        if any(
+            org in url for org in ["github.com/jupyter/", "jupyter.org", "github.com/jupyterlab/"]
+        ):
+            return 1
+        elif "github.com/jupyterlab-contrib/" in url:
+            return 2
+    return DEFAULT_PRIORITY
+
+
 class PyPIExtensionManager(ExtensionManager):
     """Extension manager using pip as package manager and PyPi.org as packages source."""
 
@@ -214,6 +351,50 @@ class PyPIExtensionManager(ExtensionManager):
         help="Throttling time in seconds between PyPI requests using the XML-RPC API.",
     )
 
+    request_rate = CFloat(
+        10.0,
+        config=True,
+        help="""Maximal number of requests per second to PyPI, shared by all the PyPI
+        extension managers of the process. 0 to only back off when PyPI throttles.""",
+    )
+
+    request_burst = CInt(20, config=True, help="Maximal number of requests to PyPI sent at once.")
+
+    index_url = Unicode(
+        "",
+        config=True,
+        help="""URL or path of a JSON index of the available extensions, used instead of
+        querying PyPI; e.g. for a mirror or an air-gapped deployment. The document maps
+        the project names to their latest version: {"projects": {"name": "version"}}.""",
+    )
+
+    metadata_fetch_concurrency = CInt(
+        10, config=True, help="Maximal number of concurrent requests for packages metadata."
+    )
+
+    metadata_store_path = Unicode(
+        "",
+        config=True,
+        help="""Path of an SQLite database persisting the PyPI metadata (extensions list,
+        package metadata and latest versions) across server restarts and processes.
+        It can be shared by all the servers of a node. Disabled if empty.""",
+    )
+
+    metadata_store_ttl = CFloat(
+        60 * 60.0,
+        config=True,
+        help="""Time-to-live in seconds of the persisted PyPI metadata. Older entries are
+        only used if PyPI is unreachable.""",
+    )
+
+    installer = Enum(
+        ["pip", "uv", "auto"],
+        "pip",
+        config=True,
+        help="""Python package installer: "pip", "uv" to use uv pip (falling back to pip
+        if uv is not found) or "auto" to use uv if available and pip otherwise.""",
+    )
+
     def __init__(
         self,
         app_options: dict | None = None,
@@ -221,20 +402,38 @@ class PyPIExtensionManager(ExtensionManager):
         parent: config.Configurable | None = None,
     ) -> None:
         super().__init__(app_options, ext_options, parent)
-        self._httpx_client = httpx.AsyncClient(**_httpx_client_args)
+        self._installer = get_installer(self.installer, self.log)
+        self._rate_limiter = self._create_rate_limiter()
+        # Start time of the requests in flight, once admitted by the rate limiter
+        self._request_start: weakref.WeakKeyDictionary[httpx.Request, float] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._httpx_client = _AsyncClient(
+            self._after_request_error,
+            **_httpx_client_args,
+            event_hooks={"request": [self._before_request], "response": [self._after_response]},
+        )
         # Set configurable cache size to fetch function
         self._fetch_package_metadata = partial(_fetch_package_metadata, self._httpx_client)
         self._observe_package_metadata_cache_size({"new": self.package_metadata_cache_size})
-        # Combine XML RPC API and JSON API to reduce throttling by PyPI.org
-        self._rpc_client = xmlrpc.client.ServerProxy(
-            self.base_url, transport=xmlrpc_transport_override
-        )
+        self._index_source = self._create_index_source()
         self.__last_all_packages_request_time = datetime.now(tz=timezone.utc) - timedelta(
             seconds=self.cache_timeout * 1.01
         )
-        self.__all_packages_cache = None
+        self.__index: IndexSnapshot | None = None
+        self._index_flight = SingleFlight()
+        # Search index over the latest version of the listed packages
+        self._search_index = SearchIndex(DEFAULT_PRIORITY)
+        # Packages (name, version) whose metadata are in the search index
+        self._indexed_metadata: set[tuple[str, str]] = set()
+        self._index_task: asyncio.Task | None = None
+        self._metadata_store = (
+            MetadataStore(self.metadata_store_path, self.metadata_store_ttl, self.log)
+            if self.metadata_store_path
+            else None
+        )
 
-        self.log.debug(f"Extensions list will be fetched from {self.base_url}.")
+        self.log.debug(f"Extensions list will be fetched from {self._index_source.location}.")
         if xmlrpc_transport_override:
             self.log.info(
                 f"Extensions will be fetched using proxy, proxy host and port: {xmlrpc_transport_override.proxy}"
@@ -245,6 +444,37 @@ class PyPIExtensionManager(ExtensionManager):
         """Extension manager metadata."""
         return ExtensionManagerMetadata("PyPI", True, sys.prefix)
 
+    @property
+    def rate_limiter_metrics(self) -> RateLimiterMetrics:
+        """Metrics of the rate limiter of the requests to PyPI."""
+        return self._rate_limiter.metrics
+
+    async def _before_request(self, request: httpx.Request) -> None:
+        """Wait for the rate limiter admission of a request."""
+        await self._rate_limiter.acquire()
+        self._request_start[request] = time.monotonic()
+
+    async def _after_response(self, response: httpx.Response) -> None:
+        """Record the request duration and report throttling responses to the rate limiter."""
+        start = self._request_start.pop(response.request, None)
+        if start is not None:
+            PYPI_REQUEST_DURATION_SECONDS.labels(manager=self.metadata.name, api="json").observe(
+                time.monotonic() - start
+            )
+        if response.status_code in (429, 503):
+            PYPI_THROTTLED_TOTAL.labels(manager=self.metadata.name, api="json").inc()
+            retry_after = response.headers.get("Retry-After", "")
+            self._rate_limiter.throttled(float(retry_after) if retry_after.isdigit() else None)
+        elif response.status_code < 500:  # noqa PLR2004
+            self._rate_limiter.succeeded()
+
+    def _after_request_error(self, error: httpx.RequestError) -> None:
+        """Report the requests failing to get a response to the rate limiter to back off."""
+        with contextlib.suppress(RuntimeError):
+            # The request is not set on errors raised before it is built
+            self._request_start.pop(error.request, None)
+        self._rate_limiter.failed()
+
     @override
     async def is_install_allowed(self, name: str, version: str | None = None) -> bool:
         try:
@@ -276,6 +506,12 @@ class PyPIExtensionManager(ExtensionManager):
         Returns:
             The latest available version
         """
+        key = f"{self.base_url}/{pkg}"
+        stored = await self._get_stored("latest_version", key)
+        if stored is not None and stored[1]:
+            return stored[0]
+
+        version = None
         try:
             response = await self._httpx_client.get(
                 self.base_url + f"/{pkg}/json", headers={"Content-Type": "application/json"}
@@ -283,13 +519,48 @@ class PyPIExtensionManager(ExtensionManager):
 
             if response.status_code < 400:  # noqa PLR2004
                 data = json.loads(response.content).get("info", {})
+                version = ExtensionManager.get_semver_version(data.get("version", "")) or None
             else:
                 self.log.debug(f"Failed to get package information on PyPI; {response!s}")
-                return None
-        except Exception:
+        except Exception as e:
+            self.log.debug(f"Failed to get package information on PyPI for {pkg}.", exc_info=e)
+
+        if version is not None:
+            await self._set_stored("latest_version", key, version)
+            return version
+        # Fall back on the stored version if PyPI is unreachable
+        return stored[0] if stored is not None else None
+
+    async def _get_stored(self, namespace: str, key: str) -> tuple[Any, bool] | None:
+        """Get an entry of the persistent metadata store if it is enabled."""
+        if self._metadata_store is None:
             return None
-        else:
-            return ExtensionManager.get_semver_version(data.get("version", "")) or None
+        return await self._metadata_store.get(namespace, key)
+
+    async def _set_stored(self, namespace: str, key: str, value: Any) -> None:  # noqa: ANN401
+        """Set an entry of the persistent metadata store if it is enabled."""
+        if self._metadata_store is not None:
+            await self._metadata_store.set(namespace, key, value)
+
+    async def _get_stored_package_metadata(self, name: str, version: str) -> dict:
+        """Get the metadata of a package version from the store or PyPI.
+
+        Args:
+            name: Package name
+            version: Package version
+        Returns:
+            The package metadata; empty if unavailable
+        """
+        key = f"{self.base_url}/{name}/{version}"
+        stored = await self._get_stored("package_metadata", key)
+        if stored is not None:
+            # The metadata of a released version does not change.
+            return stored[0]
+
+        data = await self._fetch_package_metadata(name, version, self.base_url)
+        if data:
+            await self._set_stored("package_metadata", key, data)
+        return data
 
     def get_normalized_name(self, extension: ExtensionPackage) -> str:
         """Normalize extension name.
@@ -310,45 +581,6 @@ class PyPIExtensionManager(ExtensionManager):
                 return self._normalize_name(install_metadata["packageName"])
         return self._normalize_name(extension.name)
 
-    async def __throttleRequest(  # noqa: N802
-        self,
-        recursive: bool,
-        fn: Callable,
-        *args: Any,
-    ) -> Any:  # noqa: ANN401
-        """Throttle XMLRPC API request
-
-        Args:
-            recursive: Whether to call the throttling recursively once or not.
-            fn: API method to call
-            *args: API method arguments
-        Returns:
-            Result of the method
-        Raises:
-            xmlrpc.client.Fault
-        """
-        current_loop = tornado.ioloop.IOLoop.current()
-        try:
-            data = await current_loop.run_in_executor(None, fn, *args)
-        except xmlrpc.client.Fault as err:
-            if err.faultCode == -32500 and err.faultString.startswith(  # noqa PLR2004
-                "HTTPTooManyRequests:"
-            ):
-                delay = 1.01
-                match = re.search(r"Limit may reset in (\d+) seconds.", err.faultString)
-                if match is not None:
-                    delay = int(match.group(1) or "1")
-                self.log.info(
-                    f"HTTPTooManyRequests - Perform next call to PyPI XMLRPC API in {delay}s."
-                )
-                await asyncio.sleep(delay * self.rpc_request_throttling + 0.01)
-                if recursive:
-                    data = await self.__throttleRequest(False, fn, *args)
-                else:
-                    data = await current_loop.run_in_executor(None, fn, *args)
-
-        return data
-
     @observe("package_metadata_cache_size")
     def _observe_package_metadata_cache_size(self, change: dict[str, object]):
         self._fetch_package_metadata = alru_cache(maxsize=int(change["new"]))(
@@ -364,11 +596,17 @@ class PyPIExtensionManager(ExtensionManager):
             This will list the packages based on the classifier
                 Framework :: Jupyter :: JupyterLab :: Extensions :: Prebuilt
 
-            Then it filters it with the query and sorts by organization priority:
+            Then it searches it with the query (name, summary and keywords; exact,
+            prefix and approximate matches) and sorts by relevance, then by
+            organization priority:
             1. Project Jupyter (@jupyter)
             2. JupyterLab Community (@jupyterlab-contrib)
             3. Others
 
+            The packages summary, keywords and organization priority are indexed in
+            the background when the list is refreshed; the packages metadata are only
+            fetched for the requested page.
+
         Args:
             query: The search extension query
             page: The result page
@@ -377,133 +615,271 @@ class PyPIExtensionManager(ExtensionManager):
             The available extensions in a mapping {name: metadata}
             The results last page; None if the manager does not support pagination
         """
-        matches = await self.__get_all_extensions()
-
-        extensions = {}
-        all_matches = []
-
-        for name, group in groupby(filter(lambda m: query in m[0], matches), lambda e: e[0]):
-            _, latest_version = list(group)[-1]
-            data = await self._fetch_package_metadata(name, latest_version, self.base_url)
-
-            normalized_name = self._normalize_name(name)
-            package_urls = data.get("project_urls") or {}
-
-            source_url = package_urls.get("Source Code")
-            homepage_url = data.get("home_page") or package_urls.get("Homepage")
-            documentation_url = data.get("docs_url") or package_urls.get("Documentation")
-            bug_tracker_url = data.get("bugtrack_url") or package_urls.get("Bug Tracker")
-
-            best_guess_home_url = (
-                homepage_url
-                or data.get("project_url")
-                or data.get("package_url")
-                or documentation_url
-                or source_url
-                or bug_tracker_url
-            )
+        total_pages, packages = await self._search_packages(query, page, per_page)
+        page_packages = await asyncio.gather(*packages)
 
-            # Check Python version compatibility
-            requires_python = data.get("requires_python")
-            python_compatible, version_explanation = _check_python_version_compatible(
-                requires_python
-            )
+        extensions = {extension.name: extension for extension in page_packages}
 
-            description = data.get("summary")
-            if version_explanation:
-                if description:
-                    description += f" ({version_explanation})"
-                else:
-                    description = version_explanation
-
-            extension = ExtensionPackage(
-                name=normalized_name,
-                description=description,
-                homepage_url=best_guess_home_url,
-                author=data.get("author"),
-                license=data.get("license"),
-                latest_version=ExtensionManager.get_semver_version(latest_version),
-                pkg_type="prebuilt",
-                allowed=python_compatible,
-                bug_tracker_url=bug_tracker_url,
-                documentation_url=documentation_url,
-                package_manager_url=data.get("package_url"),
-                repository_url=source_url,
-            )
+        return extensions, total_pages
 
-            # Determine organization priority
-            priority = 3  # Default priority for other packages
-            urls_to_check = [
-                str(url).lower() for url in [source_url, homepage_url, best_guess_home_url] if url
-            ]
-            exclude = [
-                "https://github.com/jupyterlab/jupyterlab_apod",
-                "https://github.com/jupyterlab/extension-examples",
-            ]
+    async def iter_packages(
+        self, query: str, page: int, per_page: int
+    ) -> tuple[int | None, AsyncIterator[tuple[int, ExtensionPackage]]]:
+        """List the available extensions as soon as their metadata are fetched.
 
-            for url in urls_to_check:
-                if url in exclude:
-                    priority = 4
-                    break
-                if any(
-                    org in url
-                    for org in ["github.com/jupyter/", "jupyter.org", "github.com/jupyterlab/"]
-                ):
-                    priority = 1
-                    break
-                elif "github.com/jupyterlab-contrib/" in url:
-                    priority = 2
-                    break
+        Note:
+            The extensions are searched like ``list_packages``; they are yielded
+            in the order their metadata are fetched.
 
-            all_matches.append((priority, extension))
+        Args:
+            query: The search extension query
+            page: The result page
+            per_page: The number of results per page
+        Returns:
+            The results last page
+            The available extensions with their index in the page, in any order
+        """
+        total_pages, packages = await self._search_packages(query, page, per_page)
+
+        async def indexed(index: int, package: Awaitable) -> tuple[int, ExtensionPackage]:
+            return index, await package
+
+        async def iterate() -> AsyncIterator[tuple[int, ExtensionPackage]]:
+            tasks = [asyncio.ensure_future(indexed(*item)) for item in enumerate(packages)]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+        return total_pages, iterate()
+
+    async def _search_packages(
+        self, query: str, page: int, per_page: int
+    ) -> tuple[int, list[Awaitable[ExtensionPackage]]]:
+        """Search the available extensions.
 
-        sorted_matches = sorted(all_matches, key=lambda x: (x[0], x[1].name))
+        Args:
+            query: The search extension query
+            page: The result page
+            per_page: The number of results per page
+        Returns:
+            The results last page
+            The coroutines fetching the page extensions, in relevance order
+        """
+        await self._get_all_extensions()
+        matches = self._search_index.search(query)
+        missing = [
+            (m.name, m.version)
+            for m in matches
+            if (m.name, m.version) not in self._indexed_metadata
+        ]
+        if missing:
+            # The results are ranked by the organization priority found in the metadata
+            await self._index_metadata(missing)
+            matches = self._search_index.search(query)
 
         # Apply pagination
         start_idx = (page - 1) * per_page
         end_idx = start_idx + per_page
-        page_matches = sorted_matches[start_idx:end_idx]
+        page_matches = matches[start_idx:end_idx]
 
-        for _, extension in page_matches:
-            extensions[extension.name] = extension
+        semaphore = asyncio.Semaphore(max(1, self.metadata_fetch_concurrency))
 
-        total_pages = math.ceil(len(sorted_matches) / per_page)
+        async def get_package(name: str, latest_version: str) -> ExtensionPackage:
+            async with semaphore:
+                data = await self._get_package_metadata(name, latest_version)
+            return self._to_extension_package(name, latest_version, data)
 
-        return extensions, total_pages
+        total_pages = math.ceil(len(matches) / per_page)
+        return total_pages, [get_package(m.name, m.version) for m in page_matches]
 
-    async def __get_all_extensions(self) -> list[tuple[str, str]]:
-        if self.__all_packages_cache is None or datetime.now(
-            tz=timezone.utc
-        ) > self.__last_all_packages_request_time + timedelta(seconds=self.cache_timeout):
-            self.log.debug("Requesting PyPI.org RPC API for prebuilt JupyterLab extensions.")
-            self.__all_packages_cache = await self.__throttleRequest(
-                True,
-                self._rpc_client.browse,
-                ["Framework :: Jupyter :: JupyterLab :: Extensions :: Prebuilt"],
-            )
+    def _to_extension_package(self, name: str, latest_version: str, data: dict) -> ExtensionPackage:
+        """Convert PyPI package metadata to an extension package.
 
-            # Also include known language packs.  They are not tagged with the
-            # prebuilt extension classifier so we fetch their latest versions
-            # from the JSON API instead.
-            extension_names = {p[0] for p in self.__all_packages_cache}
-            packs_to_fetch = [name for name in LANGUAGE_PACKS if name not in extension_names]
-            language_pack_results = await asyncio.gather(
-                *(self.get_latest_version(name) for name in packs_to_fetch),
-                return_exceptions=True,
-            )
-            for name, result in zip(packs_to_fetch, language_pack_results, strict=True):
-                if isinstance(result, Exception):
-                    self.log.info(
-                        "Failed to fetch latest version for language pack %s: %s",
-                        name,
-                        result,
-                    )
-                elif result is not None:
-                    self.__all_packages_cache.append((name, result))
+        Args:
+            name: Package name
+            latest_version: Package latest version
+            data: Package metadata
+        Returns:
+            The extension package
+        """
+        normalized_name = self._normalize_name(name)
+        package_urls = data.get("project_urls") or {}
+
+        source_url = package_urls.get("Source Code")
+        homepage_url = data.get("home_page") or package_urls.get("Homepage")
+        documentation_url = data.get("docs_url") or package_urls.get("Documentation")
+        bug_tracker_url = data.get("bugtrack_url") or package_urls.get("Bug Tracker")
+
+        best_guess_home_url = (
+            homepage_url
+            or data.get("project_url")
+            or data.get("package_url")
+            or documentation_url
+            or source_url
+            or bug_tracker_url
+        )
+
+        # Check Python version compatibility
+        requires_python = data.get("requires_python")
+        python_compatible, version_explanation = _check_python_version_compatible(requires_python)
 
-            self.__last_all_packages_request_time = datetime.now(tz=timezone.utc)
+        description = data.get("summary")
+        if version_explanation:
+            if description:
+                description += f" ({version_explanation})"
+            else:
+                description = version_explanation
+
+        return ExtensionPackage(
+            name=normalized_name,
+            description=description,
+            homepage_url=best_guess_home_url,
+            author=data.get("author"),
+            license=data.get("license"),
+            latest_version=ExtensionManager.get_semver_version(latest_version),
+            pkg_type="prebuilt",
+            allowed=python_compatible,
+            bug_tracker_url=bug_tracker_url,
+            documentation_url=documentation_url,
+            package_manager_url=data.get("package_url"),
+            repository_url=source_url,
+        )
 
-        return self.__all_packages_cache
+    async def _get_package_metadata(self, name: str, version: str) -> dict:
+        """Get the metadata of a package version.
+
+        The package entry of the search index is updated from it.
+
+        Args:
+            name: Package name
+            version: Package version
+        Returns:
+            The package metadata; empty if unavailable
+        """
+        data = await self._get_stored_package_metadata(name, version)
+        if data:
+            indexed = self._search_index.get(name)
+            if indexed is not None and indexed.version == version:
+                self._search_index.add(
+                    name,
+                    version,
+                    summary=data.get("summary"),
+                    keywords=data.get("keywords"),
+                    priority=_get_organization_priority(data),
+                )
+                self._indexed_metadata.add((name, version))
+        return data
+
+    def _index_packages(self, latest_versions: dict[str, str]) -> None:
+        """Update the search index with the listed packages.
+
+        Packages with a new latest version are re-indexed by name only, keeping
+        their organization priority; their metadata are indexed in the background,
+        or before ranking the search results matching them.
+
+        Args:
+            latest_versions: Latest version per listed package
+        """
+        for name in [name for name in self._search_index if name not in latest_versions]:
+            self._search_index.remove(name)
+        for name, version in latest_versions.items():
+            indexed = self._search_index.get(name)
+            if indexed is None or indexed.version != version:
+                self._search_index.add(
+                    name, version, priority=indexed.priority if indexed is not None else None
+                )
+        self._indexed_metadata.intersection_update(latest_versions.items())
+
+        missing = [p for p in latest_versions.items() if p not in self._indexed_metadata]
+        self._schedule_index_metadata(missing)
+
+    def _schedule_index_metadata(self, packages: list[tuple[str, str]]) -> None:
+        """Index in the background the metadata of the packages."""
+        if self._index_task is not None and not self._index_task.done():
+            self._index_task.cancel()
+        if packages:
+            self._index_task = asyncio.ensure_future(self.__fetch_index_metadata(packages))
+
+    async def __fetch_index_metadata(self, packages: list[tuple[str, str]]) -> None:
+        # Let the interactive requests go first
+        request_priority.set(Priority.BACKGROUND)
+        await self._index_metadata(packages)
+
+    async def _index_metadata(self, packages: list[tuple[str, str]]) -> None:
+        """Index the metadata of the packages; the failures are ignored."""
+        semaphore = asyncio.Semaphore(max(1, self.metadata_fetch_concurrency))
+
+        async def fetch(name: str, version: str) -> None:
+            async with semaphore:
+                try:
+                    await self._get_package_metadata(name, version)
+                except Exception as e:
+                    self.log.debug(f"Failed to get metadata of {name}.", exc_info=e)
+
+        await asyncio.gather(*(fetch(name, version) for name, version in packages))
+
+    def _create_rate_limiter(self) -> RateLimiter:
+        """Get the rate limiter of the package index requests."""
+        return get_rate_limiter(
+            urlparse(self.base_url).netloc or self.base_url,
+            self.request_rate,
+            self.request_burst,
+        )
+
+    def _create_index_source(self) -> IndexSource:
+        """Create the source of the available extensions index."""
+        if self.index_url:
+            return JSONIndexSource(self.index_url, self._httpx_client)
+        # Combine XML RPC API and JSON API to reduce throttling by PyPI.org
+        return PyPIIndexSource(
+            self.base_url,
+            self._httpx_client,
+            xmlrpc.client.ServerProxy(self.base_url, transport=xmlrpc_transport_override),
+            extra_projects=LANGUAGE_PACKS,
+            throttling=self.rpc_request_throttling,
+            logger=self.log,
+            rate_limiter=self._rate_limiter,
+        )
+
+    async def _get_all_extensions(self) -> dict[str, str]:
+        """Get the latest version per listed extension, refreshing the outdated index."""
+        if self.__index is None or datetime.now(
+            tz=timezone.utc
+        ) > self.__last_all_packages_request_time + timedelta(seconds=self.cache_timeout):
+            # Concurrent requests share the same update
+            await self._index_flight.do(None, self.__update_index)
+
+        return self.__index.projects
+
+    async def __update_index(self) -> None:
+        location = self._index_source.location
+        stored = await self._get_stored("listing", location)
+        if stored is not None and stored[1]:
+            index = IndexSnapshot(dict(stored[0]))
+            if self.__index is not None and self.__index.projects == index.projects:
+                index = self.__index
+        else:
+            try:
+                index = await self._index_source.fetch(self.__index)
+            except Exception as e:
+                if self.__index is None and stored is None:
+                    raise
+                self.log.warning(
+                    "Failed to fetch the extensions list; using the last known one.",
+                    exc_info=e,
+                )
+                index = self.__index or IndexSnapshot(dict(stored[0]))
+            else:
+                await self._set_stored("listing", location, index.projects)
+
+        self.__last_all_packages_request_time = datetime.now(tz=timezone.utc)
+        if index is not self.__index:
+            # Only the changed projects are re-indexed
+            self.__index = index
+            self._index_packages(index.projects)
 
     async def install(self, name: str, version: Optional[str] = None) -> ActionResult:  # noqa
         """Install the required extension.
@@ -523,7 +899,58 @@ class PyPIExtensionManager(ExtensionManager):
             # is_install_allowed will log the reason
             return ActionResult(status="error", message="install is not allowed")
 
-        current_loop = tornado.ioloop.IOLoop.current()
+        result = await self._pip_install([f"{name}=={version}" if version is not None else name])
+        error = self._installer.error_message(result)
+        if result.returncode == 0:
+            follow_ups = await self._get_install_follow_ups(name)
+            return ActionResult(status="ok", needs_restart=follow_ups)
+        else:
+            self.log.error(f"Failed to install {name}: code {result.returncode}\n{error}")
+            return ActionResult(status="error", message=error)
+
+    @override
+    async def install_many(self, extensions: dict[str, str | None]) -> BatchActionResult:
+        """Install many extensions with a single installer resolution.
+
+        Args:
+            extensions: Version to install per extension name; None for the latest possible
+        Returns:
+            The batch result
+        """
+        results = {}
+        requirements = {}
+        for name, version in extensions.items():
+            if await self.is_install_allowed(name, version):
+                requirements[name] = f"{name}=={version}" if version is not None else name
+            else:
+                # is_install_allowed will log the reason
+                results[name] = ActionResult(status="error", message="install is not allowed")
+
+        if requirements:
+            result = await self._pip_install(list(requirements.values()))
+            error = self._installer.error_message(result)
+            if result.returncode == 0:
+                for name in requirements:
+                    results[name] = ActionResult(
+                        status="ok", needs_restart=await self._get_install_follow_ups(name)
+                    )
+            else:
+                self.log.error(
+                    f"Failed to install {', '.join(requirements)}: code {result.returncode}\n{error}"
+                )
+                for name in requirements:
+                    results[name] = ActionResult(status="error", message=error)
+
+        return BatchActionResult.merge({name: results[name] for name in extensions})
+
+    async def _pip_install(self, requirements: list[str]) -> CompletedProcess:
+        """Install requirements, constrained by the current JupyterLab version.
+
+        Args:
+            requirements: pip requirements
+        Returns:
+            The completed installer process
+        """
         with (
             tempfile.TemporaryDirectory() as ve_dir,
             tempfile.NamedTemporaryFile(mode="w+", dir=ve_dir, delete=False) as fconstraint,
@@ -531,106 +958,42 @@ class PyPIExtensionManager(ExtensionManager):
             fconstraint.write(f"jupyterlab=={__version__}")
             fconstraint.flush()
 
-            cmdline = [
-                sys.executable,
-                "-m",
-                "pip",
-                "install",
-                "--no-input",
-                "--quiet",
-                "--progress-bar",
-                "off",
-                "--constraint",
-                fconstraint.name,
-            ]
-            if version is not None:
-                cmdline.append(f"{name}=={version}")
-            else:
-                cmdline.append(name)
+            cmdline = self._installer.install_command(
+                requirements, fconstraint.name, self._get_pip_install_options()
+            )
 
-            pkg_action = {}
-            try:
-                tmp_cmd = cmdline.copy()
-                tmp_cmd.insert(-1, "--dry-run")
-                tmp_cmd.insert(-1, "--report")
-                tmp_cmd.insert(-1, "-")
-                result = await current_loop.run_in_executor(
-                    None, partial(run, tmp_cmd, capture_output=True, check=True)
-                )
+            self.log.debug(f"Executing '{' '.join(cmdline)}'")
+            result = await self._run_pip(cmdline)
 
-                action_info = json.loads(result.stdout.decode("utf-8"))
-                pkg_action = next(
-                    filter(
-                        lambda p: p.get("metadata", {}).get("name") == name.replace("_", "-"),
-                        action_info.get("install", []),
-                    )
-                )
-            except CalledProcessError as e:
-                self.log.debug(f"Fail to get installation report: {e.stderr}", exc_info=e)
-            except Exception as err:
-                self.log.debug("Fail to get installation report.", exc_info=err)
-            else:
-                self.log.debug(f"Actions to be executed by pip {json.dumps(action_info)}.")
+        self.log.debug(f"return code: {result.returncode}")
+        self.log.debug(f"stdout: {result.stdout.decode('utf-8')}")
+        if result.returncode == 0:
+            self.log.debug(f"stderr: {result.stderr.decode('utf-8')}")
+        return result
 
-            self.log.debug(f"Executing '{' '.join(cmdline)}'")
+    def _get_pip_install_options(self) -> list[str]:
+        """Get the additional install options, e.g. the packages source."""
+        return []
 
-            result = await current_loop.run_in_executor(
-                None, partial(run, cmdline, capture_output=True)
-            )
+    async def _get_install_follow_ups(self, name: str) -> list[str]:
+        """Get the parts to restart when (un)installing an installed extension.
 
-            self.log.debug(f"return code: {result.returncode}")
-            self.log.debug(f"stdout: {result.stdout.decode('utf-8')}")
-            error = result.stderr.decode("utf-8")
-            if result.returncode == 0:
-                self.log.debug(f"stderr: {error}")
-                # Figure out if the package has server or kernel parts
-                jlab_metadata = None
-                try:
-                    download_url: str = pkg_action.get("download_info", {}).get("url")
-                    if download_url is not None:
-                        response = await self._httpx_client.get(download_url)
-                        if response.status_code < 400:  # noqa PLR2004
-                            if download_url.endswith(".whl"):
-                                with ZipFile(io.BytesIO(response.content)) as wheel:
-                                    for filename in filter(
-                                        lambda f: Path(f).name == "package.json",
-                                        wheel.namelist(),
-                                    ):
-                                        data = json.loads(wheel.read(filename))
-                                        jlab_metadata = data.get("jupyterlab")
-                                        if jlab_metadata is not None:
-                                            break
-                            elif download_url.endswith("tar.gz"):
-                                with TarFile(io.BytesIO(response.content)) as sdist:
-                                    for filename in filter(
-                                        lambda f: Path(f).name == "package.json",
-                                        sdist.getnames(),
-                                    ):
-                                        data = json.load(
-                                            sdist.extractfile(sdist.getmember(filename))
-                                        )
-                                        jlab_metadata = data.get("jupyterlab")
-                                        if jlab_metadata is not None:
-                                            break
-                        else:
-                            self.log.debug(f"Failed to get '{download_url}'; {response!s}")
-                except Exception as e:
-                    self.log.debug("Fail to get package.json.", exc_info=e)
-
-                follow_ups = [
-                    "frontend",
-                ]
-                if jlab_metadata is not None:
-                    discovery = jlab_metadata.get("discovery", {})
-                    if "kernel" in discovery:
-                        follow_ups.append("kernel")
-                    if "server" in discovery:
-                        follow_ups.append("server")
-
-                return ActionResult(status="ok", needs_restart=follow_ups)
-            else:
-                self.log.error(f"Failed to install {name}: code {result.returncode}\n{error}")
-                return ActionResult(status="error", message=error)
+        The package server or kernel parts are figured out from the installed
+        files rather than by downloading the package again.
+
+        Args:
+            name: Installed distribution name
+        Returns:
+            The parts to restart
+        """
+        jlab_metadata = None
+        try:
+            jlab_metadata = await asyncio.get_running_loop().run_in_executor(
+                None, _get_installed_jupyterlab_metadata, name
+            )
+        except Exception as e:
+            self.log.debug("Fail to get package.json.", exc_info=e)
+        return _get_follow_ups(jlab_metadata)
 
     async def uninstall(self, extension: str) -> ActionResult:
         """Uninstall the required extension.
@@ -645,66 +1008,143 @@ class PyPIExtensionManager(ExtensionManager):
         Returns:
             The action result
         """
-        current_loop = tornado.ioloop.IOLoop.current()
-        cmdline = [
-            sys.executable,
-            "-m",
-            "pip",
-            "uninstall",
-            "--yes",
-            "--no-input",
-            extension,
-        ]
+        cmdline = self._installer.uninstall_command([extension])
 
-        # Figure out if the package has server or kernel parts
-        jlab_metadata = None
-        try:
-            tmp_cmd = cmdline.copy()
-            tmp_cmd.remove("--yes")
-            result = await current_loop.run_in_executor(
-                None, partial(run, tmp_cmd, capture_output=True)
-            )
-            lines = filter(
-                lambda line: line.endswith("package.json"),
-                map(lambda line: line.strip(), result.stdout.decode("utf-8").splitlines()),  # noqa
-            )
-            for filepath in filter(
-                lambda f: f.name == "package.json",
-                map(Path, lines),
-            ):
-                data = json.loads(filepath.read_bytes())
-                jlab_metadata = data.get("jupyterlab")
-                if jlab_metadata is not None:
-                    break
-        except Exception as e:
-            self.log.debug("Fail to list files to be uninstalled.", exc_info=e)
+        # Figure out if the package has server or kernel parts from its
+        # installed files; they must be read before being removed
+        follow_ups = await self._get_install_follow_ups(extension)
 
         self.log.debug(f"Executing '{' '.join(cmdline)}'")
 
-        result = await current_loop.run_in_executor(
-            None, partial(run, cmdline, capture_output=True)
-        )
+        result = await self._run_pip(cmdline)
 
         self.log.debug(f"return code: {result.returncode}")
         self.log.debug(f"stdout: {result.stdout.decode('utf-8')}")
-        error = result.stderr.decode("utf-8")
+        error = self._installer.error_message(result)
         if result.returncode == 0:
             self.log.debug(f"stderr: {error}")
-            follow_ups = [
-                "frontend",
-            ]
-            if jlab_metadata is not None:
-                discovery = jlab_metadata.get("discovery", {})
-                if "kernel" in discovery:
-                    follow_ups.append("kernel")
-                if "server" in discovery:
-                    follow_ups.append("server")
-
             return ActionResult(status="ok", needs_restart=follow_ups)
         else:
-            self.log.error(f"Failed to installed {extension}: code {result.returncode}\n{error}")
+            self.log.error(f"Failed to uninstall {extension}: code {result.returncode}\n{error}")
             return ActionResult(status="error", message=error)
 
+    @override
+    async def uninstall_many(self, extensions: list[str]) -> BatchActionResult:
+        """Uninstall many extensions with a single installer invocation.
+
+        Args:
+            extensions: The extension names
+        Returns:
+            The batch result
+        """
+        # The follow-ups must be read before the files are removed
+        follow_ups = {name: await self._get_install_follow_ups(name) for name in extensions}
+        cmdline = self._installer.uninstall_command(extensions)
+        self.log.debug(f"Executing '{' '.join(cmdline)}'")
+        result = await self._run_pip(cmdline)
+
+        self.log.debug(f"return code: {result.returncode}")
+        self.log.debug(f"stdout: {result.stdout.decode('utf-8')}")
+        error = self._installer.error_message(result)
+        if result.returncode == 0:
+            results = {
+                name: ActionResult(status="ok", needs_restart=follow_ups[name])
+                for name in extensions
+            }
+        else:
+            self.log.error(
+                f"Failed to uninstall {', '.join(extensions)}: code {result.returncode}\n{error}"
+            )
+            results = {name: ActionResult(status="error", message=error) for name in extensions}
+        return BatchActionResult.merge(results)
+
+    async def _run_pip(self, cmdline: list[str], report: bool = True) -> CompletedProcess:
+        """Run an installer command in a subprocess.
+
+        The output lines are reported to the job being executed, if any. If the
+        caller is cancelled, the subprocess is terminated.
+
+        Args:
+            cmdline: Command line
+            report: Whether to report the output to the current job
+        Returns:
+            The completed process, with its captured output
+        """
+        job = current_job.get() if report else None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmdline, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except NotImplementedError:
+            # The event loop does not support subprocesses, e.g. the selector
+            # event loop used by Jupyter Server on Windows
+            return await self._run_pip_in_thread(cmdline, job)
+
+        async def read(stream: asyncio.StreamReader) -> bytes:
+            output = []
+            async for line in stream:
+                output.append(line)
+                if job is not None:
+                    job.output(line.decode("utf-8", errors="replace").rstrip())
+            return b"".join(output)
+
+        try:
+            stdout, stderr = await asyncio.gather(read(process.stdout), read(process.stderr))
+            returncode = await process.wait()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                self.log.info(f"Terminating '{' '.join(cmdline)}'")
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), 5)
+                except asyncio.TimeoutError:
+                    process.kill()
+            raise
+
+        return CompletedProcess(cmdline, returncode, stdout, stderr)
+
+    async def _run_pip_in_thread(
+        self, cmdline: list[str], job: ExtensionJob | None
+    ) -> CompletedProcess:
+        """Run an installer command in a subprocess waited for by worker threads.
+
+        Args:
+            cmdline: Command line
+            job: Job to report the output lines to, if any
+        Returns:
+            The completed process, with its captured output
+        """
+        loop = asyncio.get_running_loop()
+        process = Popen(cmdline, stdout=PIPE, stderr=PIPE)  # noqa: S603
+
+        def read(stream: IO[bytes]) -> bytes:
+            output = []
+            for line in iter(stream.readline, b""):
+                output.append(line)
+                if job is not None:
+                    loop.call_soon_threadsafe(
+                        job.output, line.decode("utf-8", errors="replace").rstrip()
+                    )
+            stream.close()
+            return b"".join(output)
+
+        try:
+            stdout, stderr = await asyncio.gather(
+                asyncio.to_thread(read, process.stdout), asyncio.to_thread(read, process.stderr)
+            )
+            returncode = await asyncio.to_thread(process.wait)
+        except asyncio.CancelledError:
+            if process.poll() is None:
+                self.log.info(f"Terminating '{' '.join(cmdline)}'")
+                process.terminate()
+                try:
+                    await asyncio.to_thread(process.wait, 5)
+                except TimeoutExpired:
+                    process.kill()
+            raise
+
+        return CompletedProcess(cmdline, returncode, stdout, stderr)
+
     def _normalize_name(self, name: str) -> str:
         """Normalize extension name.
 
@@ -0,0 +1,243 @@
+"""Rate limiter shared by the requests to a package index."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Request priority; lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+"""Priority of the requests made in the current context.
+
+Background tasks set it to ``Priority.BACKGROUND`` so that their requests
+are admitted after the interactive ones.
+"""
+
+# Minimal delay in seconds before retrying admission while waiting
+_MIN_WAIT = 0.005
+
+
+@dataclass(frozen=True)
+class RateLimiterMetrics:
+    """Rate limiter metrics snapshot.
+
+    Attributes:
+        rate: Admitted requests per second; 0 if unlimited
+        burst: Maximal number of requests admitted at once
+        admitted: Number of admitted requests
+        delayed: Number of requests that waited for admission
+        wait_time: Cumulated waiting time in seconds
+        throttled: Number of throttling responses reported by the index
+        backoff: Current backoff delay in seconds
+    """
+
+    rate: float
+    burst: int
+    admitted: int = 0
+    delayed: int = 0
+    wait_time: float = 0.0
+    throttled: int = 0
+    backoff: float = 0.0
+
+
+class RateLimiter:
+    """Token bucket rate limiter with priorities and adaptive backoff.
+
+    Requests await :ref:`acquire` before being sent. Tokens are refilled at
+    ``rate`` per second up to ``burst``; waiting requests are admitted by
+    priority, then in arrival order; only the first waiter polls for tokens,
+    the others are woken up when it is admitted. When the index reports
+    throttling or a request fails, the admission is paused for the requested
+    delay or an exponential backoff, which is halved by each successful response.
+
+    The limiter is not bound to an event loop.
+
+    Args:
+        rate: Admitted requests per second; 0 to only apply the backoff
+        burst: Maximal number of requests admitted at once
+        max_backoff: Maximal backoff delay in seconds
+    """
+
+    def __init__(self, rate: float = 0.0, burst: int = 1, max_backoff: float = 60.0) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        # Event loop and wake-up event per waiter
+        self._wakeups: dict[tuple[int, int], tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        self._counter = itertools.count()
+        self._admitted = 0
+        self._delayed = 0
+        self._wait_time = 0.0
+        self._throttled = 0
+
+    @property
+    def metrics(self) -> RateLimiterMetrics:
+        """Snapshot of the rate limiter metrics."""
+        with self._lock:
+            return RateLimiterMetrics(
+                rate=self.rate,
+                burst=self.burst,
+                admitted=self._admitted,
+                delayed=self._delayed,
+                wait_time=self._wait_time,
+                throttled=self._throttled,
+                backoff=self._backoff,
+            )
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Update the rate and the burst size."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.burst = max(1, burst)
+            self._tokens = min(self._tokens, self.burst)
+
+    async def acquire(self, priority: Priority | None = None) -> None:
+        """Wait until a request can be sent.
+
+        Args:
+            priority: [optional] Request priority; default to the context one
+        """
+        if priority is None:
+            priority = request_priority.get()
+        entry = (int(priority), next(self._counter))
+        wakeup = asyncio.Event()
+        start = time.monotonic()
+        with self._lock:
+            heapq.heappush(self._waiters, entry)
+            self._wakeups[entry] = (asyncio.get_running_loop(), wakeup)
+        try:
+            while True:
+                delay = self._try_admit(entry)
+                if delay is None:
+                    break
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(wakeup.wait(), None if delay == math.inf else delay)
+                wakeup.clear()
+        except BaseException:
+            with self._lock:
+                self._wakeups.pop(entry, None)
+                if entry in self._waiters:
+                    first = self._waiters[0] == entry
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    if first:
+                        self._wake_first()
+            raise
+
+        waited = time.monotonic() - start
+        if waited > _MIN_WAIT:
+            with self._lock:
+                self._delayed += 1
+                self._wait_time += waited
+
+    def throttled(self, retry_after: float | None = None) -> None:
+        """Report a throttling response of the index.
+
+        Args:
+            retry_after: [optional] Delay in seconds requested by the index
+        """
+        with self._lock:
+            self._throttled += 1
+            self._back_off(retry_after)
+
+    def failed(self) -> None:
+        """Report a request that failed to get a response, e.g. a connection error."""
+        with self._lock:
+            self._back_off(None)
+
+    def succeeded(self) -> None:
+        """Report a successful response of the index."""
+        with self._lock:
+            self._backoff = self._backoff / 2 if self._backoff >= 2.0 else 0.0  # noqa PLR2004
+
+    def _back_off(self, retry_after: float | None) -> None:
+        self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+        delay = self._backoff if retry_after is None else retry_after
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self._tokens = 0.0
+
+    def _wake_first(self) -> None:
+        """Wake up the first waiter, which polls for admission."""
+        if self._waiters:
+            loop, wakeup = self._wakeups[self._waiters[0]]
+            with contextlib.suppress(RuntimeError):
+                # The waiter event loop may be closed
+                loop.call_soon_threadsafe(wakeup.set)
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._updated = now
+
+    def _try_admit(self, entry: tuple[int, int]) -> float | None:
+        """Admit the entry if possible, otherwise return the delay before retrying.
+
+        The delay is infinite for an entry that is not the first waiter: it is
+        woken up once it becomes the first one.
+        """
+        with self._lock:
+            if self._waiters[0] != entry:
+                # Let the waiters with a higher priority go first
+                return math.inf
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return max(_MIN_WAIT, self._paused_until - now)
+            if self._tokens < 1:
+                return max(_MIN_WAIT, (1 - self._tokens) / self.rate)
+            heapq.heappop(self._waiters)
+            del self._wakeups[entry]
+            self._tokens -= 1
+            self._admitted += 1
+            self._wake_first()
+            return None
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate: float, burst: int) -> RateLimiter:
+    """Get the process-wide rate limiter of an index.
+
+    Args:
+        key: Index identifier, e.g. its host name
+        rate: Admitted requests per second; 0 to only apply the backoff
+        burst: Maximal number of requests admitted at once
+    Returns:
+        The rate limiter shared by all the requests to the index
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(rate, burst)
+        elif (limiter.rate, limiter.burst) != (rate, max(1, burst)):
+            limiter.configure(rate, burst)
+        return limiter
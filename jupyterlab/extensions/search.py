@@ -0,0 +1,284 @@
+"""In-memory search index for the extensions discovery."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+_TOKEN_SEPARATOR = re.compile(r"[^a-z0-9]+")
+
+# Score of a query token per matched field and match kind
+_SCORES = {
+    ("name", "exact"): 10.0,
+    ("name", "prefix"): 6.0,
+    ("name", "fuzzy"): 3.0,
+    ("keywords", "exact"): 4.0,
+    ("keywords", "prefix"): 3.0,
+    ("keywords", "fuzzy"): 1.0,
+    ("summary", "exact"): 2.0,
+    ("summary", "prefix"): 1.0,
+    ("summary", "fuzzy"): 0.5,
+}
+# Score of a query found as is in the package name
+_SUBSTRING_SCORE = 5.0
+# Minimal Dice coefficient between trigrams sets for a fuzzy match
+_FUZZY_THRESHOLD = 0.6
+# Minimal token length for a fuzzy match
+_FUZZY_MIN_LENGTH = 4
+
+
+def normalize(text: str) -> str:
+    """Normalize a text for indexing: lower case with single dashes as separator."""
+    return "-".join(tokenize(text))
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text in lower case alphanumeric tokens."""
+    return [token for token in _TOKEN_SEPARATOR.split(text.lower()) if token]
+
+
+def trigrams(token: str) -> set[str]:
+    """Get the trigrams of a token padded with ``$``."""
+    padded = f"${token}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class IndexedPackage:
+    """Indexed package.
+
+    Attributes:
+        name: Package name
+        version: Package latest version
+        normalized_name: Normalized package name
+        priority: Organization priority (lower first)
+        fields: Tokens per indexed field
+    """
+
+    name: str
+    version: str
+    normalized_name: str
+    priority: int
+    fields: dict[str, set[str]] = field(default_factory=dict)
+
+
+class SearchIndex:
+    """Token and trigram index over the packages name, summary and keywords.
+
+    Queries are split in tokens; a package matches if each query token matches
+    one of its tokens exactly, as a prefix or approximately (trigram similarity),
+    or if the whole query is found in its name. Results are ranked by relevance,
+    then organization priority, then name.
+
+    Args:
+        default_priority: Organization priority of packages without metadata
+    """
+
+    def __init__(self, default_priority: int = 3) -> None:
+        self.default_priority = default_priority
+        self._packages: dict[str, IndexedPackage] = {}
+        # token -> field -> package names
+        self._postings: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))
+        # trigram -> tokens
+        self._token_trigrams: dict[str, set[str]] = defaultdict(set)
+        # token -> number of trigrams
+        self._trigrams_count: dict[str, int] = {}
+        # trigram -> package names, to find substrings of names
+        self._name_trigrams: dict[str, set[str]] = defaultdict(set)
+        self._vocabulary: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._packages
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._packages)
+
+    def get(self, name: str) -> IndexedPackage | None:
+        """Get an indexed package."""
+        return self._packages.get(name)
+
+    def add(
+        self,
+        name: str,
+        version: str,
+        summary: str | None = None,
+        keywords: str | list[str] | None = None,
+        priority: int | None = None,
+    ) -> None:
+        """Add or replace a package in the index.
+
+        Args:
+            name: Package name
+            version: Package latest version
+            summary: [optional] Package summary
+            keywords: [optional] Package keywords
+            priority: [optional] Package organization priority
+        """
+        if name in self._packages:
+            self.remove(name)
+
+        if isinstance(keywords, list):
+            keywords = " ".join(keywords)
+        normalized_name = normalize(name)
+        package = IndexedPackage(
+            name=name,
+            version=version,
+            normalized_name=normalized_name,
+            priority=self.default_priority if priority is None else priority,
+            fields={
+                "name": set(tokenize(name)),
+                "keywords": set(tokenize(keywords or "")),
+                "summary": set(tokenize(summary or "")),
+            },
+        )
+        self._packages[name] = package
+
+        for field_name, tokens in package.fields.items():
+            for token in tokens:
+                if token not in self._postings:
+                    self._vocabulary = None
+                    token_trigrams = trigrams(token)
+                    self._trigrams_count[token] = len(token_trigrams)
+                    for trigram in token_trigrams:
+                        self._token_trigrams[trigram].add(token)
+                self._postings[token][field_name].add(name)
+        for trigram in _substring_trigrams(normalized_name):
+            self._name_trigrams[trigram].add(name)
+
+    def remove(self, name: str) -> None:
+        """Remove a package from the index."""
+        package = self._packages.pop(name, None)
+        if package is None:
+            return
+        for field_name, tokens in package.fields.items():
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    continue
+                postings[field_name].discard(name)
+                if not postings[field_name]:
+                    del postings[field_name]
+                if not postings:
+                    del self._postings[token]
+                    del self._trigrams_count[token]
+                    self._vocabulary = None
+                    for trigram in trigrams(token):
+                        self._token_trigrams[trigram].discard(token)
+        for trigram in _substring_trigrams(package.normalized_name):
+            self._name_trigrams[trigram].discard(name)
+
+    def search(self, query: str) -> list[IndexedPackage]:
+        """Search the packages matching a query.
+
+        Args:
+            query: The search query
+        Returns:
+            The matching packages sorted by relevance
+        """
+        scores = self._score(query)
+        return sorted(
+            (self._packages[name] for name in scores),
+            key=lambda p: (-scores[p.name], p.priority, p.normalized_name),
+        )
+
+    def _score(self, query: str) -> dict[str, float]:
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return dict.fromkeys(self._packages, 0.0)
+
+        scores: dict[str, float] | None = None
+        for query_token in query_tokens:
+            token_scores = self._score_token(query_token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    name: score + token_scores[name]
+                    for name, score in scores.items()
+                    if name in token_scores
+                }
+            if not scores:
+                break
+        scores = scores or {}
+
+        # Keep the historical behavior: the query found as is in the name
+        normalized_query = "-".join(query_tokens)
+        for name in self._find_in_names(normalized_query):
+            scores[name] = scores.get(name, 0.0) + _SUBSTRING_SCORE
+        return scores
+
+    def _score_token(self, query_token: str) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        if query_token in self._postings:
+            self._add_scores(scores, query_token, "exact")
+        for token in self._prefixed_tokens(query_token):
+            self._add_scores(scores, token, "prefix")
+        for token in self._similar_tokens(query_token):
+            self._add_scores(scores, token, "fuzzy")
+        return scores
+
+    def _add_scores(self, scores: dict[str, float], token: str, kind: str) -> None:
+        """Keep the best score of the packages having the token."""
+        for field_name, names in self._postings[token].items():
+            score = _SCORES[(field_name, kind)]
+            for name in names:
+                if scores.get(name, 0.0) < score:
+                    scores[name] = score
+
+    def _prefixed_tokens(self, query_token: str) -> list[str]:
+        """Get the indexed tokens starting with the query token."""
+        vocabulary = self._get_vocabulary()
+        tokens = []
+        index = bisect_left(vocabulary, query_token)
+        while index < len(vocabulary) and vocabulary[index].startswith(query_token):
+            if vocabulary[index] != query_token:
+                tokens.append(vocabulary[index])
+            index += 1
+        return tokens
+
+    def _similar_tokens(self, query_token: str) -> list[str]:
+        """Get the indexed tokens similar to the query token, prefixed ones excluded."""
+        if len(query_token) < _FUZZY_MIN_LENGTH:
+            return []
+        query_trigrams = trigrams(query_token)
+        counts: dict[str, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self._token_trigrams.get(trigram, ()):
+                counts[token] += 1
+        return [
+            token
+            for token, common in counts.items()
+            if not token.startswith(query_token)
+            and 2 * common / (len(query_trigrams) + self._trigrams_count[token]) >= _FUZZY_THRESHOLD
+        ]
+
+    def _find_in_names(self, normalized_query: str) -> set[str]:
+        if not normalized_query:
+            return set()
+        query_trigrams = _substring_trigrams(normalized_query)
+        if not query_trigrams:
+            candidates = self._packages.keys()
+        else:
+            candidates = set.intersection(
+                *(self._name_trigrams.get(trigram, set()) for trigram in query_trigrams)
+            )
+        return {
+            name for name in candidates if normalized_query in self._packages[name].normalized_name
+        }
+
+    def _get_vocabulary(self) -> list[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+
+def _substring_trigrams(text: str) -> set[str]:
+    """Get the unpadded trigrams of a text."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
@@ -0,0 +1,149 @@
+"""Deduplication of concurrent identical asynchronous calls."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run a single call at a time per key and share its outcome.
+
+    Callers awaiting :ref:`do` with the key of a call in flight wait for that
+    call instead of starting a new one; they all get its result or exception.
+    A caller being cancelled does not cancel the shared call, unless it was
+    the last one waiting for it.
+
+    Attributes:
+        calls: Number of calls started
+        merged: Number of callers served by a call started by another caller
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, tuple[asyncio.Future, list[int]]] = {}
+        self.calls = 0
+        self.merged = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Awaitable[R]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> R:
+        """Call ``fn(*args, **kwargs)`` unless a call with the same key is in flight.
+
+        Args:
+            key: Call identifier
+            fn: Coroutine function to call
+            *args: Function positional arguments
+            **kwargs: Function keyword arguments
+        Returns:
+            The result of the call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            flight = self._flights[key] = (task, [0])
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.calls += 1
+        else:
+            self.merged += 1
+
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiters[0] == 1 and not task.done():
+                # Nobody else is waiting for the result
+                task.cancel()
+            raise
+        finally:
+            waiters[0] -= 1
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved if all waiters were cancelled
+            task.exception()
+
+
+class SharedStream(Generic[T]):
+    """Asynchronous iteration shared by concurrent readers.
+
+    The items are consumed once by a background task; each reader following
+    the stream gets all of them, including those consumed before it joined.
+    The task is cancelled once all the readers are closed before its end.
+
+    Args:
+        items: Items to share
+
+    Attributes:
+        items: Items consumed so far
+        task: Task consuming the items
+    """
+
+    def __init__(self, items: AsyncIterator[T]) -> None:
+        self.items: list[T] = []
+        self._readers = 0
+        self._updated = asyncio.Event()
+        self.task = asyncio.ensure_future(self._consume(items))
+        # Mark the exception as retrieved if all readers were closed
+        self.task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def follow(self) -> AsyncIterator[T]:
+        """Iterate over all the items, as soon as they are consumed.
+
+        Raises:
+            Exception: The error of the shared iteration, if any
+        """
+        self._readers += 1
+        position = 0
+        try:
+            while True:
+                if position < len(self.items):
+                    position += 1
+                    yield self.items[position - 1]
+                elif self.task.done():
+                    self.task.result()
+                    return
+                else:
+                    await self._updated.wait()
+        finally:
+            self._readers -= 1
+            if self._readers == 0 and not self.task.done():
+                # Nobody else is reading the items
+                self.task.cancel()
+
+    async def wait(self) -> list[T]:
+        """Wait for all the items.
+
+        Returns:
+            The items
+        """
+        async for _ in self.follow():
+            pass
+        return self.items
+
+    async def _consume(self, items: AsyncIterator[T]) -> None:
+        try:
+            async for item in items:
+                self.items.append(item)
+                self._notify()
+        finally:
+            self._notify()
+
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
@@ -0,0 +1,139 @@
+"""Persistent metadata store shared by extension manager processes."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class MetadataStore:
+    """SQLite store of JSON-serializable metadata with a time-to-live.
+
+    The database uses the write-ahead log journal so many server processes
+    on the same node can read and write it concurrently. Entries older than
+    the time-to-live are still returned, flagged as stale, so they can be
+    used when the package index is unreachable.
+
+    The database is accessed through a single connection kept open by a
+    dedicated thread. Errors of the underlying database are logged and never
+    raised: a broken store behaves as an empty one.
+
+    Args:
+        path: Database file path
+        ttl: Time-to-live of the entries in seconds
+        logger: Logger
+        timeout: Time in seconds to wait for a lock held by another process
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float,
+        logger: logging.Logger | None = None,
+        timeout: float = 5.0,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.log = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="jupyterlab-metadata-store")
+        # Only used by the executor thread
+        self._connection: sqlite3.Connection | None = None
+
+    async def get(self, namespace: str, key: str) -> tuple[Any, bool] | None:
+        """Get an entry.
+
+        Args:
+            namespace: Entry namespace
+            key: Entry key
+        Returns:
+            The entry value and whether it is fresh; None if there is no entry
+        """
+        return await self._run(self._get, namespace, key)
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:  # noqa: ANN401
+        """Set an entry.
+
+        Args:
+            namespace: Entry namespace
+            key: Entry key
+            value: JSON-serializable entry value
+        """
+        await self._run(self._set, namespace, key, value)
+
+    def close(self) -> None:
+        """Close the database connection once the pending operations are done."""
+        self._executor.submit(self._close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, fn: Any, *args: Any) -> Any:  # noqa: ANN401
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                with connection:
+                    connection.execute(_SCHEMA)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get(self, namespace: str, key: str) -> tuple[Any, bool] | None:
+        try:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value, updated FROM metadata WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self.log.debug(f"Failed to read {namespace}/{key} from {self.path}.", exc_info=e)
+            # Connect again on the next operation
+            self._close()
+            return None
+
+        if row is None:
+            return None
+        value, updated = row
+        return json.loads(value), time.time() - updated < self.ttl
+
+    def _set(self, namespace: str, key: str, value: Any) -> None:  # noqa: ANN401
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata (namespace, key, value, updated)"
+                    " VALUES (?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), time.time()),
+                )
+        except (sqlite3.Error, OSError) as e:
+            self.log.debug(f"Failed to write {namespace}/{key} to {self.path}.", exc_info=e)
+            self._close()
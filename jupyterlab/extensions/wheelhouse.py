@@ -0,0 +1,344 @@
+"""Extension manager using pip as package manager and a wheelhouse as packages source."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import asyncio
+import io
+import json
+import logging
+import os
+import re
+import sys
+import zipfile
+from email.parser import HeaderParser
+from typing import IO, Any
+from urllib.parse import unquote, urljoin, urlparse
+from urllib.request import url2pathname
+
+import httpx
+from packaging.utils import InvalidWheelFilename, canonicalize_name, parse_wheel_filename
+from packaging.version import InvalidVersion, Version
+from traitlets import Unicode
+
+try:
+    from typing import override
+except ImportError:
+    from typing_extensions import override
+
+from jupyterlab.extensions.index import (
+    PREBUILT_CLASSIFIER,
+    IndexSnapshot,
+    IndexSource,
+    _conditional_get,
+    _unchanged,
+)
+from jupyterlab.extensions.manager import ExtensionManager, ExtensionManagerMetadata
+from jupyterlab.extensions.pypi import LANGUAGE_PACKS, PyPIExtensionManager
+from jupyterlab.extensions.ratelimit import RateLimiter, get_rate_limiter
+
+_LABEXTENSION_PACKAGE_JSON = re.compile(
+    r"[^/]+\.data/data/share/jupyter/labextensions/.+/package\.json"
+)
+_WHEEL_LINK = re.compile(r"""href\s*=\s*["']([^"']+\.whl(?:#[^"']*)?)["']""", re.IGNORECASE)
+_LANGUAGE_PACKS = frozenset(canonicalize_name(name) for name in LANGUAGE_PACKS)
+
+
+def _read_wheel_metadata(wheel: IO[bytes]) -> dict | None:
+    """Read the metadata of a JupyterLab extension wheel.
+
+    Args:
+        wheel: Wheel file object
+    Returns:
+        The package metadata, with the keys of the PyPI JSON API used by the
+        extension manager and the ``jupyterlab`` entry of the labextension
+        package.json; None if the wheel is not a JupyterLab extension
+    Raises:
+        ValueError: If the wheel has no metadata
+    """
+    with zipfile.ZipFile(wheel) as archive:
+        names = archive.namelist()
+        metadata_file = next(
+            (n for n in names if n.count("/") == 1 and n.endswith(".dist-info/METADATA")), None
+        )
+        if metadata_file is None:
+            msg = "Missing wheel METADATA."
+            raise ValueError(msg)
+        message = HeaderParser().parsestr(archive.read(metadata_file).decode("utf-8"))
+
+        jlab_metadata = None
+        for name in filter(_LABEXTENSION_PACKAGE_JSON.fullmatch, names):
+            data = json.loads(archive.read(name))
+            if data.get("jupyterlab") is not None:
+                jlab_metadata = data["jupyterlab"]
+                break
+
+    if (
+        jlab_metadata is None
+        and PREBUILT_CLASSIFIER not in (message.get_all("Classifier") or [])
+        and canonicalize_name(message.get("Name", "")) not in _LANGUAGE_PACKS
+    ):
+        return None
+
+    project_urls = {}
+    for value in message.get_all("Project-URL") or []:
+        label, _, url = value.partition(",")
+        project_urls[label.strip()] = url.strip()
+
+    return {
+        "author": message.get("Author") or message.get("Author-email"),
+        "home_page": message.get("Home-page"),
+        "keywords": message.get("Keywords"),
+        "license": message.get("License-Expression") or message.get("License"),
+        "project_urls": project_urls,
+        "requires_python": message.get("Requires-Python"),
+        "summary": message.get("Summary"),
+        "jupyterlab": jlab_metadata,
+    }
+
+
+def _read_wheel_file(path: str) -> dict | None:
+    with open(path, "rb") as wheel:
+        return _read_wheel_metadata(wheel)
+
+
+def _get_latest_wheels(wheels: list[tuple[str, str]]) -> dict[str, tuple[Version, str, str]]:
+    """Get the latest wheel per project.
+
+    Final releases are preferred over pre-releases.
+
+    Args:
+        wheels: Wheels location and fingerprint
+    Returns:
+        The latest (version, location, fingerprint) per canonical project name
+    """
+    latest = {}
+    for location, fingerprint in wheels:
+        filename = unquote(location.replace("\\", "/").rsplit("/", 1)[-1])
+        try:
+            name, version, _, _ = parse_wheel_filename(filename)
+        except (InvalidWheelFilename, InvalidVersion):
+            continue
+        current = latest.get(name)
+        if current is None or (not version.is_prerelease, version) > (
+            not current[0].is_prerelease,
+            current[0],
+        ):
+            latest[name] = (version, location, fingerprint)
+    return latest
+
+
+class WheelhouseIndexSource(IndexSource):
+    """Index of the JupyterLab extensions stored in a wheelhouse.
+
+    The wheelhouse is a local directory or an HTTP(S) page linking to wheels,
+    like the directory listing of ``python -m http.server``. The metadata of the
+    latest wheel of each project are read once and kept until the wheel changes;
+    the wheels that are not JupyterLab extensions are not listed.
+
+    Args:
+        location: Path, ``file://`` URL or HTTP(S) URL of the wheelhouse
+        client: HTTP client
+        concurrency: Maximal number of wheels read at once
+        logger: Logger
+    """
+
+    def __init__(
+        self,
+        location: str,
+        client: httpx.AsyncClient,
+        concurrency: int = 10,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.location = location
+        self._client = client
+        self.concurrency = concurrency
+        self.log = logger or logging.getLogger(__name__)
+        # Metadata per wheel fingerprint; None for a wheel that is not an extension
+        self._metadata: dict[str, dict | None] = {}
+        # Latest version and wheel fingerprint per listed project
+        self._latest: dict[str, tuple[str, str]] = {}
+
+    def get_metadata(self, name: str, version: str) -> dict:
+        """Get the metadata of a listed package version.
+
+        Args:
+            name: Package name
+            version: Package version
+        Returns:
+            The package metadata; empty if the version is not the listed one
+        """
+        version_, fingerprint = self._latest.get(canonicalize_name(name), (None, None))
+        if version_ != version:
+            return {}
+        return self._metadata.get(fingerprint) or {}
+
+    async def fetch(self, previous: IndexSnapshot | None) -> IndexSnapshot:
+        """Fetch the index.
+
+        Args:
+            previous: The previous snapshot returned by the source if any
+        Returns:
+            The index snapshot; ``previous`` if unchanged
+        """
+        if not self.location:
+            msg = "No wheelhouse is configured."
+            raise ValueError(msg)
+
+        parsed = urlparse(self.location)
+        if parsed.scheme in ("http", "https"):
+            listing = await self._list_url(previous)
+            if listing is None:
+                return previous
+            wheels, etag, last_modified = listing
+        else:
+            path = url2pathname(parsed.path) if parsed.scheme == "file" else self.location
+            wheels = await asyncio.to_thread(self._list_directory, path)
+            etag = last_modified = None
+
+        latest = _get_latest_wheels(wheels)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def read(location: str, fingerprint: str) -> None:
+            async with semaphore:
+                try:
+                    self._metadata[fingerprint] = await self._read_metadata(location)
+                except Exception as e:
+                    # Not cached; the wheel is read again by the next fetch
+                    self.log.warning(f"Failed to read the wheel {location}.", exc_info=e)
+
+        await asyncio.gather(
+            *(
+                read(location, fingerprint)
+                for _, location, fingerprint in latest.values()
+                if fingerprint not in self._metadata
+            )
+        )
+
+        # Forget the metadata of the removed wheels
+        self._metadata = {
+            fingerprint: self._metadata[fingerprint]
+            for _, _, fingerprint in latest.values()
+            if fingerprint in self._metadata
+        }
+        self._latest = {
+            name: (str(version), fingerprint)
+            for name, (version, _, fingerprint) in latest.items()
+            if self._metadata.get(fingerprint) is not None
+        }
+        snapshot = IndexSnapshot(
+            {name: version for name, (version, _) in self._latest.items()},
+            etag=etag,
+            last_modified=last_modified,
+        )
+        return _unchanged(previous, snapshot)
+
+    def _list_directory(self, path: str) -> list[tuple[str, str]]:
+        wheels = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".whl") and entry.is_file():
+                    stat = entry.stat()
+                    wheels.append((entry.path, f"{entry.path}:{stat.st_mtime_ns}:{stat.st_size}"))
+        return wheels
+
+    async def _list_url(
+        self, previous: IndexSnapshot | None
+    ) -> tuple[list[tuple[str, str]], str | None, str | None] | None:
+        url = self.location
+        if not urlparse(url).path.endswith(("/", ".html", ".htm")):
+            url += "/"
+        response = await _conditional_get(
+            self._client,
+            url,
+            previous.etag if previous else None,
+            previous.last_modified if previous else None,
+        )
+        if response is None:
+            return None
+        # The link hash fragment, if any, identifies the wheel content
+        links = {urljoin(url, link) for link in _WHEEL_LINK.findall(response.text)}
+        wheels = [(link.partition("#")[0], link) for link in sorted(links)]
+        return wheels, response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+    async def _read_metadata(self, location: str) -> dict | None:
+        if urlparse(location).scheme in ("http", "https"):
+            response = await self._client.get(location)
+            response.raise_for_status()
+            return await asyncio.to_thread(_read_wheel_metadata, io.BytesIO(response.content))
+        return await asyncio.to_thread(_read_wheel_file, location)
+
+
+class WheelhouseExtensionManager(PyPIExtensionManager):
+    """Extension manager using pip as package manager and a wheelhouse as packages source.
+
+    It is meant for air-gapped deployments: the extensions are listed from the
+    wheels of a local directory or HTTP file server and installed by pip from it,
+    without reaching any package index.
+    """
+
+    wheelhouse = Unicode(
+        "",
+        config=True,
+        help="""Path or URL of the wheelhouse: a directory of wheels, or an HTTP(S) page
+        linking to them like a directory listing. It is the pip --find-links location.""",
+    )
+
+    @property
+    def metadata(self) -> ExtensionManagerMetadata:
+        """Extension manager metadata."""
+        return ExtensionManagerMetadata("wheelhouse", True, sys.prefix)
+
+    async def get_latest_version(self, pkg: str) -> str | None:
+        """Return the latest available version for a given extension.
+
+        Args:
+            pkg: The extension to search for
+        Returns:
+            The latest available version
+        """
+        try:
+            version = (await self._get_all_extensions()).get(canonicalize_name(pkg))
+        except Exception as e:
+            self.log.debug(f"Failed to get the wheelhouse information for {pkg}.", exc_info=e)
+            return None
+        return ExtensionManager.get_semver_version(version) if version else None
+
+    @override
+    def _create_rate_limiter(self) -> RateLimiter:
+        # Do not share the PyPI requests budget
+        return get_rate_limiter(
+            urlparse(self.wheelhouse).netloc or self.wheelhouse,
+            self.request_rate,
+            self.request_burst,
+        )
+
+    @override
+    def _create_index_source(self) -> IndexSource:
+        return WheelhouseIndexSource(
+            self.wheelhouse,
+            self._httpx_client,
+            concurrency=self.metadata_fetch_concurrency,
+            logger=self.log,
+        )
+
+    @override
+    async def _get_stored(self, namespace: str, key: str) -> tuple[Any, bool] | None:
+        # The listing is not stored: the packages metadata are only known once
+        # the wheels are read by the index source
+        if namespace == "listing":
+            return None
+        return await super()._get_stored(namespace, key)
+
+    @override
+    async def _set_stored(self, namespace: str, key: str, value: Any) -> None:
+        if namespace != "listing":
+            await super()._set_stored(namespace, key, value)
+
+    @override
+    async def _get_stored_package_metadata(self, name: str, version: str) -> dict:
+        return self._index_source.get_metadata(name, version)
+
+    @override
+    def _get_pip_install_options(self) -> list[str]:
+        return ["--no-index", "--find-links", self.wheelhouse]
@@ -4,6 +4,7 @@
 # Distributed under the terms of the Modified BSD License.
 import json
 import logging
+import time
 from asyncio import Future
 from collections.abc import Generator
 from concurrent.futures import ThreadPoolExecutor
@@ -16,6 +17,7 @@ from tornado.concurrent import run_on_executor
 
 from jupyterlab.commands import AppOptions, _ensure_options, build, build_check, clean
 from jupyterlab.coreconfig import CoreConfig
+from jupyterlab.metrics import BUILD_DURATION_SECONDS
 
 
 class Builder:
@@ -70,18 +72,23 @@ class Builder:
             self._future = future
             self.building = True
             self._kill_event = evt = Event()
+            start = time.monotonic()
+            outcome = "error"
             try:
                 yield self._run_build(
                     self.app_dir, self.log, evt, self.core_config, self.labextensions_path
                 )
                 future.set_result(True)
+                outcome = "success"
             except Exception as e:
                 if str(e) == "Aborted":
                     future.set_result(False)
+                    outcome = "canceled"
                 else:
                     future.set_exception(e)
             finally:
                 self.building = False
+                BUILD_DURATION_SECONDS.labels(outcome=outcome).observe(time.monotonic() - start)
         try:
             current_future = self._future
             if current_future is None:
@@ -5,14 +5,47 @@
 
 import dataclasses
 import json
-from urllib.parse import urlencode, urlunparse
+from urllib.parse import urlencode
 
 from jupyter_server.base.handlers import APIHandler
 from tornado import web
+from tornado.iostream import StreamClosedError
 
+from jupyterlab.extensions.jobs import ExtensionJob
 from jupyterlab.extensions.manager import ExtensionManager
 
 
+async def _get_action(
+    manager: ExtensionManager, data: dict, commands: tuple[str, ...]
+) -> tuple[str, str, str | None]:
+    """Get and validate the action requested in a body.
+
+    Args:
+        manager: Extension manager
+        data: Request body
+        commands: Supported commands
+    Returns:
+        The command, the extension name and version
+    Raises:
+        web.HTTPError: If the action is invalid or not allowed
+    """
+    cmd = data["cmd"]
+    name = data["extension_name"]
+    version = data.get("extension_version")
+    if cmd not in commands or not name:
+        raise web.HTTPError(
+            422,
+            f"Could not process instruction {cmd!r} with extension name {name!r}",
+        )
+
+    if cmd == "install" and not await manager.is_install_allowed(name, version):
+        raise web.HTTPError(
+            422,
+            f"Install of {name!r} was blocked, check the logs.",
+        )
+    return cmd, name, version
+
+
 class ExtensionHandler(APIHandler):
     def initialize(self, manager: ExtensionManager):
         super().initialize()
@@ -27,77 +60,93 @@ class ExtensionHandler(APIHandler):
             query: [optional] Query to search for extensions - default None (i.e. returns installed extensions)
             page: [optional] Result page - default 1 (min. 1)
             per_page: [optional] Number of results per page - default 30 (max. 100)
+
+        The installed extensions listing (no query) is returned with an ETag
+        that changes whenever the listing is updated, e.g. once the latest
+        versions have been refreshed in the background. Search results are
+        returned with the ETag of their content.
+
+        If the request accepts ``application/x-ndjson``, the extensions are streamed
+        as newline-delimited JSON as soon as their metadata are fetched, in any order:
+            {"type": "extension", "index": Index in the page, "extension": Extension}
+        followed by the pagination information:
+            {"type": "pagination", "page": Page, "per_page": Page size, "last_page": Last page}
+        or, if the listing fails once streaming has started:
+            {"type": "error", "message": Error message}
         """
         query = self.get_argument("query", None)
         page = max(1, int(self.get_argument("page", "1")))
         per_page = min(100, int(self.get_argument("per_page", "30")))
-        if self.get_argument("refresh", "0") == "1":
+        refresh = self.get_argument("refresh", "0") == "1"
+
+        if "application/x-ndjson" in self.request.headers.get("Accept", ""):
+            await self._stream(query, page, per_page, refresh)
+            return
+
+        if refresh:
             await self.manager.refresh(query, page, per_page)
 
-        extensions, last_page = await self.manager.list_extensions(query, page, per_page)
+        body, etag, last_page = await self.manager.list_extensions_json(query, page, per_page)
+        self.set_header("ETag", etag)
+        if self.check_etag_header():
+            self.set_status(304)
+            self.finish()
+            return
 
         self.set_status(200)
         if last_page is not None:
-            links = []
-            query_args = {"page": last_page, "per_page": per_page}
-            if query is not None:
-                query_args["query"] = query
-            last = urlunparse(
-                (
-                    self.request.protocol,
-                    self.request.host,
-                    self.request.path,
-                    "",
-                    urlencode(query_args, doseq=True),
-                    "",
-                )
+            url = f"{self.request.protocol}://{self.request.host}{self.request.path}"
+            query_args = (
+                {"per_page": per_page} if query is None else {"per_page": per_page, "query": query}
             )
-            links.append(f'<{last}>; rel="last"')
+
+            def link(target: int, rel: str) -> str:
+                return f'<{url}?{urlencode({"page": target, **query_args})}>; rel="{rel}"'
+
+            links = [link(last_page, "last")]
             if page > 1:
-                query_args["page"] = max(1, page - 1)
-                prev = urlunparse(
-                    (
-                        self.request.protocol,
-                        self.request.host,
-                        self.request.path,
-                        "",
-                        urlencode(query_args, doseq=True),
-                        "",
-                    )
-                )
-                links.append(f'<{prev}>; rel="prev"')
+                links.append(link(max(1, page - 1), "prev"))
             if page < last_page:
-                query_args["page"] = min(page + 1, last_page)
-                next_ = urlunparse(
-                    (
-                        self.request.protocol,
-                        self.request.host,
-                        self.request.path,
-                        "",
-                        urlencode(query_args, doseq=True),
-                        "",
-                    )
-                )
-                links.append(f'<{next_}>; rel="next"')
-            query_args["page"] = 1
-            first = urlunparse(
-                (
-                    self.request.protocol,
-                    self.request.host,
-                    self.request.path,
-                    "",
-                    urlencode(query_args, doseq=True),
-                    "",
-                )
-            )
-            links.append(f'<{first}>; rel="first"')
+                links.append(link(min(page + 1, last_page), "next"))
+            links.append(link(1, "first"))
             self.set_header("Link", ", ".join(links))
 
-        self.finish(json.dumps(list(map(dataclasses.asdict, extensions))))
+        self.finish(body)
+
+    async def _stream(self, query: str | None, page: int, per_page: int, refresh: bool) -> None:
+        last_page, extensions = await self.manager.stream_extensions(
+            query, page, per_page, refresh=refresh
+        )
+        self.set_header("Content-Type", "application/x-ndjson")
+        try:
+            async for index, extension in extensions:
+                self.write(
+                    b'{"type": "extension", "index": %d, "extension": %s}\n'
+                    % (index, extension.json_bytes)
+                )
+                await self.flush()
+            trailer = {
+                "type": "pagination",
+                "page": page,
+                "per_page": per_page,
+                "last_page": last_page,
+            }
+        except StreamClosedError:
+            await extensions.aclose()
+            return
+        except Exception as e:
+            self.log.error(f"Failed to list the extensions: {e}", exc_info=e)
+            trailer = {"type": "error", "message": str(e)}
+        try:
+            self.write(json.dumps(trailer) + "\n")
+            await self.flush()
+        except StreamClosedError:
+            return
+        self.finish()
 
     @web.authenticated
     async def post(self):
-        """POST query performs an action on a specific extension
+        """POST query performs an action on a specific extension or on many extensions
 
         Body arguments:
             {
@@ -105,22 +154,21 @@ class ExtensionHandler(APIHandler):
                 "extension_name": Extension name
                 "extension_version": [optional] Extension version (used only for install action)
             }
+
+        or, to install or uninstall many extensions at once:
+            {
+                "cmd": Action to perform - ["install", "uninstall"]
+                "extensions": [{"extension_name": ..., "extension_version": ...}, ...]
+            }
         """
         data = self.get_json_body()
-        cmd = data["cmd"]
-        name = data["extension_name"]
-        version = data.get("extension_version")
-        if cmd not in ("install", "uninstall", "enable", "disable") or not name:
-            raise web.HTTPError(
-                422,
-                f"Could not process instruction {cmd!r} with extension name {name!r}",
-            )
+        if "extensions" in data:
+            await self._post_many(data)
+            return
 
-        if cmd == "install" and not await self.manager.is_install_allowed(name, version):
-            raise web.HTTPError(
-                422,
-                f"Install of {name!r} was blocked, check the logs.",
-            )
+        cmd, name, version = await _get_action(
+            self.manager, data, ("install", "uninstall", "enable", "disable")
+        )
 
         ret_value = None
         try:
@@ -141,6 +189,138 @@ class ExtensionHandler(APIHandler):
             self.set_status(201)
         self.finish(json.dumps(dataclasses.asdict(ret_value)))
 
+    async def _post_many(self, data: dict) -> None:
+        """Install or uninstall many extensions in a single package manager call."""
+        cmd = data.get("cmd")
+        entries = data["extensions"]
+        if (
+            cmd not in ("install", "uninstall")
+            or not isinstance(entries, list)
+            or not entries
+            or not all(isinstance(e, dict) and e.get("extension_name") for e in entries)
+        ):
+            raise web.HTTPError(422, f"Could not process instruction {cmd!r} on many extensions")
+
+        try:
+            if cmd == "install":
+                extensions = {e["extension_name"]: e.get("extension_version") for e in entries}
+                blocked = [
+                    name
+                    for name, version in extensions.items()
+                    if not await self.manager.is_install_allowed(name, version)
+                ]
+                if blocked:
+                    raise web.HTTPError(
+                        422,
+                        f"Install of {', '.join(map(repr, blocked))} was blocked, check the logs.",
+                    )
+                ret_value = await self.manager.install_many(extensions)
+            else:
+                ret_value = await self.manager.uninstall_many(
+                    list(dict.fromkeys(e["extension_name"] for e in entries))
+                )
+        except web.HTTPError:
+            raise
+        except Exception as e:
+            raise web.HTTPError(500, str(e)) from e
+
+        self.set_status(500 if ret_value.status == "error" else 201)
+        self.finish(json.dumps(dataclasses.asdict(ret_value)))
+
+
+class ExtensionJobHandler(APIHandler):
+    """Handler of the install and uninstall jobs."""
+
+    def initialize(self, manager: ExtensionManager):
+        super().initialize()
+        self.manager = manager
+
+    def _get_job(self, job_id: str) -> ExtensionJob:
+        job = self.manager.get_job(job_id)
+        if job is None:
+            raise web.HTTPError(404, f"Unknown job {job_id!r}")
+        return job
+
+    @web.authenticated
+    async def get(self, job_id: str = ""):
+        """GET query returns the jobs or the status of a job
+
+        Query arguments (for a job):
+            follow: [optional] Stream the job events as newline-delimited JSON until
+                it is finished, then its status - ["0", "1"]; default 0
+            since: [optional] Index of the first event to stream - default 0
+
+        A job status is
+            {
+                "id": Job identifier
+                "action": Job action - ["install", "uninstall"]
+                "name": Extension name
+                "version": Extension version
+                "created": Creation timestamp
+                "phase": Job phase - ["queued", "installing", "uninstalling", "completed", "failed", "cancelled"]
+                "result": Action result once finished
+                "output": Output lines (only if not following)
+            }
+        """
+        if not job_id:
+            self.finish(json.dumps([job.to_dict() for job in self.manager.jobs]))
+            return
+
+        job = self._get_job(job_id)
+        if self.get_argument("follow", "0") != "1":
+            status = job.to_dict()
+            status["output"] = [e["line"] for e in job.events if e["type"] == "output"]
+            self.finish(json.dumps(status))
+            return
+
+        self.set_header("Content-Type", "application/x-ndjson")
+        try:
+            async for event in job.follow(int(self.get_argument("since", "0"))):
+                self.write(json.dumps(event) + "\n")
+                await self.flush()
+            self.write(json.dumps({"type": "status", **job.to_dict()}) + "\n")
+            await self.flush()
+        except StreamClosedError:
+            return
+        self.finish()
+
+    @web.authenticated
+    async def post(self, job_id: str = ""):
+        """POST query starts an install or uninstall job
+
+        Body arguments:
+            {
+                "cmd": Action to perform - ["install", "uninstall"]
+                "extension_name": Extension name
+                "extension_version": [optional] Extension version (used only for install action)
+            }
+
+        The job status is returned with the status code 202 and the job URL in
+        the Location header.
+        """
+        if job_id:
+            raise web.HTTPError(405)
+        cmd, name, version = await _get_action(
+            self.manager, self.get_json_body(), ("install", "uninstall")
+        )
+        job = self.manager.start_job(cmd, name, version)
+        self.set_status(202)
+        self.set_header("Location", f"{self.request.path.rstrip('/')}/{job.id}")
+        self.finish(json.dumps(job.to_dict()))
+
+    @web.authenticated
+    async def delete(self, job_id: str = ""):
+        """DELETE query cancels a job; its package manager process is terminated"""
+        job = self._get_job(job_id)
+        if job.done:
+            raise web.HTTPError(409, f"Job {job_id!r} is already finished.")
+        job.cancel()
+        self.set_status(204)
+        self.finish()
+
 
 # The path for lab extensions handler.
 extensions_handler_path = r"/lab/api/extensions"
+
+# The path for lab extensions jobs handler.
+extension_jobs_handler_path = r"/lab/api/extensions/jobs/?([0-9a-f]*)"
@@ -0,0 +1,32 @@
+"""Tornado handler exporting the JupyterLab metrics."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import prometheus_client
+from jupyter_server.auth.decorator import allow_unauthenticated
+from jupyter_server.base.handlers import JupyterHandler
+from tornado import web
+
+from jupyterlab.metrics import REGISTRY
+
+
+class MetricsHandler(JupyterHandler):
+    """Return the JupyterLab Prometheus metrics.
+
+    Like the Jupyter Server ``/metrics`` endpoint, authentication is required
+    unless ``ServerApp.authenticate_prometheus`` is False.
+    """
+
+    @allow_unauthenticated
+    def get(self) -> None:
+        """GET query returns the metrics in the Prometheus text format"""
+        if self.settings.get("authenticate_prometheus", True) and not self.logged_in:
+            raise web.HTTPError(403)
+
+        self.set_header("Content-Type", prometheus_client.CONTENT_TYPE_LATEST)
+        self.finish(prometheus_client.generate_latest(REGISTRY))
+
+
+# The path for lab metrics.
+metrics_handler_path = r"/lab/api/metrics"
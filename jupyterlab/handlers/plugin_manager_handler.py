@@ -59,6 +59,41 @@ class PluginHandler(APIHandler):
             self.set_status(201)
         self.finish(json.dumps(dataclasses.asdict(ret_value)))
 
+    @web.authenticated
+    async def patch(self):
+        """PATCH query enables and disables a batch of plugins at once
+
+        Body arguments:
+            {
+                "enable": [optional] List of plugin names to enable
+                "disable": [optional] List of plugin names to disable
+            }
+        """
+        data = self.get_json_body() or {}
+        enable = data.get("enable", [])
+        disable = data.get("disable", [])
+        if (
+            not isinstance(enable, list)
+            or not isinstance(disable, list)
+            or not all(isinstance(name, str) and name for name in enable + disable)
+            or not (enable or disable)
+        ):
+            raise web.HTTPError(
+                422,
+                f"Could not process batch with enable {enable!r} and disable {disable!r}",
+            )
+
+        try:
+            ret_value = await self.manager.toggle(enable=enable, disable=disable)
+        except Exception as e:
+            raise web.HTTPError(500, str(e)) from e
+
+        if ret_value.status == "error":
+            self.set_status(500)
+        else:
+            self.set_status(200)
+        self.finish(json.dumps(dataclasses.asdict(ret_value)))
+
 
 # The path for lab plugins handler.
 plugins_handler_path = r"/lab/api/plugins"
@@ -58,8 +58,15 @@ from .handlers.announcements import (
 )
 from .handlers.build_handler import Builder, BuildHandler, build_path
 from .handlers.error_handler import ErrorHandler
-from .handlers.extension_manager_handler import ExtensionHandler, extensions_handler_path
+from .handlers.extension_manager_handler import (
+    ExtensionHandler,
+    ExtensionJobHandler,
+    extension_jobs_handler_path,
+    extensions_handler_path,
+)
+from .handlers.metrics_handler import MetricsHandler, metrics_handler_path
 from .handlers.plugin_manager_handler import PluginHandler, plugins_handler_path
+from .metrics import export_metrics, record_api_requests
 
 DEV_NOTE = """You're running JupyterLab from source.
 If you're working on the TypeScript sources of JupyterLab, try running
@@ -564,8 +571,9 @@ class LabApp(NotebookConfigShimMixin, LabServerApp):
         "pypi",
         config=True,
         help="""The extension manager factory to use. The default options are:
-        "readonly" for a manager without installation capability or "pypi" for
-        a manager using PyPi.org and pip to install extensions.""",
+        "readonly" for a manager without installation capability, "pypi" for
+        a manager using PyPi.org and pip to install extensions or "wheelhouse" for
+        a manager using pip to install extensions from a directory of wheels.""",
     )
 
     watch = Bool(False, config=True, help="Whether to serve the app in watch mode")
@@ -781,6 +789,13 @@ class LabApp(NotebookConfigShimMixin, LabServerApp):
         build_handler = (build_path, BuildHandler, {"builder": builder})
         handlers.append(build_handler)
 
+        # Export the metrics and record the API requests duration
+        handlers.append((metrics_handler_path, MetricsHandler))
+        export_metrics()
+        record_api_requests(
+            self.serverapp.web_app.settings, ujoin(self.serverapp.base_url, "lab/api/")
+        )
+
         errored = False
 
         if self.core_mode:
@@ -865,6 +880,9 @@ class LabApp(NotebookConfigShimMixin, LabServerApp):
                 {"manager": ext_manager},
             )
             handlers.append(ext_handler)
+            handlers.append(
+                (extension_jobs_handler_path, ExtensionJobHandler, {"manager": ext_manager})
+            )
 
             # Add plugin manager handlers
             lock_rules = frozenset(
@@ -882,6 +900,8 @@ class LabApp(NotebookConfigShimMixin, LabServerApp):
                                 "lock_all": self.lock_all_plugins,
                             },
                             parent=self,
+                            # Serialize the page config updates of both managers
+                            executor=ext_manager.executor,
                         )
                     },
                 )
@@ -3,6 +3,7 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import json
 import os
 import subprocess
 import sys
@@ -20,19 +21,19 @@ from .commands import (
     AppOptions,
     build,
     check_extension,
-    disable_extension,
-    enable_extension,
     get_app_version,
-    install_extension,
+    get_extensions_status,
+    install_extensions,
     link_package,
     list_extensions,
     lock_extension,
+    toggle_extensions,
     uninstall_extension,
     unlink_package,
     unlock_extension,
     update_extension,
 )
-from .labapp import LabApp
+from .labextensions_path import get_labextensions_path
 
 flags = dict(base_flags)
 flags["no-build"] = (
@@ -85,6 +86,14 @@ list_flags["verbose"] = (
     {"ListLabExtensionsApp": {"verbose": True}},
     "Increase verbosity level",
 )
+list_flags["json"] = (
+    {"ListLabExtensionsApp": {"json": True}},
+    "Print the extensions status as JSON",
+)
+list_flags["build-check"] = (
+    {"ListLabExtensionsApp": {"build_check": True}},
+    "Check whether a build is recommended (always done unless printing JSON)",
+)
 
 aliases = dict(base_aliases)
 aliases["app-dir"] = "BaseExtensionApp.app_dir"
@@ -153,9 +162,7 @@ class BaseExtensionApp(JupyterApp, DebugLogFileMixin):
 
     @default("labextensions_path")
     def _default_labextensions_path(self) -> list[str]:
-        lab = LabApp()
-        lab.load_config_file()
-        return lab.labextensions_path + lab.extra_labextensions_path
+        return get_labextensions_path()
 
     @default("splice_source")
     def _default_splice_source(self) -> bool:
@@ -219,21 +226,17 @@ class InstallLabExtensionApp(BaseExtensionApp):
         self.deprecation_warning(
             "Installing extensions with the jupyter labextension install command is now deprecated and will be removed in a future major version of JupyterLab."
         )
-        pinned_versions = self.pin.split(",")
         self.extra_args = self.extra_args or [os.getcwd()]
-        return any(
-            install_extension(
-                arg,
-                # Pass in pinned alias if we have it
-                pin=pinned_versions[i] if i < len(pinned_versions) else None,
-                app_options=AppOptions(
-                    app_dir=self.app_dir,
-                    logger=self.log,
-                    core_config=self.core_config,
-                    labextensions_path=self.labextensions_path,
-                ),
-            )
-            for i, arg in enumerate(self.extra_args)
+        return install_extensions(
+            self.extra_args,
+            # Pass in pinned aliases if we have them
+            pins=self.pin.split(",") if self.pin else None,
+            app_options=AppOptions(
+                app_dir=self.app_dir,
+                logger=self.log,
+                core_config=self.core_config,
+                labextensions_path=self.labextensions_path,
+            ),
         )
 
 
@@ -324,18 +327,29 @@ class UninstallLabExtensionApp(BaseExtensionApp):
 class ListLabExtensionsApp(BaseExtensionApp):
     description = "List the installed labextensions"
     verbose = Bool(False, help="Increase verbosity level.").tag(config=True)
+    json = Bool(
+        False,
+        help="""Print the extensions status as JSON instead of logging it. The build
+        check is skipped unless build_check is True.""",
+    ).tag(config=True)
+    build_check = Bool(False, help="Check whether a build is recommended when printing JSON.").tag(
+        config=True
+    )
     flags = list_flags
 
     def run_task(self):
-        list_extensions(
-            app_options=AppOptions(
-                app_dir=self.app_dir,
-                logger=self.log,
-                core_config=self.core_config,
-                labextensions_path=self.labextensions_path,
-                verbose=self.verbose,
-            )
+        app_options = AppOptions(
+            app_dir=self.app_dir,
+            logger=self.log,
+            core_config=self.core_config,
+            labextensions_path=self.labextensions_path,
+            verbose=self.verbose,
         )
+        if self.json:
+            status = get_extensions_status(app_options=app_options, build_check=self.build_check)
+            print(json.dumps(status, indent=2))  # noqa: T201
+        else:
+            list_extensions(app_options=app_options)
 
 
 class EnableLabExtensionsApp(BaseExtensionApp):
@@ -353,10 +367,9 @@ class EnableLabExtensionsApp(BaseExtensionApp):
             core_config=self.core_config,
             labextensions_path=self.labextensions_path,
         )
-        [
-            enable_extension(arg, app_options=app_options, level=self.level)
-            for arg in self.extra_args
-        ]
+        toggle_extensions(
+            dict.fromkeys(self.extra_args, False), app_options=app_options, level=self.level
+        )
 
 
 class DisableLabExtensionsApp(BaseExtensionApp):
@@ -374,10 +387,9 @@ class DisableLabExtensionsApp(BaseExtensionApp):
             core_config=self.core_config,
             labextensions_path=self.labextensions_path,
         )
-        [
-            disable_extension(arg, app_options=app_options, level=self.level)
-            for arg in self.extra_args
-        ]
+        toggle_extensions(
+            dict.fromkeys(self.extra_args, True), app_options=app_options, level=self.level
+        )
         self.log.info(
             "Starting with JupyterLab 4.1 individual plugins can be re-enabled"
             " in the user interface. While all plugins which were previously"
@@ -0,0 +1,103 @@
+"""Resolve the prebuilt extensions paths without creating the lab application."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import os
+from copy import deepcopy
+from functools import lru_cache
+
+from jupyter_core.paths import jupyter_config_dir, jupyter_config_path, jupyter_path
+from traitlets.config import Config, LazyConfigValue
+from traitlets.config.application import Application
+
+# Config files loaded by LabApp.load_config_file, in increasing priority order
+_CONFIG_FILES = ("jupyter_config", "jupyter_lab_config")
+
+# LabApp.section_names(), in increasing priority order
+_SECTIONS = (
+    "Configurable",
+    "LoggingConfigurable",
+    "SingletonConfigurable",
+    "Application",
+    "JupyterApp",
+    "ExtensionApp",
+    "LabServerApp",
+    "LabApp",
+)
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+    return result.st_mtime_ns, result.st_size
+
+
+@lru_cache(maxsize=64)
+def _load_config_files(
+    basefilename: str, directory: str, signature: tuple[tuple[int, int] | None, ...]
+) -> tuple[Config, ...]:
+    """Load the config files of a directory.
+
+    The files are parsed again only if their ``signature`` changes.
+
+    Args:
+        basefilename: Config file name without extension
+        directory: Config directory
+        signature: Modification time and size of the Python and JSON config files
+    Returns:
+        The configs, in increasing priority order; they must not be modified
+    """
+    return tuple(config for config, _ in Application._load_config_files(basefilename, directory))
+
+
+def _load_config(basefilename: str, paths: list[str]) -> Config:
+    config = Config()
+    for directory in reversed(paths):
+        signature = tuple(
+            _stat(os.path.join(directory, basefilename + ext)) for ext in (".py", ".json")
+        )
+        if signature == (None, None):
+            continue
+        for file_config in _load_config_files(basefilename, directory, signature):
+            config.merge(deepcopy(file_config))
+    return config
+
+
+def get_labextensions_path() -> list[str]:
+    """Get the paths to look in for prebuilt extensions.
+
+    They are the ``labextensions_path`` and ``extra_labextensions_path`` of a
+    ``LabApp`` after ``load_config_file()``, computed from the Jupyter data and
+    config directories only.
+
+    Returns:
+        The standard paths followed by the extra paths
+    """
+    paths = jupyter_config_path()
+    config_dir = jupyter_config_dir()
+    if config_dir not in paths:
+        paths.insert(0, config_dir)
+
+    values = {
+        "labextensions_path": jupyter_path("labextensions"),
+        "extra_labextensions_path": [],
+    }
+    # Each config file name is loaded on top of the previous ones, like
+    # JupyterApp.load_config_file
+    for basefilename in _CONFIG_FILES:
+        config = _load_config(basefilename, paths)
+        # Merge the sections like Configurable._find_my_config
+        lab_config = Config()
+        for section in _SECTIONS:
+            if config._has_section(section):
+                lab_config.merge(config[section])
+        for name, current in values.items():
+            value = lab_config.get(name, current)
+            if isinstance(value, LazyConfigValue):
+                value = value.get_value(current)
+            values[name] = list(value)
+
+    return values["labextensions_path"] + values["extra_labextensions_path"]
@@ -0,0 +1,110 @@
+"""
+Prometheus metrics exported by JupyterLab
+
+Read https://prometheus.io/docs/practices/naming/ for naming
+conventions for metrics & labels.
+
+The metrics are exported by the ``/lab/api/metrics`` endpoint and, once
+:func:`export_metrics` is called by the server, along with the Jupyter Server
+metrics by the Jupyter Server ``/metrics`` endpoint.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import prometheus_client
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from tornado.web import RequestHandler
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+API_REQUEST_DURATION_SECONDS = Histogram(
+    "jupyterlab_api_request_duration_seconds",
+    "duration in seconds of the requests to the JupyterLab API",
+    ["method", "handler", "status_code"],
+    registry=REGISTRY,
+)
+
+BUILD_DURATION_SECONDS = Histogram(
+    "jupyterlab_build_duration_seconds",
+    "duration in seconds of the JupyterLab builds labeled by outcome",
+    ["outcome"],
+    buckets=(5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1200.0, float("inf")),
+    registry=REGISTRY,
+)
+
+EXTENSIONS_CACHE_REQUESTS_TOTAL = Counter(
+    "jupyterlab_extensions_cache_requests",
+    "counter for the extension manager cache lookups labeled by result (hit or miss)",
+    ["result"],
+    registry=REGISTRY,
+)
+
+PYPI_REQUEST_DURATION_SECONDS = Histogram(
+    "jupyterlab_pypi_request_duration_seconds",
+    "duration in seconds of the requests to the package index labeled by extension manager and API (json or xmlrpc)",
+    ["manager", "api"],
+    registry=REGISTRY,
+)
+
+PYPI_THROTTLED_TOTAL = Counter(
+    "jupyterlab_pypi_throttled",
+    "counter for the requests throttled by the package index labeled by extension manager and API (json or xmlrpc)",
+    ["manager", "api"],
+    registry=REGISTRY,
+)
+
+APP_HANDLER_CREATED_TOTAL = Counter(
+    "jupyterlab_app_handler_created",
+    "counter for the application handlers constructed",
+    registry=REGISTRY,
+)
+
+TARBALL_READS_TOTAL = Counter(
+    "jupyterlab_tarball_reads",
+    "counter for the extension tarballs read labeled by operation (package or checksum)",
+    ["operation"],
+    registry=REGISTRY,
+)
+
+# Whether the metrics are registered in the default Prometheus registry
+_exported = False
+
+
+def export_metrics() -> None:
+    """Export the JupyterLab metrics along the Jupyter Server ones.
+
+    The metrics registry is registered once in the default Prometheus registry.
+    """
+    global _exported  # noqa: PLW0603
+    if not _exported:
+        prometheus_client.REGISTRY.register(REGISTRY)
+        _exported = True
+
+
+def record_api_requests(settings: dict, api_path: str) -> None:
+    """Record the duration of the JupyterLab API requests.
+
+    The tornado ``log_function`` setting, called at the end of every request,
+    is wrapped to record the requests whose path starts with ``api_path``.
+
+    Args:
+        settings: Tornado application settings
+        api_path: Path prefix of the JupyterLab API
+    """
+    log_function = settings.get("log_function")
+    if getattr(log_function, "jupyterlab_api_path", None) == api_path:
+        return
+
+    def log_request(handler: RequestHandler) -> None:
+        if handler.request.path.startswith(api_path):
+            API_REQUEST_DURATION_SECONDS.labels(
+                method=handler.request.method,
+                handler=f"{handler.__class__.__module__}.{type(handler).__name__}",
+                status_code=handler.get_status(),
+            ).observe(handler.request.request_time())
+        if log_function is not None:
+            log_function(handler)
+
+    log_request.jupyterlab_api_path = api_path  # type: ignore[attr-defined]
+    settings["log_function"] = log_request
@@ -8,6 +8,8 @@ class Response(NamedTuple):
     """Fake tornado response."""
 
     body: bytes
+    code: int = 200
+    headers: dict = {}  # noqa: RUF012
 
 
 def fake_client_factory():
@@ -1,25 +1,59 @@
 # Copyright (c) Jupyter Development Team.
 # Distributed under the terms of the Modified BSD License.
 
+import asyncio
+import dataclasses
 import json
+import math
+import os
+import sqlite3
 import sys
+import threading
+import time
+import xmlrpc.client
+import zipfile
+from subprocess import CompletedProcess
 from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
+from packaging.utils import canonicalize_name
 from tornado import web
+from tornado.httpclient import HTTPClientError
 from traitlets.config import Config, Configurable
 
+from jupyterlab._version import __version__
 from jupyterlab.extensions import PyPIExtensionManager, ReadOnlyExtensionManager
+from jupyterlab.extensions import manager as manager_module
+from jupyterlab.extensions import pypi as pypi_module
+from jupyterlab.extensions import wheelhouse as wheelhouse_module
+from jupyterlab.extensions.executor import BoundedExecutor
+from jupyterlab.extensions.index import JSONIndexSource, PyPIIndexSource
+from jupyterlab.extensions.installer import PipInstaller, UvInstaller, get_installer
+from jupyterlab.extensions.jobs import ExtensionJob, current_job
 from jupyterlab.extensions.manager import (
     ActionResult,
+    BatchActionResult,
     ExtensionManager,
     ExtensionPackage,
+    ExtensionsCacheStore,
+    ListingPolicy,
     PluginManager,
 )
 from jupyterlab.extensions.pypi import _check_python_version_compatible
-from jupyterlab.handlers.extension_manager_handler import ExtensionHandler
+from jupyterlab.extensions.ratelimit import Priority, RateLimiter, get_rate_limiter
+from jupyterlab.extensions.search import SearchIndex
+from jupyterlab.extensions.singleflight import SharedStream, SingleFlight
+from jupyterlab.extensions.store import MetadataStore
+from jupyterlab.extensions.wheelhouse import WheelhouseExtensionManager, WheelhouseIndexSource
+from jupyterlab.handlers.extension_manager_handler import (
+    ExtensionHandler,
+    ExtensionJobHandler,
+    extension_jobs_handler_path,
+    extensions_handler_path,
+)
 
-from . import fake_client_factory
+from . import Response, fake_client_factory
 
 
 @pytest.mark.parametrize(
@@ -117,6 +151,444 @@ async def test_ExtensionManager_list_extensions_installed(monkeypatch):
     extensions = await manager.list_extensions()
 
     assert extensions == ([extension1], 1)
+    await manager.list_extensions()
+    assert manager.extensions_cache_stats["hits"] == 1
+    assert manager.extensions_cache_stats["misses"] == 1
+
+
+def test_ExtensionsCacheStore_lru_eviction():
+    store = ExtensionsCacheStore(max_entries=2)
+    store.set_page("a", 1, {})
+    store.set_page("b", 1, {})
+    assert store.get("a") is not None
+    store.set_page("c", 1, {})
+
+    assert "a" in store
+    assert "b" not in store
+    assert "c" in store
+    assert store.evictions == 1
+
+
+def test_ExtensionsCacheStore_size_eviction():
+    def packages(prefix, count):
+        return {
+            f"{prefix}{i}": ExtensionPackage(f"{prefix}{i}", "", "", "prebuilt")
+            for i in range(count)
+        }
+
+    store = ExtensionsCacheStore(max_packages=5)
+    store.set_page("a", 1, packages("a", 3))
+    store.set_page("b", 1, packages("b", 2))
+    assert store.size == 5
+    store.set_page("b", 2, packages("c", 1))
+
+    assert "a" not in store
+    assert store.size == 3
+    # The most recent entry is kept even if it is too large
+    store.set_page("d", 1, packages("d", 10))
+    assert len(store) == 1
+    assert "d" in store
+
+
+def test_ExtensionsCacheStore_ttl(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("jupyterlab.extensions.manager.time.monotonic", lambda: now)
+    store = ExtensionsCacheStore(ttl=10)
+    store.set_page("a", 1, {})
+
+    assert store.has_page("a", 1)
+    assert not store.has_page("a", 2)
+    now += 11
+    assert not store.has_page("a", 1)
+    assert store.stats() == {"entries": 0, "size": 0, "hits": 1, "misses": 2, "evictions": 1}
+
+
+async def test_ExtensionManager_list_extensions_installed_stale_while_revalidate(monkeypatch):
+    extension1 = ExtensionPackage(
+        "extension1",
+        "Extension 1 description",
+        "",
+        "prebuilt",
+        installed=True,
+        installed_version="1.0.0",
+        latest_version="1.0.0",
+    )
+
+    async def mock_installed(*args, **kwargs):
+        assert kwargs == {"get_latest_version": False}
+        return {"extension1": extension1}
+
+    release = asyncio.Event()
+
+    async def mock_latest_version(self, name):
+        await release.wait()
+        return "2.0.0"
+
+    monkeypatch.setattr(ReadOnlyExtensionManager, "_get_installed_extensions", mock_installed)
+    monkeypatch.setattr(ReadOnlyExtensionManager, "get_latest_version", mock_latest_version)
+
+    manager = ReadOnlyExtensionManager()
+
+    # Answered from local data without waiting for the latest versions
+    extensions, _ = await manager.list_extensions()
+    assert extensions == [extension1]
+    revision = manager.installed_revision
+
+    release.set()
+    await manager._latest_versions_task
+
+    assert manager.installed_revision > revision
+    extensions, _ = await manager.list_extensions()
+    assert [e.latest_version for e in extensions] == ["2.0.0"]
+
+    # A new scan reuses the last known latest versions
+    await manager.refresh(None, 1, 30)
+    extensions, _ = await manager.list_extensions()
+    assert [e.latest_version for e in extensions] == ["2.0.0"]
+    await manager._latest_versions_task
+
+
+async def test_ExtensionManager_refresh_installed_keeps_latest_versions_lookup(monkeypatch):
+    installed = {
+        "extension1": ExtensionPackage(
+            "extension1", "", "", "prebuilt", installed=True, installed_version="1.0.0"
+        )
+    }
+    lookups = []
+    release = asyncio.Event()
+
+    async def mock_installed(*args, **kwargs):
+        return dict(installed)
+
+    async def mock_latest_version(self, name):
+        lookups.append(name)
+        await release.wait()
+        return "2.0.0"
+
+    monkeypatch.setattr(ReadOnlyExtensionManager, "_get_installed_extensions", mock_installed)
+    monkeypatch.setattr(ReadOnlyExtensionManager, "get_latest_version", mock_latest_version)
+
+    manager = ReadOnlyExtensionManager()
+    await manager.list_extensions()
+    task = manager._latest_versions_task
+    await asyncio.sleep(0)
+
+    installed["extension2"] = ExtensionPackage(
+        "extension2", "", "", "prebuilt", installed=True, installed_version="1.0.0"
+    )
+    await manager.refresh(None, 1, 30)
+
+    # The lookup in flight is not restarted
+    assert manager._latest_versions_task is task
+    release.set()
+    await task
+
+    assert lookups == ["extension1", "extension2"]
+    extensions, _ = await manager.list_extensions()
+    assert [e.latest_version for e in extensions] == ["2.0.0", "2.0.0"]
+
+
+async def test_ExtensionHandler_installed_etag(
+    jp_serverapp, jp_fetch, make_labserver_extension_app, monkeypatch
+):
+    installed = {
+        "extension1": ExtensionPackage("extension1", "Extension 1 description", "", "prebuilt")
+    }
+
+    async def mock_installed(*args, **kwargs):
+        return installed
+
+    monkeypatch.setattr(ReadOnlyExtensionManager, "_get_installed_extensions", mock_installed)
+
+    app = make_labserver_extension_app()
+    app._link_jupyter_server_extension(jp_serverapp)
+    app.handlers.append(
+        (extensions_handler_path, ExtensionHandler, {"manager": ReadOnlyExtensionManager()})
+    )
+    app.initialize()
+
+    response = await jp_fetch("lab", "api", "extensions", method="GET")
+    assert response.code == 200
+    assert json.loads(response.body)[0]["name"] == "extension1"
+    etag = response.headers["ETag"]
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("lab", "api", "extensions", method="GET", headers={"If-None-Match": etag})
+    assert e.value.code == 304
+
+    # The entity tag is derived from the content, so it does not depend on the process
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch(
+            "lab",
+            "api",
+            "extensions",
+            method="GET",
+            params={"refresh": "1"},
+            headers={"If-None-Match": etag},
+        )
+    assert e.value.code == 304
+
+    installed["extension1"] = dataclasses.replace(
+        installed["extension1"], installed_version="2.0.0"
+    )
+    response = await jp_fetch(
+        "lab",
+        "api",
+        "extensions",
+        method="GET",
+        params={"refresh": "1"},
+        headers={"If-None-Match": etag},
+    )
+    assert response.code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_ExtensionHandler_search_etag(jp_serverapp, jp_fetch, make_labserver_extension_app):
+    manager = ReadOnlyExtensionManager()
+    packages = {
+        "jupyterlab-git": ExtensionPackage(
+            "jupyterlab-git", "Git", "", "prebuilt", install={"packageManager": "python"}
+        )
+    }
+    manager.list_packages = AsyncMock(return_value=(packages, 1))
+    app = make_labserver_extension_app()
+    app._link_jupyter_server_extension(jp_serverapp)
+    app.handlers.append((extensions_handler_path, ExtensionHandler, {"manager": manager}))
+    app.initialize()
+
+    response = await jp_fetch("lab", "api", "extensions", method="GET", params={"query": "git"})
+    assert json.loads(response.body) == [dataclasses.asdict(packages["jupyterlab-git"])]
+    assert response.headers["Link"].startswith("<http://")
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch(
+            "lab",
+            "api",
+            "extensions",
+            method="GET",
+            params={"query": "git"},
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+    assert e.value.code == 304
+
+
+async def test_ExtensionHandler_search_ndjson(jp_serverapp, jp_fetch, make_labserver_extension_app):
+    manager = ReadOnlyExtensionManager()
+    packages = {
+        name: ExtensionPackage(name, "", "", "prebuilt")
+        for name in ("jupyterlab-git", "jupyterlab-gitlab")
+    }
+    manager.list_packages = AsyncMock(return_value=(packages, 3))
+    app = make_labserver_extension_app()
+    app._link_jupyter_server_extension(jp_serverapp)
+    app.handlers.append((extensions_handler_path, ExtensionHandler, {"manager": manager}))
+    app.initialize()
+
+    for _ in range(2):
+        response = await jp_fetch(
+            "lab",
+            "api",
+            "extensions",
+            method="GET",
+            params={"query": "git", "per_page": "2"},
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.body.splitlines()]
+        assert records == [
+            {
+                "type": "extension",
+                "index": 0,
+                "extension": dataclasses.asdict(packages["jupyterlab-git"]),
+            },
+            {
+                "type": "extension",
+                "index": 1,
+                "extension": dataclasses.asdict(packages["jupyterlab-gitlab"]),
+            },
+            {"type": "pagination", "page": 1, "per_page": 2, "last_page": 3},
+        ]
+    # The streamed page is cached
+    manager.list_packages.assert_awaited_once()
+
+
+async def test_ExtensionManager_stream_extensions_error():
+    manager = ReadOnlyExtensionManager()
+    manager.list_packages = AsyncMock(side_effect=RuntimeError("index unavailable"))
+
+    with pytest.raises(RuntimeError):
+        _, extensions = await manager.stream_extensions("git")
+        [item async for item in extensions]
+    assert not manager._extensions_cache.has_page("git", 1)
+
+
+async def test_ExtensionManager_stream_extensions_refresh_shared(monkeypatch):
+    packages = [
+        ExtensionPackage(name=name, description="", homepage_url="", pkg_type="prebuilt")
+        for name in ("jupyterlab-git", "jupyterlab-gitlab")
+    ]
+    calls = 0
+    release = asyncio.Event()
+
+    async def iter_packages(self, query, page, per_page):
+        nonlocal calls
+        calls += 1
+
+        async def iterate():
+            yield 0, packages[0]
+            await release.wait()
+            yield 1, packages[1]
+
+        return 1, iterate()
+
+    monkeypatch.setattr(ReadOnlyExtensionManager, "iter_packages", iter_packages)
+    manager = ReadOnlyExtensionManager()
+    manager._extensions_cache.set_page("git", 1, {}, 1)
+
+    # The refreshed page is streamed as soon as its extensions are fetched
+    _, first = await manager.stream_extensions("git", 1, 30, refresh=True)
+    assert await anext(first) == (0, packages[0])
+
+    # Duplicate listings reuse the fetch in flight
+    _, second = await manager.stream_extensions("git", 1, 30, refresh=True)
+    refresh = asyncio.ensure_future(manager.refresh("git", 1, 30))
+    assert await anext(second) == (0, packages[0])
+    await asyncio.sleep(0.01)
+    assert not refresh.done()
+    release.set()
+    assert [item async for item in first] == [(1, packages[1])]
+    assert [item async for item in second] == [(1, packages[1])]
+    await refresh
+
+    assert calls == 1
+    extensions, _ = await manager.list_extensions("git", 1, 30)
+    assert extensions == packages
+
+
+async def test_SharedStream():
+    release = asyncio.Event()
+
+    async def iterate():
+        yield 1
+        await release.wait()
+        yield 2
+        raise RuntimeError("upstream failure")
+
+    stream = SharedStream(iterate())
+    first = stream.follow()
+    assert await anext(first) == 1
+    release.set()
+    # A late reader gets the items consumed before it joined
+    with pytest.raises(RuntimeError):
+        [item async for item in stream.follow()]
+    assert stream.items == [1, 2]
+    assert await anext(first) == 2
+    with pytest.raises(RuntimeError):
+        await anext(first)
+
+    # The iteration is cancelled once all its readers are closed
+    release.clear()
+    stream = SharedStream(iterate())
+    reader = stream.follow()
+    await anext(reader)
+    await reader.aclose()
+    await asyncio.sleep(0)
+    assert stream.task.cancelled()
+
+
+@patch("jupyterlab.extensions.pypi.LANGUAGE_PACKS", ())
+@patch("jupyterlab.extensions.pypi.xmlrpc.client")
+async def test_PyPiExtensionManager_iter_packages_yields_when_ready(mocked_rpcclient):
+    names = ("jupyterlab-drawio", "jupyterlab-lsp")
+    proxy = Mock(browse=Mock(return_value=[[name, "1.0.0"] for name in names]))
+    mocked_rpcclient.ServerProxy = Mock(return_value=proxy)
+    manager = PyPIExtensionManager()
+    manager._fetch_package_metadata = AsyncMock(return_value={"summary": "Extension"})
+    expected = list((await manager.list_packages("jupyterlab", 1, 10))[0])
+
+    # The first extension metadata are fetched last
+    first_fetched = asyncio.Event()
+
+    async def get_metadata(name, version):
+        if name == expected[0]:
+            await first_fetched.wait()
+        else:
+            first_fetched.set()
+        return {}
+
+    manager._get_package_metadata = get_metadata
+    last_page, extensions = await manager.iter_packages("jupyterlab", 1, 10)
+
+    assert last_page == 1
+    assert [(index, ext.name) async for index, ext in extensions] == [
+        (1, expected[1]),
+        (0, expected[0]),
+    ]
+
+
+async def test_ExtensionManager_list_extensions_json_is_cached():
+    manager = ReadOnlyExtensionManager()
+    package = ExtensionPackage("jupyterlab-git", "Git", "", "prebuilt")
+    manager.list_packages = AsyncMock(return_value=({"jupyterlab-git": package}, 1))
+
+    body, etag, last_page = await manager.list_extensions_json("git")
+    assert json.loads(body) == [dataclasses.asdict(package)]
+    assert last_page == 1
+    # The page is not encoded again
+    assert (await manager.list_extensions_json("git"))[0] is body
+
+    manager._listings_block_mode = False
+    manager._listings_cache = {"jupyterlab-other": {"name": "jupyterlab-other"}}
+    filtered, filtered_etag, _ = await manager.list_extensions_json("git")
+    assert filtered == b"[]"
+    assert filtered_etag != etag
+
+
+async def test_ExtensionManager_get_latest_versions_concurrently():
+    running = 0
+    max_running = 0
+
+    async def mock_latest_version(name):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        try:
+            if name == "slow":
+                await asyncio.sleep(10)
+            elif name == "failing":
+                raise RuntimeError("PyPI is down")
+            elif name == "unknown":
+                return None
+            await asyncio.sleep(0.01)
+            return "2.0.0"
+        finally:
+            running -= 1
+
+    manager = ReadOnlyExtensionManager()
+    manager.latest_version_concurrency = 2
+    manager.latest_version_timeout = 0.1
+    manager.get_latest_version = mock_latest_version
+    names = ["ext1", "slow", "ext2", "failing", "unknown", "ext3"]
+    extensions = {
+        name: ExtensionPackage(
+            name, "", "", "prebuilt", latest_version="1.0.0", installed_version="1.0.0"
+        )
+        for name in names
+    }
+
+    result = await manager._get_latest_versions(extensions)
+
+    assert list(result) == names
+    assert {name: pkg.latest_version for name, pkg in result.items()} == {
+        "ext1": "2.0.0",
+        "slow": "1.0.0",
+        "ext2": "2.0.0",
+        "failing": "1.0.0",
+        "unknown": "1.0.0",
+        "ext3": "2.0.0",
+    }
+    assert max_running == 2
 
 
 async def test_ExtensionManager_list_extensions_query(monkeypatch):
@@ -282,7 +754,7 @@ async def test_pypi_manager_install_blocks_policy_denial_before_pip():
     if manager._listing_fetch is not None:
         manager._listing_fetch.stop()
 
-    with patch("jupyterlab.extensions.pypi.run") as run_mock:
+    with patch("jupyterlab.extensions.pypi.asyncio.create_subprocess_exec") as run_mock:
         result = await manager.install("JupyterLab.Git")
 
     assert result == ActionResult(status="error", message="install is not allowed")
@@ -394,6 +866,48 @@ async def test_ExtensionManager_list_extensions_query_sort(mocked_rpcclient):
     ]
 
 
+@patch("jupyterlab.extensions.pypi.LANGUAGE_PACKS", ())
+@patch("jupyterlab.extensions.pypi.xmlrpc.client")
+async def test_PyPiExtensionManager_list_packages_fetches_page_only(mocked_rpcclient):
+    names = [f"jupyterlab-ext{i}" for i in range(7)]
+    proxy = Mock(browse=Mock(return_value=[[name, "1.0.0"] for name in names]))
+    mocked_rpcclient.ServerProxy = Mock(return_value=proxy)
+
+    manager = PyPIExtensionManager()
+    manager.metadata_fetch_concurrency = 2
+    # Do not index the packages metadata in the background
+    manager._schedule_index_metadata = Mock()
+
+    fetched = []
+    running = 0
+    max_running = 0
+
+    async def mock_pkg_metadata(name, version, base_url):
+        nonlocal running, max_running
+        fetched.append(name)
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"summary": name}
+
+    manager._fetch_package_metadata = mock_pkg_metadata
+
+    # The metadata of all the matches are indexed once to rank them
+    extensions, last_page = await manager.list_packages("ext", page=1, per_page=3)
+    assert list(extensions) == ["jupyterlab-ext0", "jupyterlab-ext1", "jupyterlab-ext2"]
+    assert sorted(set(fetched)) == names
+    assert max_running == 2
+
+    fetched.clear()
+    extensions, last_page = await manager.list_packages("ext", page=2, per_page=3)
+
+    assert list(extensions) == ["jupyterlab-ext3", "jupyterlab-ext4", "jupyterlab-ext5"]
+    assert last_page == 3
+    assert sorted(fetched) == ["jupyterlab-ext3", "jupyterlab-ext4", "jupyterlab-ext5"]
+    assert max_running == 2
+
+
 @patch("jupyterlab.extensions.pypi.LANGUAGE_PACKS", ())
 @patch("jupyterlab.extensions.pypi.xmlrpc.client")
 async def test_PyPiExtensionManager_list_extensions_query(mocked_rpcclient):
@@ -613,6 +1127,82 @@ async def test_PluginManager_default_level():
     assert manager.level == "sys_prefix"
 
 
+async def test_PluginManager_toggle_runs_off_event_loop(monkeypatch):
+    calls = []
+
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        calls.append((plugins, threading.current_thread()))
+        return list(plugins)
+
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
+    manager = PluginManager()
+
+    result = await manager.disable(["a:plugin", "b"])
+
+    assert result == ActionResult(status="ok", needs_restart=["frontend"])
+    assert len(calls) == 1
+    plugins, thread = calls[0]
+    assert plugins == {"a:plugin": True, "b": True}
+    assert thread is not threading.current_thread()
+    assert manager.executor.metrics.completed == 1
+
+
+async def test_PluginManager_shared_executor_serializes_page_config_updates(monkeypatch):
+    running = 0
+    max_running = 0
+
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        time.sleep(0.05)
+        running -= 1
+        return list(plugins)
+
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
+    ext_manager = ReadOnlyExtensionManager()
+    manager = PluginManager(executor=ext_manager.executor)
+
+    await asyncio.gather(ext_manager.disable("a"), manager.disable("b"))
+
+    assert manager.executor is ext_manager.executor
+    assert max_running == 1
+    assert ext_manager.executor.metrics.completed == 2
+
+
+async def test_BoundedExecutor_metrics():
+    executor = BoundedExecutor(max_workers=1)
+    release = threading.Event()
+
+    def fail():
+        raise ValueError("failure")
+
+    first = asyncio.ensure_future(executor.run(release.wait, 5))
+    second = asyncio.ensure_future(executor.run(lambda value: value, value=42))
+    for _ in range(500):
+        if executor.metrics.running == 1:
+            break
+        await asyncio.sleep(0.01)
+    metrics = executor.metrics
+    assert metrics.max_workers == 1
+    assert metrics.running == 1
+    assert metrics.queued == 1
+
+    release.set()
+    assert await first is True
+    assert await second == 42
+    with pytest.raises(ValueError):
+        await executor.run(fail)
+
+    metrics = executor.metrics
+    assert metrics.queued == 0
+    assert metrics.running == 0
+    assert metrics.completed == 2
+    assert metrics.failed == 1
+    assert metrics.total_time >= metrics.max_time > 0
+    executor.shutdown()
+
+
 @pytest.mark.parametrize(
     "name,expected",
     [
@@ -642,13 +1232,13 @@ async def test_pypi_manager_install_blocks_when_policy_denies():
     manager = PyPIExtensionManager()
     manager.is_install_allowed = AsyncMock(return_value=False)
 
-    with patch("jupyterlab.extensions.pypi.tornado.ioloop.IOLoop.current") as current_loop:
-        result = await manager.install("jupyterlab-evil", "1.0.0")
+    manager._run_pip = AsyncMock()
+    result = await manager.install("jupyterlab-evil", "1.0.0")
 
     assert result.status == "error"
     assert result.message == "install is not allowed"
     manager.is_install_allowed.assert_awaited_once_with("jupyterlab-evil", "1.0.0")
-    current_loop.assert_not_called()
+    manager._run_pip.assert_not_called()
 
 
 async def test_handler_blocks_install_when_policy_denies():
@@ -663,3 +1253,1161 @@ async def test_handler_blocks_install_when_policy_denies():
     assert "was blocked" in exc_info.value.log_message
     handler.manager.is_install_allowed.assert_called_once_with("jupyterlab-evil", None)
     handler.manager.install.assert_not_called()
+
+
+async def test_MetadataStore_roundtrip(tmp_path):
+    path = tmp_path / "store" / "metadata.sqlite"
+    store = MetadataStore(path, ttl=60)
+
+    assert await store.get("latest_version", "pkg") is None
+    await store.set("latest_version", "pkg", "1.0.0")
+    await store.set("listing", "index", [["pkg", "1.0.0"]])
+
+    # Another process sharing the same database
+    other = MetadataStore(path, ttl=60)
+    assert await other.get("latest_version", "pkg") == ("1.0.0", True)
+    assert await other.get("listing", "index") == ([["pkg", "1.0.0"]], True)
+
+    # Expired entries are still returned, flagged as stale
+    stale = MetadataStore(path, ttl=0)
+    assert await stale.get("latest_version", "pkg") == ("1.0.0", False)
+
+    for metadata_store in (store, other, stale):
+        metadata_store.close()
+
+
+async def test_MetadataStore_keeps_its_connection(tmp_path):
+    store = MetadataStore(tmp_path / "metadata.sqlite", ttl=60)
+    connections = []
+    connect = sqlite3.connect
+
+    def tracked_connect(*args, **kwargs):
+        connections.append(threading.current_thread().name)
+        return connect(*args, **kwargs)
+
+    with patch("jupyterlab.extensions.store.sqlite3.connect", tracked_connect):
+        for version in ("1.0.0", "1.1.0"):
+            await store.set("latest_version", "pkg", version)
+        assert await store.get("latest_version", "pkg") == ("1.1.0", True)
+
+    assert len(connections) == 1
+    assert connections[0].startswith("jupyterlab-metadata-store")
+    store.close()
+
+
+async def test_MetadataStore_broken_database(tmp_path):
+    path = tmp_path / "metadata.sqlite"
+    path.write_text("not a database")
+    store = MetadataStore(path, ttl=60)
+
+    await store.set("latest_version", "pkg", "1.0.0")
+    assert await store.get("latest_version", "pkg") is None
+
+
+async def test_PyPiExtensionManager_metadata_store_stale_fallback(tmp_path):
+    parent = Configurable(
+        config=Config(
+            {
+                "PyPIExtensionManager": {
+                    "metadata_store_path": str(tmp_path / "metadata.sqlite"),
+                    "metadata_store_ttl": 0,
+                }
+            }
+        )
+    )
+    manager = PyPIExtensionManager(parent=parent)
+    manager._httpx_client = AsyncMock()
+    manager._httpx_client.get.return_value = Mock(
+        status_code=200, content=json.dumps({"info": {"version": "2.0.0a1"}}).encode()
+    )
+
+    assert await manager.get_latest_version("jupyterlab-git") == "2.0.0-alpha.1"
+
+    # PyPI is unreachable, the stale stored version is used
+    manager._httpx_client.get.side_effect = RuntimeError("Network unreachable")
+    assert await manager.get_latest_version("jupyterlab-git") == "2.0.0-alpha.1"
+    assert await manager.get_latest_version("jupyterlab-unknown") is None
+
+
+def test_SearchIndex_search():
+    index = SearchIndex(default_priority=3)
+    index.add(
+        "jupyterlab-git", "0.50.0", summary="A Git extension", keywords="Git,JupyterLab", priority=1
+    )
+    index.add("jupyterlab-gitlab", "4.0.0", summary="GitLab file browser", priority=2)
+    index.add(
+        "jupyterlab-spellchecker",
+        "0.8.4",
+        summary="Spellchecker for markdown cells",
+        keywords=["spell"],
+    )
+    index.add("jupyterlab-variableinspector", "3.2.0", summary="Inspect the variables")
+
+    # Exact matches rank before prefix matches
+    assert [p.name for p in index.search("git")] == ["jupyterlab-git", "jupyterlab-gitlab"]
+    # Prefix match
+    assert [p.name for p in index.search("variab")] == ["jupyterlab-variableinspector"]
+    # Approximate match
+    assert [p.name for p in index.search("spelchecker")] == ["jupyterlab-spellchecker"]
+    # Summary and keywords are searched; all query tokens must match
+    assert [p.name for p in index.search("markdown spell")] == ["jupyterlab-spellchecker"]
+    assert index.search("markdown git") == []
+    # Substring of the name
+    assert [p.name for p in index.search("lab-var")] == ["jupyterlab-variableinspector"]
+    # Empty query sorts by priority then name
+    assert [p.name for p in index.search("")] == [
+        "jupyterlab-git",
+        "jupyterlab-gitlab",
+        "jupyterlab-spellchecker",
+        "jupyterlab-variableinspector",
+    ]
+
+
+def test_SearchIndex_replace_and_remove():
+    index = SearchIndex()
+    index.add("jupyterlab-git", "0.50.0", summary="Version control")
+    index.add("jupyterlab-git", "0.51.0", summary="Git integration")
+
+    assert len(index) == 1
+    assert index.get("jupyterlab-git").version == "0.51.0"
+    assert index.search("version") == []
+    assert [p.name for p in index.search("integration")] == ["jupyterlab-git"]
+
+    index.remove("jupyterlab-git")
+    assert "jupyterlab-git" not in index
+    assert index.search("git") == []
+
+
+@patch("jupyterlab.extensions.pypi.LANGUAGE_PACKS", ())
+@patch("jupyterlab.extensions.pypi.xmlrpc.client")
+async def test_PyPiExtensionManager_search_summary_and_keywords(mocked_rpcclient):
+    metadata = {
+        "jupyterlab-drawio": {"summary": "Draw diagrams", "keywords": "diagram,editor"},
+        "jupyterlab-lsp": {"summary": "Language Server Protocol integration", "keywords": ""},
+    }
+    proxy = Mock(browse=Mock(return_value=[[name, "1.0.0"] for name in metadata]))
+    mocked_rpcclient.ServerProxy = Mock(return_value=proxy)
+
+    manager = PyPIExtensionManager()
+    indexed = asyncio.Event()
+
+    async def mock_pkg_metadata(name, version, base_url):
+        await indexed.wait()
+        return metadata[name]
+
+    manager._fetch_package_metadata = mock_pkg_metadata
+
+    # Before the metadata are indexed, only the names are searched
+    extensions, _ = await manager.list_packages("diagram", 1, 10)
+    assert list(extensions) == []
+
+    indexed.set()
+    await manager._index_task
+    extensions, last_page = await manager.list_packages("diagram", 1, 10)
+    assert list(extensions) == ["jupyterlab-drawio"]
+    assert last_page == 1
+    extensions, _ = await manager.list_packages("lang server", 1, 10)
+    assert list(extensions) == ["jupyterlab-lsp"]
+
+
+async def test_JSONIndexSource_local_file(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text(json.dumps({"projects": {"jupyterlab-git": "0.50.0"}}))
+    source = JSONIndexSource(str(path), client=Mock())
+
+    snapshot = await source.fetch(None)
+    assert snapshot.projects == {"jupyterlab-git": "0.50.0"}
+    # Not modified
+    assert await source.fetch(snapshot) is snapshot
+
+    path.write_text(json.dumps([["jupyterlab-git", "0.50.0"], ["jupyterlab-git", "0.51.0"]]))
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    updated = await source.fetch(snapshot)
+    assert updated.projects == {"jupyterlab-git": "0.51.0"}
+
+
+async def test_JSONIndexSource_conditional_request():
+    client = AsyncMock()
+    client.get.return_value = Mock(
+        status_code=200,
+        content=json.dumps({"projects": {"jupyterlab-git": "0.50.0"}}).encode(),
+        headers={"ETag": '"v1"'},
+    )
+    source = JSONIndexSource("https://mirror.example/index.json", client)
+
+    snapshot = await source.fetch(None)
+    assert snapshot.projects == {"jupyterlab-git": "0.50.0"}
+
+    client.get.return_value = Mock(status_code=304)
+    assert await source.fetch(snapshot) is snapshot
+    assert client.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+async def test_PyPIIndexSource_extra_projects_conditional_request():
+    client = AsyncMock()
+    client.get.return_value = Mock(
+        status_code=200,
+        content=json.dumps({"info": {"version": "4.0.post0"}}).encode(),
+        headers={"ETag": '"pack"'},
+    )
+    rpc_client = Mock(browse=Mock(return_value=[["jupyterlab-git", "0.50.0"]]))
+    source = PyPIIndexSource(
+        "https://pypi.org/pypi",
+        client,
+        rpc_client,
+        extra_projects=["jupyterlab-language-pack-fr-FR"],
+    )
+
+    snapshot = await source.fetch(None)
+    assert snapshot.projects == {
+        "jupyterlab-git": "0.50.0",
+        "jupyterlab-language-pack-fr-FR": "4.0.post0",
+    }
+
+    client.get.return_value = Mock(status_code=304)
+    assert await source.fetch(snapshot) is snapshot
+    assert client.get.call_args.kwargs["headers"]["If-None-Match"] == '"pack"'
+
+
+async def test_PyPiExtensionManager_index_url_applies_changes_only(tmp_path):
+    path = tmp_path / "index.json"
+    path.write_text(
+        json.dumps({"projects": {"jupyterlab-git": "0.50.0", "jupyterlab-lsp": "5.0.0"}})
+    )
+    manager = PyPIExtensionManager(
+        parent=Configurable(
+            config=Config({"PyPIExtensionManager": {"index_url": str(path), "cache_timeout": 0}})
+        )
+    )
+    fetched = []
+
+    async def mock_pkg_metadata(name, version, base_url):
+        fetched.append((name, version))
+        return {"summary": name}
+
+    manager._fetch_package_metadata = mock_pkg_metadata
+
+    extensions, _ = await manager.list_packages("", 1, 10)
+    assert list(extensions) == ["jupyterlab-git", "jupyterlab-lsp"]
+    await manager._index_task
+
+    path.write_text(
+        json.dumps({"projects": {"jupyterlab-git": "0.51.0", "jupyterlab-drawio": "1.0.0"}})
+    )
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+    fetched.clear()
+    extensions, _ = await manager.list_packages("git", 1, 10)
+    await manager._index_task
+
+    assert list(extensions) == ["jupyterlab-git"]
+    assert extensions["jupyterlab-git"].latest_version == "0.51.0"
+    assert "jupyterlab-lsp" not in manager._search_index
+    # Only the changed projects metadata are fetched
+    assert set(fetched) == {("jupyterlab-drawio", "1.0.0"), ("jupyterlab-git", "0.51.0")}
+
+
+async def test_RateLimiter_priorities():
+    limiter = RateLimiter(rate=100.0, burst=1)
+    await limiter.acquire()
+
+    admitted = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        admitted.append(name)
+
+    await asyncio.gather(
+        request("background", Priority.BACKGROUND),
+        request("interactive-1", Priority.INTERACTIVE),
+        request("interactive-2", Priority.INTERACTIVE),
+    )
+
+    assert admitted == ["interactive-1", "interactive-2", "background"]
+    metrics = limiter.metrics
+    assert metrics.admitted == 4
+    assert metrics.delayed == 3
+
+
+async def test_RateLimiter_backoff():
+    limiter = RateLimiter()
+    limiter.throttled(retry_after=0.05)
+
+    assert limiter.metrics.throttled == 1
+    assert limiter.metrics.backoff == 1.0
+    start = asyncio.get_running_loop().time()
+    await limiter.acquire()
+    assert asyncio.get_running_loop().time() - start >= 0.04
+
+    limiter.succeeded()
+    assert limiter.metrics.backoff == 0.0
+
+
+async def test_RateLimiter_cancelled_waiter():
+    limiter = RateLimiter(rate=10.0, burst=1)
+    await limiter.acquire()
+
+    waiter = asyncio.ensure_future(limiter.acquire(Priority.INTERACTIVE))
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    # The cancelled waiter does not block the next ones
+    await asyncio.wait_for(limiter.acquire(Priority.BACKGROUND), 1)
+
+
+async def test_RateLimiter_queued_waiters_do_not_poll():
+    limiter = RateLimiter(rate=5.0, burst=1)
+    await limiter.acquire()
+    try_admit = limiter._try_admit
+    delays = []
+
+    def spy(entry):
+        delay = try_admit(entry)
+        delays.append((entry[0], delay))
+        return delay
+
+    with patch.object(limiter, "_try_admit", spy):
+        first = asyncio.ensure_future(limiter.acquire(Priority.INTERACTIVE))
+        second = asyncio.ensure_future(limiter.acquire(Priority.BACKGROUND))
+        await asyncio.sleep(0.1)
+        # The queued waiter waits to be woken up by the first one admission
+        assert [(priority, delay == math.inf) for priority, delay in delays] == [
+            (0, False),
+            (1, True),
+        ]
+        await asyncio.gather(first, second)
+
+    assert delays[2] == (0, None)
+    assert delays[-1] == (1, None)
+    assert limiter.metrics.admitted == 3
+
+
+async def test_PyPIExtensionManager_request_error_backoff():
+    def fail(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    manager = PyPIExtensionManager()
+    manager._rate_limiter = RateLimiter()
+    manager._httpx_client._transport = httpx.MockTransport(fail)
+
+    with pytest.raises(httpx.ConnectError):
+        await manager._httpx_client.get("https://pypi.org/pypi/jupyterlab-fake/json")
+
+    metrics = manager.rate_limiter_metrics
+    assert metrics.backoff == 1.0
+    assert metrics.throttled == 0
+    assert not manager._request_start
+
+
+def test_get_rate_limiter_is_shared():
+    limiter = get_rate_limiter("pypi.test", 5.0, 2)
+    assert get_rate_limiter("pypi.test", 5.0, 2) is limiter
+    assert get_rate_limiter("pypi.test", 1.0, 4) is limiter
+    assert (limiter.rate, limiter.burst) == (1.0, 4)
+    assert PyPIExtensionManager()._rate_limiter is get_rate_limiter("pypi.org", 10.0, 20)
+
+
+async def test_PyPIIndexSource_throttled_browse():
+    fault = xmlrpc.client.Fault(-32500, "HTTPTooManyRequests: Limit may reset in 0 seconds.")
+    rpc_client = Mock(browse=Mock(side_effect=[fault, [["jupyterlab-git", "0.50.0"]]]))
+    limiter = RateLimiter()
+    source = PyPIIndexSource("https://pypi.org/pypi", Mock(), rpc_client, rate_limiter=limiter)
+
+    snapshot = await source.fetch(None)
+
+    assert snapshot.projects == {"jupyterlab-git": "0.50.0"}
+    assert rpc_client.browse.call_count == 2
+    assert limiter.metrics.throttled == 1
+
+
+async def test_SingleFlight_merges_concurrent_calls():
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute(value):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(*(flight.do("key", compute, i) for i in range(3)))
+
+    assert results == [0, 0, 0]
+    assert calls == 1
+    assert (flight.calls, flight.merged) == (1, 2)
+    # A new call starts once the previous one is done
+    assert await flight.do("key", compute, 3) == 3
+
+
+async def test_SingleFlight_errors_and_cancellation():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failure")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("slow", slow))
+    second = asyncio.ensure_future(flight.do("slow", slow))
+    await started.wait()
+    # Cancelling one waiter does not cancel the shared call
+    first.cancel()
+    release.set()
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    # The shared call is cancelled with its last waiter
+    release.clear()
+    started.clear()
+    last = asyncio.ensure_future(flight.do("slow", slow))
+    await started.wait()
+    last.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await last
+    await asyncio.sleep(0)
+    assert "slow" not in flight
+
+
+async def test_ExtensionManager_concurrent_refreshes_are_merged():
+    manager = ReadOnlyExtensionManager()
+    calls = 0
+
+    async def mock_list_packages(query, page, per_page):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {}, 1
+
+    manager.list_packages = mock_list_packages
+
+    await asyncio.gather(*(manager.refresh("git", 1, 30) for _ in range(5)))
+    await asyncio.gather(*(manager.list_extensions("lsp") for _ in range(5)))
+
+    assert calls == 2
+
+
+@patch("jupyterlab.extensions.pypi.LANGUAGE_PACKS", ())
+@patch("jupyterlab.extensions.pypi.xmlrpc.client")
+async def test_PyPiExtensionManager_concurrent_index_updates_are_merged(mocked_rpcclient):
+    def browse(classifiers):
+        time.sleep(0.01)
+        return [["jupyterlab-git", "0.50.0"]]
+
+    proxy = Mock(browse=Mock(side_effect=browse))
+    mocked_rpcclient.ServerProxy = Mock(return_value=proxy)
+    manager = PyPIExtensionManager()
+    manager._schedule_index_metadata = Mock()
+
+    async def mock_pkg_metadata(name, version, base_url):
+        return {}
+
+    manager._fetch_package_metadata = mock_pkg_metadata
+
+    await asyncio.gather(*(manager.list_packages(q, 1, 10) for q in ["git", "lab", ""]))
+
+    assert proxy.browse.call_count == 1
+
+
+def test_ListingPolicy():
+    policy = ListingPolicy(
+        {
+            "jupyterlab-git": {"name": "jupyterlab-git"},
+            "@jupyterlab/*": {"name": "@jupyterlab/*"},
+            "jupyterlab-(lsp|drawio)": {"name": "jupyterlab-(lsp|drawio)"},
+            "jupyter-.*-theme": {"name": "jupyter-.*-theme"},
+            "invalid[": {"name": "invalid["},
+        },
+        canonicalize_name,
+    )
+
+    assert policy.names == {"jupyterlab-git", "invalid["}
+    assert "JupyterLab_Git" in policy
+    assert "@jupyterlab/git" in policy
+    assert "jupyterlab-lsp" in policy
+    assert "jupyterlab_drawio" in policy
+    assert "invalid[" in policy
+    assert "jupyterlab-lsp-extra" not in policy
+    assert "jupyterlab-evil" not in policy
+    # Wildcards following a regular expression atom are not glob patterns
+    assert "jupyter-dark-theme" in policy
+    assert "jupyter-.dark-theme" in policy
+    assert "jupyter-theme" not in policy
+
+
+async def test_ExtensionManager_list_extensions_blocklist_patterns():
+    manager = PyPIExtensionManager(
+        ext_options={"blocked_extensions_uris": {"http://dummy-blocked-extension"}}
+    )
+    if manager._listing_fetch is not None:
+        manager._listing_fetch.stop()
+    manager._listings_cache = {"jupyterlab-evil*": {"name": "jupyterlab-evil*"}}
+    packages = {
+        name: ExtensionPackage(name=name, description="", homepage_url="", pkg_type="prebuilt")
+        for name in ["jupyterlab-git", "jupyterlab-evil", "jupyterlab_evil_twin"]
+    }
+    manager.list_packages = AsyncMock(return_value=(packages, 1))
+
+    extensions, _ = await manager.list_extensions("jupyterlab")
+
+    assert [e.name for e in extensions] == ["jupyterlab-git"]
+    assert await manager.is_install_allowed("jupyterlab-evil-twin") is False
+    assert manager._listings_cache == {"jupyterlab-evil*": {"name": "jupyterlab-evil*"}}
+
+
+@pytest.mark.parametrize("mode", ["allowed", "blocked"])
+async def test_ExtensionManager_listing_regex_wildcard(mode):
+    manager = PyPIExtensionManager(
+        ext_options={f"{mode}_extensions_uris": {f"http://dummy-{mode}-extension"}}
+    )
+    if manager._listing_fetch is not None:
+        manager._listing_fetch.stop()
+    manager._listings_cache = {"jupyterlab-.*": {"name": "jupyterlab-.*"}}
+    packages = {
+        name: ExtensionPackage(name=name, description="", homepage_url="", pkg_type="prebuilt")
+        for name in ["jupyterlab-git", "jupyterlab_lsp", "jupyter-archive"]
+    }
+    manager.list_packages = AsyncMock(return_value=(packages, 1))
+
+    extensions, _ = await manager.list_extensions("jupyter")
+
+    matching = ["jupyterlab-git", "jupyterlab_lsp"]
+    if mode == "allowed":
+        assert [e.name for e in extensions] == matching
+    else:
+        assert [e.name for e in extensions] == ["jupyter-archive"]
+    for name in matching:
+        assert await manager.is_install_allowed(name) is (mode == "allowed")
+    assert await manager.is_install_allowed("jupyter-archive") is (mode == "blocked")
+
+
+async def test_ExtensionManager_fetch_listings_concurrent_and_conditional():
+    manager = PyPIExtensionManager(
+        ext_options={"blocked_extensions_uris": {"http://mirror-a", "http://mirror-b"}}
+    )
+    if manager._listing_fetch is not None:
+        manager._listing_fetch.stop()
+    manager.listings_fetch_timeout = 0.5
+
+    requests = []
+    running = 0
+    max_running = 0
+    mirror_b = {"fail": False, "slow": False}
+
+    class FakeClient:
+        async def fetch(self, uri, headers=None, **kwargs):
+            nonlocal running, max_running
+            requests.append((uri, dict(headers)))
+            running += 1
+            max_running = max(max_running, running)
+            try:
+                await asyncio.sleep(0.01)
+                if uri == "http://mirror-b":
+                    if mirror_b["slow"]:
+                        await asyncio.sleep(5)
+                    if mirror_b["fail"]:
+                        return Response(b"", code=500)
+                if headers.get("If-None-Match") == '"v1"':
+                    return Response(b"", code=304)
+                name = "jupyterlab-a" if uri == "http://mirror-a" else "jupyterlab-b"
+                body = json.dumps({"blocked_extensions": [{"name": name}]}).encode()
+                return Response(body, headers={"ETag": '"v1"'})
+            finally:
+                running -= 1
+
+    with patch("tornado.httpclient.AsyncHTTPClient", FakeClient):
+        await manager._fetch_listings()
+        assert set(manager._listings_cache) == {"jupyterlab-a", "jupyterlab-b"}
+        assert max_running == 2
+
+        # Unchanged listings are revalidated
+        requests.clear()
+        await manager._fetch_listings()
+        assert all(headers.get("If-None-Match") == '"v1"' for _, headers in requests)
+        assert set(manager._listings_cache) == {"jupyterlab-a", "jupyterlab-b"}
+
+        # A failing or slow URI keeps its last good rules
+        mirror_b["fail"] = True
+        await manager._fetch_listings()
+        assert set(manager._listings_cache) == {"jupyterlab-a", "jupyterlab-b"}
+        mirror_b["slow"] = True
+        await manager._fetch_listings()
+        assert set(manager._listings_cache) == {"jupyterlab-a", "jupyterlab-b"}
+
+
+@pytest.mark.parametrize("mode", ["allowed", "blocked"])
+async def test_ExtensionManager_fetch_listings_fails_closed_per_uri(mode):
+    manager = PyPIExtensionManager(
+        ext_options={f"{mode}_extensions_uris": {"http://mirror-a", "http://mirror-b"}}
+    )
+    if manager._listing_fetch is not None:
+        manager._listing_fetch.stop()
+    mirror_b = {"fail": True}
+
+    class FakeClient:
+        async def fetch(self, uri, headers=None, **kwargs):
+            name = "jupyterlab-a" if uri == "http://mirror-a" else "jupyterlab-b"
+            if uri == "http://mirror-b" and mirror_b["fail"]:
+                return Response(b"", code=500)
+            return Response(json.dumps({f"{mode}_extensions": [{"name": name}]}).encode())
+
+    with patch("tornado.httpclient.AsyncHTTPClient", FakeClient):
+        # The rules of the URIs fetched successfully apply
+        await manager._fetch_listings()
+        assert set(manager._listings_cache) == {"jupyterlab-a"}
+        assert manager._failed_listing_uris == {"http://mirror-b"}
+        if mode == "allowed":
+            assert await manager.is_install_allowed("jupyterlab-a") is True
+            assert await manager.is_install_allowed("jupyterlab-b") is False
+        else:
+            assert await manager.is_install_allowed("jupyterlab-a") is False
+            assert await manager.is_install_allowed("jupyterlab-c") is False
+
+        # The failed URIs are fetched again after a backoff delay
+        mirror_b["fail"] = False
+        assert await manager.is_install_allowed("jupyterlab-b") is False
+        assert manager._failed_listing_uris == {"http://mirror-b"}
+        manager._listings_retry_at = 0
+        assert await manager.is_install_allowed("jupyterlab-b") is (mode == "allowed")
+        assert manager._failed_listing_uris == set()
+        assert await manager.is_install_allowed("jupyterlab-c") is (mode == "blocked")
+
+
+async def test_ExtensionManager_fetch_listings_backs_off_failed_uris():
+    manager = PyPIExtensionManager(
+        ext_options={"blocked_extensions_uris": {"http://mirror"}, "listings_refresh_seconds": 12}
+    )
+    if manager._listing_fetch is not None:
+        manager._listing_fetch.stop()
+    requests = []
+
+    class FakeClient:
+        async def fetch(self, uri, headers=None, **kwargs):
+            requests.append(uri)
+            return Response(b"", code=500)
+
+    with patch("tornado.httpclient.AsyncHTTPClient", FakeClient):
+        assert await manager.is_install_allowed("jupyterlab-a") is False
+        assert await manager.is_install_allowed("jupyterlab-a") is False
+        assert len(requests) == 1
+
+        delays = []
+        for _ in range(3):
+            manager._listings_retry_at = 0
+            assert await manager.is_install_allowed("jupyterlab-a") is False
+            delays.append(manager._listings_retry_delay)
+        assert len(requests) == 4
+        assert delays == [10, 12, 12]
+
+
+async def test_PyPiExtensionManager_install_follow_ups_from_installed_files(tmp_path, monkeypatch):
+    dist_info = tmp_path / "jupyterlab_fake-1.0.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: jupyterlab-fake\nVersion: 1.0.0\n"
+    )
+    package_json = "share/jupyter/labextensions/jupyterlab-fake/package.json"
+    (dist_info / "RECORD").write_text(
+        f"jupyterlab_fake-1.0.0.dist-info/METADATA,,\n{package_json},,\n"
+    )
+    (tmp_path / package_json).parent.mkdir(parents=True)
+    (tmp_path / package_json).write_text(
+        json.dumps({"name": "jupyterlab-fake", "jupyterlab": {"discovery": {"server": {}}}})
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    manager = PyPIExtensionManager()
+    manager._httpx_client = AsyncMock()
+    manager._run_pip = AsyncMock(return_value=CompletedProcess([], 0, b"", b""))
+    result = await manager.install("jupyterlab_fake")
+
+    assert result == ActionResult(status="ok", needs_restart=["frontend", "server"])
+    # A single pip invocation and no download of the package
+    manager._run_pip.assert_called_once()
+    manager._httpx_client.get.assert_not_called()
+
+
+async def test_PyPiExtensionManager_uninstall_follow_ups_from_installed_files(
+    tmp_path, monkeypatch
+):
+    dist_info = tmp_path / "jupyterlab_fake-1.0.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: jupyterlab-fake\nVersion: 1.0.0\n"
+    )
+    package_json = "share/jupyter/labextensions/jupyterlab-fake/package.json"
+    (dist_info / "RECORD").write_text(
+        f"jupyterlab_fake-1.0.0.dist-info/METADATA,,\n{package_json},,\n"
+    )
+    (tmp_path / package_json).parent.mkdir(parents=True)
+    (tmp_path / package_json).write_text(
+        json.dumps({"name": "jupyterlab-fake", "jupyterlab": {"discovery": {"kernel": []}}})
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    manager = PyPIExtensionManager()
+    manager._run_pip = AsyncMock(return_value=CompletedProcess([], 0, b"", b""))
+    result = await manager.uninstall("jupyterlab_fake")
+
+    assert result == ActionResult(status="ok", needs_restart=["frontend", "kernel"])
+    # A single pip invocation, without a listing dry run
+    manager._run_pip.assert_called_once()
+    assert "--yes" in manager._run_pip.call_args[0][0]
+
+
+async def test_PyPiExtensionManager_run_pip_streams_output_to_job():
+    manager = PyPIExtensionManager()
+    job = ExtensionJob("install", "jupyterlab-fake")
+    current_job.set(job)
+
+    result = await manager._run_pip(
+        [sys.executable, "-c", "import sys; print('Collecting'); print('oops', file=sys.stderr)"]
+    )
+
+    assert result.returncode == 0
+    assert result.stdout.decode().strip() == "Collecting"
+    assert [e["line"] for e in job.events if e["type"] == "output"] == ["Collecting", "oops"]
+
+
+async def test_ExtensionManager_cancel_job_terminates_subprocess():
+    manager = PyPIExtensionManager()
+    started = asyncio.Event()
+    processes = []
+
+    async def install(name, version=None):
+        current_job.get().output("starting")
+        started.set()
+        result = await manager._run_pip([sys.executable, "-c", "import time; time.sleep(30)"])
+        return ActionResult(status="ok" if result.returncode == 0 else "error")
+
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def tracked_subprocess(*args, **kwargs):
+        process = await create_subprocess_exec(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    manager.install = install
+    with patch("jupyterlab.extensions.pypi.asyncio.create_subprocess_exec", tracked_subprocess):
+        job = manager.start_job("install", "jupyterlab-fake")
+        assert manager.get_job(job.id) is job
+        await started.wait()
+        await asyncio.sleep(0.1)
+        assert job.phase == "installing"
+
+        assert job.cancel()
+        events = [e async for e in job.follow()]
+
+    assert job.phase == "cancelled"
+    assert events[-1] == {"type": "phase", "phase": "cancelled"}
+    assert {"type": "output", "line": "starting"} in events
+    assert processes[0].returncode is not None
+
+
+async def test_ExtensionManager_jobs_run_one_at_a_time():
+    manager = PyPIExtensionManager()
+    release = asyncio.Event()
+    running = []
+
+    async def install(name, version=None):
+        running.append(name)
+        assert len(running) == 1
+        await release.wait()
+        running.remove(name)
+        return ActionResult(status="ok")
+
+    manager.install = install
+    first = manager.start_job("install", "jupyterlab-first")
+    second = manager.start_job("install", "jupyterlab-second")
+    third = manager.start_job("install", "jupyterlab-third")
+    await asyncio.sleep(0.1)
+
+    assert first.phase == "installing"
+    assert second.phase == "queued"
+    assert third.phase == "queued"
+
+    assert third.cancel()
+    await asyncio.sleep(0.1)
+    assert third.phase == "cancelled"
+    assert second.phase == "queued"
+
+    release.set()
+    [e async for e in second.follow()]
+
+    assert first.phase == "completed"
+    assert second.phase == "completed"
+    assert running == []
+
+
+async def test_PyPiExtensionManager_run_pip_without_loop_subprocess_support():
+    manager = PyPIExtensionManager()
+    job = ExtensionJob("install", "jupyterlab-fake")
+    current_job.set(job)
+
+    # Like the selector event loop of Jupyter Server on Windows
+    with patch(
+        "jupyterlab.extensions.pypi.asyncio.create_subprocess_exec",
+        AsyncMock(side_effect=NotImplementedError),
+    ):
+        result = await manager._run_pip(
+            [
+                sys.executable,
+                "-c",
+                "import sys; print('Collecting'); print('oops', file=sys.stderr)",
+            ]
+        )
+
+    assert result.returncode == 0
+    assert result.stdout.decode().strip() == "Collecting"
+    assert result.stderr.decode().strip() == "oops"
+    assert sorted(e["line"] for e in job.events if e["type"] == "output") == ["Collecting", "oops"]
+
+
+async def test_PyPiExtensionManager_run_pip_without_loop_subprocess_support_cancel():
+    manager = PyPIExtensionManager()
+    processes = []
+    popen = pypi_module.Popen
+
+    def tracked_popen(*args, **kwargs):
+        process = popen(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    with (
+        patch(
+            "jupyterlab.extensions.pypi.asyncio.create_subprocess_exec",
+            AsyncMock(side_effect=NotImplementedError),
+        ),
+        patch("jupyterlab.extensions.pypi.Popen", tracked_popen),
+    ):
+        task = asyncio.create_task(
+            manager._run_pip([sys.executable, "-c", "import time; time.sleep(30)"])
+        )
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert processes[0].poll() is not None
+
+
+async def test_ExtensionJobHandler(jp_serverapp, jp_fetch, make_labserver_extension_app):
+    manager = ReadOnlyExtensionManager()
+    release = asyncio.Event()
+
+    async def install(name, version=None):
+        current_job.get().output(f"Collecting {name}=={version}")
+        await release.wait()
+        current_job.get().output("Successfully installed")
+        return ActionResult(status="ok", needs_restart=["frontend"])
+
+    manager.install = install
+    manager.is_install_allowed = AsyncMock(return_value=True)
+    app = make_labserver_extension_app()
+    app._link_jupyter_server_extension(jp_serverapp)
+    app.handlers.append((extension_jobs_handler_path, ExtensionJobHandler, {"manager": manager}))
+    app.initialize()
+
+    response = await jp_fetch(
+        "lab",
+        "api",
+        "extensions",
+        "jobs",
+        method="POST",
+        body=json.dumps(
+            {"cmd": "install", "extension_name": "jupyterlab-fake", "extension_version": "1.0"}
+        ),
+    )
+    assert response.code == 202
+    job = json.loads(response.body)
+    assert response.headers["Location"].endswith(f"/lab/api/extensions/jobs/{job['id']}")
+
+    release.set()
+    response = await jp_fetch(
+        "lab", "api", "extensions", "jobs", job["id"], method="GET", params={"follow": "1"}
+    )
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    events = [json.loads(line) for line in response.body.decode().splitlines()]
+    assert [e.get("phase") or e.get("line") for e in events[:-1]] == [
+        "queued",
+        "installing",
+        "Collecting jupyterlab-fake==1.0",
+        "Successfully installed",
+        "completed",
+    ]
+    assert events[-1]["type"] == "status"
+    assert events[-1]["result"]["needs_restart"] == ["frontend"]
+
+    response = await jp_fetch("lab", "api", "extensions", "jobs", job["id"], method="GET")
+    assert json.loads(response.body)["output"] == [
+        "Collecting jupyterlab-fake==1.0",
+        "Successfully installed",
+    ]
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("lab", "api", "extensions", "jobs", job["id"], method="DELETE")
+    assert e.value.code == 409
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch(
+            "lab",
+            "api",
+            "extensions",
+            "jobs",
+            method="POST",
+            body=json.dumps({"cmd": "enable", "extension_name": "jupyterlab-fake"}),
+        )
+    assert e.value.code == 422
+
+
+def test_BatchActionResult_merge():
+    result = BatchActionResult.merge(
+        {
+            "a": ActionResult(status="ok", needs_restart=["server", "frontend"]),
+            "b": ActionResult(status="warning", needs_restart=["kernel", "frontend"]),
+        }
+    )
+
+    assert result.status == "warning"
+    assert result.needs_restart == ["frontend", "kernel", "server"]
+    assert BatchActionResult.merge({}).status == "ok"
+
+
+async def test_PyPiExtensionManager_install_many_single_pip_call():
+    manager = PyPIExtensionManager()
+    manager.is_install_allowed = AsyncMock(side_effect=lambda name, version: name != "evil")
+    manager._run_pip = AsyncMock(return_value=CompletedProcess([], 0, b"", b""))
+    follow_ups = {"a": ["frontend", "server"], "b": ["frontend", "kernel"]}
+    manager._get_install_follow_ups = AsyncMock(side_effect=lambda name: follow_ups[name])
+
+    result = await manager.install_many({"a": "1.0", "evil": None, "b": None})
+
+    manager._run_pip.assert_called_once()
+    cmdline = manager._run_pip.call_args[0][0]
+    assert cmdline[-2:] == ["a==1.0", "b"]
+    assert "evil" not in cmdline
+    assert list(result.results) == ["a", "evil", "b"]
+    assert result.results["a"] == ActionResult(status="ok", needs_restart=["frontend", "server"])
+    assert result.results["evil"].status == "error"
+    assert result.status == "error"
+    assert result.needs_restart == ["frontend", "kernel", "server"]
+
+
+async def test_PyPiExtensionManager_uninstall_many_single_pip_call():
+    manager = PyPIExtensionManager()
+    manager._run_pip = AsyncMock(return_value=CompletedProcess([], 1, b"", b"not installed"))
+    manager._get_install_follow_ups = AsyncMock(return_value=["frontend"])
+
+    result = await manager.uninstall_many(["a", "b"])
+
+    manager._run_pip.assert_called_once()
+    assert manager._run_pip.call_args[0][0][-4:] == ["--yes", "--no-input", "a", "b"]
+    assert result.status == "error"
+    assert {r.message for r in result.results.values()} == {"not installed"}
+
+
+async def test_handler_installs_many_extensions():
+    handler = Mock()
+    handler.current_user = "user"
+    handler.get_json_body.return_value = {
+        "cmd": "install",
+        "extensions": [
+            {"extension_name": "a", "extension_version": "1.0"},
+            {"extension_name": "b"},
+        ],
+    }
+    handler._post_many = lambda data: ExtensionHandler._post_many(handler, data)
+    handler.manager.is_install_allowed = AsyncMock(return_value=True)
+    handler.manager.install_many = AsyncMock(
+        return_value=BatchActionResult.merge(
+            {"a": ActionResult(status="ok"), "b": ActionResult(status="ok")}
+        )
+    )
+
+    await ExtensionHandler.post(handler)
+
+    handler.manager.install_many.assert_awaited_once_with({"a": "1.0", "b": None})
+    handler.set_status.assert_called_once_with(201)
+    assert json.loads(handler.finish.call_args[0][0])["results"]["b"]["status"] == "ok"
+
+    handler.manager.is_install_allowed = AsyncMock(return_value=False)
+    with pytest.raises(web.HTTPError) as exc_info:
+        await ExtensionHandler.post(handler)
+    assert exc_info.value.status_code == 422
+
+
+def make_wheel(path, name, version, extension=True, summary=""):
+    distribution = f"{name.replace('-', '_')}-{version}"
+    wheel = path / f"{distribution}-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as archive:
+        archive.writestr(
+            f"{distribution}.dist-info/METADATA",
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\nSummary: {summary}\n"
+            "Project-URL: Source Code, https://github.com/jupyterlab/fake\n",
+        )
+        if extension:
+            archive.writestr(
+                f"{distribution}.data/data/share/jupyter/labextensions/{name}/package.json",
+                json.dumps({"name": name, "jupyterlab": {"discovery": {"server": {}}}}),
+            )
+    return wheel
+
+
+async def test_WheelhouseExtensionManager(tmp_path):
+    make_wheel(tmp_path, "jupyterlab-fake", "1.0.0")
+    make_wheel(tmp_path, "jupyterlab-fake", "1.1.0", summary="Fake extension")
+    make_wheel(tmp_path, "jupyterlab-fake", "2.0.0a1")
+    make_wheel(tmp_path, "not-an-extension", "1.0.0", extension=False)
+    (tmp_path / "README.txt").write_text("wheels")
+
+    parent = Configurable(
+        config=Config({"WheelhouseExtensionManager": {"wheelhouse": str(tmp_path)}})
+    )
+    manager = WheelhouseExtensionManager(parent=parent)
+    extensions, last_page = await manager.list_packages("fake", 1, 10)
+
+    assert last_page == 1
+    assert list(extensions) == ["jupyterlab-fake"]
+    assert extensions["jupyterlab-fake"].latest_version == "1.1.0"
+    assert extensions["jupyterlab-fake"].description == "Fake extension"
+    assert extensions["jupyterlab-fake"].homepage_url == "https://github.com/jupyterlab/fake"
+    assert await manager.get_latest_version("jupyterlab_fake") == "1.1.0"
+    assert await manager.get_latest_version("not-an-extension") is None
+
+    manager._run_pip = AsyncMock(return_value=CompletedProcess([], 0, b"", b""))
+    await manager.install("jupyterlab-fake", "1.1.0")
+    cmdline = manager._run_pip.call_args[0][0]
+    assert cmdline[-4:] == ["--no-index", "--find-links", str(tmp_path), "jupyterlab-fake==1.1.0"]
+
+
+async def test_WheelhouseExtensionManager_metadata_store(tmp_path):
+    wheelhouse = tmp_path / "wheels"
+    wheelhouse.mkdir()
+    make_wheel(wheelhouse, "jupyterlab-fake", "1.0.0", summary="Fake extension")
+    pypi_limiter = get_rate_limiter("pypi.org", 5, 10)
+
+    def make_manager():
+        parent = Configurable(
+            config=Config(
+                {
+                    "WheelhouseExtensionManager": {
+                        "wheelhouse": str(wheelhouse),
+                        "metadata_store_path": str(tmp_path / "store.db"),
+                        "request_rate": 1,
+                        "request_burst": 2,
+                    }
+                }
+            )
+        )
+        return WheelhouseExtensionManager(parent=parent)
+
+    await make_manager().list_packages("fake", 1, 10)
+    # A new process with a fresh stored listing still reads the wheels metadata
+    manager = make_manager()
+    extensions, _ = await manager.list_packages("fake", 1, 10)
+
+    assert extensions["jupyterlab-fake"].description == "Fake extension"
+    # The PyPI rate limiter is not reconfigured
+    assert (pypi_limiter.rate, pypi_limiter.burst) == (5, 10)
+    assert manager._rate_limiter is not pypi_limiter
+
+
+async def test_WheelhouseIndexSource_reads_wheels_once(tmp_path):
+    make_wheel(tmp_path, "jupyterlab-fake", "1.0.0")
+    source = WheelhouseIndexSource(tmp_path.as_uri(), client=Mock())
+
+    with patch.object(
+        wheelhouse_module, "_read_wheel_file", wraps=wheelhouse_module._read_wheel_file
+    ) as read_wheel:
+        snapshot = await source.fetch(None)
+        assert snapshot.projects == {"jupyterlab-fake": "1.0.0"}
+        assert await source.fetch(snapshot) is snapshot
+        assert read_wheel.call_count == 1
+
+        make_wheel(tmp_path, "jupyterlab-fake", "1.2.0")
+        updated = await source.fetch(snapshot)
+        assert updated.projects == {"jupyterlab-fake": "1.2.0"}
+        assert read_wheel.call_count == 2
+    assert source.get_metadata("jupyterlab-fake", "1.2.0")["jupyterlab"] is not None
+    assert source.get_metadata("jupyterlab-fake", "1.0.0") == {}
+
+
+async def test_WheelhouseIndexSource_http_listing(tmp_path):
+    wheel = make_wheel(tmp_path, "jupyterlab-fake", "1.0.0")
+    listing = f'<html><body><a href="{wheel.name}#sha256=abc">{wheel.name}</a></body></html>'
+
+    async def get(url, **kwargs):
+        if url.endswith(".whl"):
+            return Mock(status_code=200, content=wheel.read_bytes())
+        return Mock(status_code=200, text=listing, headers={"ETag": '"v1"'})
+
+    client = AsyncMock()
+    client.get.side_effect = get
+    source = WheelhouseIndexSource("https://wheels.example/simple", client)
+
+    snapshot = await source.fetch(None)
+    assert snapshot.projects == {"jupyterlab-fake": "1.0.0"}
+    assert client.get.call_args_list[0].args[0] == "https://wheels.example/simple/"
+    assert client.get.call_args_list[1].args[0] == f"https://wheels.example/simple/{wheel.name}"
+
+    client.get.side_effect = None
+    client.get.return_value = Mock(status_code=304)
+    assert await source.fetch(snapshot) is snapshot
+
+
+def test_get_installer():
+    with patch.object(UvInstaller, "find", return_value=None):
+        assert isinstance(get_installer("uv"), PipInstaller)
+        assert isinstance(get_installer("auto"), PipInstaller)
+    with patch.object(UvInstaller, "find", return_value="/usr/bin/uv"):
+        assert isinstance(get_installer("pip"), PipInstaller)
+        installer = get_installer("auto")
+    assert isinstance(installer, UvInstaller)
+    assert installer.uninstall_command(["a"]) == [
+        "/usr/bin/uv",
+        "pip",
+        "uninstall",
+        "--python",
+        sys.executable,
+        "a",
+    ]
+
+    result = CompletedProcess(
+        [], 1, b"", "Resolved 3 packages\n  \u00d7 No solution found\n".encode()
+    )
+    assert installer.error_message(result) == "  \u00d7 No solution found\n"
+    assert PipInstaller().error_message(result).startswith("Resolved")
+
+
+async def test_PyPiExtensionManager_uv_installer():
+    parent = Configurable(config=Config({"PyPIExtensionManager": {"installer": "uv"}}))
+    with patch.object(UvInstaller, "find", return_value="/usr/bin/uv"):
+        manager = PyPIExtensionManager(parent=parent)
+    manager.is_install_allowed = AsyncMock(return_value=True)
+    constraints = []
+
+    async def run_pip(cmdline):
+        with open(cmdline[cmdline.index("--constraint") + 1]) as f:
+            constraints.append(f.read())
+        return CompletedProcess(cmdline, 1, b"", b"Resolved\nerror: No solution found\n")
+
+    manager._run_pip = AsyncMock(side_effect=run_pip)
+    result = await manager.install("jupyterlab-fake", "1.0.0")
+
+    cmdline = manager._run_pip.call_args[0][0]
+    assert cmdline[:3] == ["/usr/bin/uv", "pip", "install"]
+    assert cmdline[-1] == "jupyterlab-fake==1.0.0"
+    assert constraints == [f"jupyterlab=={__version__}"]
+    assert result == ActionResult(status="error", message="error: No solution found\n")
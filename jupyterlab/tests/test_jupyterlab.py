@@ -19,7 +19,7 @@ from unittest.mock import patch
 import pytest
 from jupyter_core import paths
 
-from jupyterlab import commands
+from jupyterlab import commands, labextensions_path
 from jupyterlab.commands import (
     DEV_DIR,
     AppOptions,
@@ -32,16 +32,21 @@ from jupyterlab.commands import (
     enable_extension,
     get_app_info,
     get_app_version,
+    get_extensions_status,
     install_extension,
+    install_extensions,
     link_package,
     list_extensions,
     lock_extension,
+    toggle_extensions,
     uninstall_extension,
     unlink_package,
     unlock_extension,
     update_extension,
 )
 from jupyterlab.coreconfig import CoreConfig, _get_default_core_data
+from jupyterlab.labapp import LabApp
+from jupyterlab.labextensions_path import get_labextensions_path
 
 here = os.path.dirname(os.path.abspath(__file__))
 
@@ -350,6 +355,33 @@ class TestExtension(AppHandlerTest):
         assert install_extension(self.mock_extension) is True
         list_extensions()
 
+    def test_get_extensions_status(self):
+        options = AppOptions(app_dir=self.tempdir())
+        name = self.pkg_names["extension"]
+        assert install_extension(self.mock_extension, app_options=options) is True
+        assert disable_extension(f"{name}:plugin", app_options=options) is True
+
+        with patch.object(commands._AppHandler, "build_check") as mocked_build_check:
+            status = get_extensions_status(app_options=options)
+        mocked_build_check.assert_not_called()
+        assert "build" not in status
+        # The status can be serialized
+        status = json.loads(json.dumps(status))
+
+        assert status["app_dir"] == options.app_dir
+        (extension,) = [e for e in status["extensions"] if e["name"] == name]
+        assert extension["source"] == "source"
+        assert extension["location"].endswith(".tgz")
+        assert extension["enabled"] is True
+        assert extension["disabled_plugins"] == [f"{name}:plugin"]
+        assert extension["locked"] is False
+        assert extension["compat_errors"] == []
+        assert status["disabled"] == [f"{name}:plugin"]
+
+        status = get_extensions_status(app_options=options, build_check=True)
+        assert status["build"]["needed"] is True
+        assert status["build"]["messages"]
+
     def test_app_dir(self):
         app_dir = self.tempdir()
         options = AppOptions(app_dir=app_dir)
@@ -586,6 +618,35 @@ class TestExtension(AppHandlerTest):
         assert check_extension(name, app_options=options)
         assert not check_extension("@jupyterlab/notebook-extension", app_options=options)
 
+    def test_toggle_extensions(self):
+        options = AppOptions(app_dir=self.tempdir())
+        assert install_extension(self.mock_extension, app_options=options) is True
+        name = self.pkg_names["extension"]
+        assert disable_extension(name, app_options=options) is True
+        # Run the one-time migration of disabled extensions to locked ones
+        get_app_info(app_options=options)
+
+        with patch.object(commands, "write_page_config", wraps=commands.write_page_config) as w:
+            changed = toggle_extensions(
+                {
+                    name: False,
+                    "@jupyterlab/notebook-extension": True,
+                    "@jupyterlab/console-extension": False,
+                },
+                app_options=options,
+            )
+        assert w.call_count == 1
+        assert sorted(changed) == [name, "@jupyterlab/notebook-extension"]
+        info = get_app_info(app_options=options)
+        assert info["disabled"].get(name, False) is False
+        assert info["disabled"].get("@jupyterlab/notebook-extension") is True
+        assert "@jupyterlab/console-extension" not in info["disabled"]
+
+        # Nothing changes, nothing is written
+        with patch.object(commands, "write_page_config") as w:
+            assert toggle_extensions({name: False}, app_options=options) == []
+        w.assert_not_called()
+
     def test_lock_unlock_extension(self):
         options = AppOptions(app_dir=self.tempdir())
         assert install_extension(self.mock_extension, app_options=options) is True
@@ -774,10 +835,15 @@ class TestExtension(AppHandlerTest):
         assert installed == [self.pkg_names["extension"], self.pkg_names["mimeextension"]]
 
     def test_update_all(self):
-        updated = []
+        fetched = []
+        installed = []
+
+        def _mock_metadata(registry, name, logger):
+            fetched.append(name)
+            return {"name": name, "versions": {"10000.0.0": {}}}
 
-        def _mock_update(self, name, *args, **kwargs):
-            updated.append(name[0] + name[1:].split("@")[0])
+        def _mock_install(self, specs, *args, **kwargs):
+            installed.append(specs)
             return True
 
         original_app_info = commands._AppHandler._get_app_info
@@ -790,14 +856,111 @@ class TestExtension(AppHandlerTest):
         assert install_extension(self.mock_extension) is True
         assert install_extension(self.mock_mimeextension) is True
 
-        p1 = patch.object(commands._AppHandler, "_update_extension", _mock_update)
+        p1 = patch.object(commands, "_fetch_package_metadata", _mock_metadata)
+        p2 = patch.object(commands._AppHandler, "_install_packages", _mock_install)
 
         # local packages are not updated, so mock them as non-local:
-        p2 = patch.object(commands._AppHandler, "_get_app_info", _mock_app_info)
+        p3 = patch.object(commands._AppHandler, "_get_app_info", _mock_app_info)
 
-        with p1, p2:
+        with p1, p2, p3:
             assert update_extension(None, all_=True) is True
-        assert sorted(updated) == [self.pkg_names["extension"], self.pkg_names["mimeextension"]]
+        names = [self.pkg_names["extension"], self.pkg_names["mimeextension"]]
+        assert sorted(fetched) == names
+        # The updates are installed at once
+        assert len(installed) == 1
+        assert sorted(installed[0]) == [f"{name}@10000.0.0" for name in names]
+
+    @pytest.mark.skipif(
+        platform.system() == "Windows", reason="running npm pack fails on windows CI"
+    )
+    def test_install_extensions_single_pack(self):
+        packed = self.tempdir()
+        subprocess.run(  # noqa S603
+            ["npm", "pack", self.mock_extension, self.mock_mimeextension],  # noqa S607
+            cwd=packed,
+            check=True,
+        )
+        commands_run = []
+        original_run = commands._AppHandler._run
+
+        def _mock_run(self, cmd, **kwargs):
+            if cmd[1:2] != ["pack"]:
+                return original_run(self, cmd, **kwargs)
+            commands_run.append(cmd[2:])
+            for path in glob.glob(pjoin(packed, "*.tgz")):
+                shutil.copy(path, kwargs["cwd"])
+            return 0
+
+        names = [self.pkg_names["extension"], self.pkg_names["mimeextension"]]
+        with patch.object(commands._AppHandler, "_run", _mock_run):
+            assert install_extensions(names) is True
+
+        assert commands_run == [names]
+        extensions = get_app_info()["extensions"]
+        assert all(name in extensions for name in names)
+
+    @pytest.mark.skipif(
+        platform.system() == "Windows", reason="running npm pack fails on windows CI"
+    )
+    def test_install_extensions_pack_fallback(self):
+        mimeextension = self.pkg_names["mimeextension"]
+        packed = self.tempdir()
+        subprocess.run(["npm", "pack", self.mock_mimeextension], cwd=packed, check=True)  # noqa S603 S607
+        invalid = "jupyterlab-not-a-package"
+        commands_run = []
+        registered = []
+        original_run = commands._AppHandler._run
+        original_register = commands._AppHandler._register_extension
+
+        def _mock_run(self, cmd, **kwargs):
+            if cmd[1:2] != ["pack"] or os.path.exists(cmd[2]):
+                return original_run(self, cmd, **kwargs)
+            commands_run.append(cmd[2:])
+            if cmd[2:] != [mimeextension]:
+                return 1
+            for path in glob.glob(pjoin(packed, "*.tgz")):
+                shutil.copy(path, kwargs["cwd"])
+            return 0
+
+        def _mock_register(self, info):
+            registered.append(info["name"])
+            return original_register(self, info)
+
+        p1 = patch.object(commands._AppHandler, "_run", _mock_run)
+        p2 = patch.object(commands._AppHandler, "_register_extension", _mock_register)
+        with p1, p2, pytest.raises(ValueError, match=invalid):
+            install_extensions([self.mock_extension, mimeextension, invalid])
+
+        # The invalid package does not prevent installing the other ones
+        assert commands_run == [[mimeextension, invalid], [mimeextension], [invalid]]
+        # The extensions are installed in the given order
+        assert registered == [self.pkg_names["extension"], mimeextension]
+
+
+def test_get_labextensions_path(tmp_path, monkeypatch):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "jupyter_config.json").write_text(
+        json.dumps({"LabServerApp": {"labextensions_path": ["/base"]}})
+    )
+    (config_dir / "jupyter_lab_config.py").write_text(
+        'c.LabApp.extra_labextensions_path.append("/extra")\n'
+        'c.ExtensionApp.labextensions_path = ["/lab"]\n'
+    )
+    monkeypatch.setenv("JUPYTER_CONFIG_DIR", str(config_dir))
+
+    lab = LabApp()
+    lab.load_config_file()
+    assert get_labextensions_path() == lab.labextensions_path + lab.extra_labextensions_path
+    assert get_labextensions_path() == ["/lab", "/extra"]
+    assert LabApp.section_names() == list(labextensions_path._SECTIONS)
+
+    # The config files are only parsed again once changed
+    with patch.object(labextensions_path.Application, "_load_config_files") as load:
+        get_labextensions_path()
+    load.assert_not_called()
+    (config_dir / "jupyter_lab_config.py").write_text("c.LabApp.extra_labextensions_path = []\n")
+    assert get_labextensions_path() == ["/base"]
 
 
 def test_load_extension(jp_serverapp, make_lab_app):
@@ -0,0 +1,124 @@
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import subprocess
+import sys
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import prometheus_client
+import pytest
+from tornado import gen
+
+from jupyterlab.extensions import PyPIExtensionManager
+from jupyterlab.extensions.wheelhouse import WheelhouseExtensionManager
+from jupyterlab.handlers.build_handler import Builder
+from jupyterlab.handlers.metrics_handler import MetricsHandler, metrics_handler_path
+from jupyterlab.metrics import REGISTRY, export_metrics, record_api_requests
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+async def test_MetricsHandler(jp_serverapp, jp_fetch, make_labserver_extension_app):
+    app = make_labserver_extension_app()
+    app._link_jupyter_server_extension(jp_serverapp)
+    app.handlers.append((metrics_handler_path, MetricsHandler))
+    app.initialize()
+
+    response = await jp_fetch("lab", "api", "metrics", method="GET")
+
+    assert response.code == 200
+    assert response.headers["Content-Type"] == prometheus_client.CONTENT_TYPE_LATEST
+    body = response.body.decode()
+    assert "jupyterlab_api_request_duration_seconds" in body
+    assert "jupyterlab_tarball_reads_total" in body
+    # Only JupyterLab metrics are exported
+    assert "jupyter_server_started_timestamp_seconds" not in body
+
+
+def test_JupyterLab_metrics_exported_by_the_server():
+    export_metrics()
+    # Exporting is idempotent
+    export_metrics()
+    names = {metric.name for metric in prometheus_client.REGISTRY.collect()}
+    assert "jupyterlab_build_duration_seconds" in names
+
+
+def test_JupyterLab_metrics_not_loaded_by_the_cli():
+    code = "import sys, jupyterlab.labextensions; print('jupyterlab.metrics' in sys.modules)"
+    output = subprocess.check_output([sys.executable, "-c", code], text=True)  # noqa: S603
+    assert output.strip() == "False"
+
+
+@pytest.mark.parametrize(
+    "manager_class, name",
+    ((PyPIExtensionManager, "PyPI"), (WheelhouseExtensionManager, "wheelhouse")),
+)
+async def test_ExtensionManager_records_index_requests_per_manager(manager_class, name):
+    manager = manager_class()
+    # Do not throttle the rate limiter shared with the other managers
+    manager._rate_limiter = Mock(acquire=AsyncMock())
+    labels = {"manager": name, "api": "json"}
+    before = sample("jupyterlab_pypi_request_duration_seconds_count", **labels)
+    throttled = sample("jupyterlab_pypi_throttled_total", **labels)
+
+    request = httpx.Request("GET", "https://example.com/pypi/jupyterlab-fake/json")
+    await manager._before_request(request)
+    await manager._after_response(httpx.Response(429, request=request))
+
+    assert sample("jupyterlab_pypi_request_duration_seconds_count", **labels) == before + 1
+    assert sample("jupyterlab_pypi_throttled_total", **labels) == throttled + 1
+
+
+def test_record_api_requests():
+    log_function = Mock()
+    settings = {"log_function": log_function}
+    record_api_requests(settings, "/lab/api/")
+    wrapped = settings["log_function"]
+    # Wrapping is idempotent
+    record_api_requests(settings, "/lab/api/")
+    assert settings["log_function"] is wrapped
+
+    handler = Mock()
+    handler.request.path = "/lab/api/extensions"
+    handler.request.method = "GET"
+    handler.request.request_time.return_value = 0.2
+    handler.get_status.return_value = 200
+    labels = {
+        "method": "GET",
+        "handler": f"{handler.__class__.__module__}.Mock",
+        "status_code": "200",
+    }
+    before = sample("jupyterlab_api_request_duration_seconds_count", **labels)
+
+    wrapped(handler)
+    handler.request.path = "/api/contents"
+    wrapped(handler)
+
+    assert sample("jupyterlab_api_request_duration_seconds_count", **labels) == before + 1
+    assert log_function.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "error, outcome",
+    ((None, "success"), (Exception("Aborted"), "canceled"), (ValueError("oops"), "error")),
+)
+async def test_Builder_records_build_duration(error, outcome):
+    builder = Builder(core_mode=False)
+
+    @gen.coroutine
+    def run_build(*args):
+        if error is not None:
+            raise error
+
+    builder._run_build = run_build
+    before = sample("jupyterlab_build_duration_seconds_count", outcome=outcome)
+
+    try:
+        await builder.build()
+    except ValueError:
+        pass
+
+    assert sample("jupyterlab_build_duration_seconds_count", outcome=outcome) == before + 1
@@ -90,10 +90,10 @@ async def test_pluginHandler_lock_all_rejects_direct_post(
 ):
     dispatched = []
 
-    def mock_disable_extension(plugin, app_options=None, level="sys_prefix"):
-        dispatched.append(plugin)
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        dispatched.extend(plugins)
 
-    monkeypatch.setattr(manager_module, "disable_extension", mock_disable_extension)
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
 
     labapp = plugin_handler_labapp(
         jp_serverapp=jp_serverapp,
@@ -129,11 +129,10 @@ async def test_pluginHandler_extension_lock_rejects_child_plugin_direct_post(
 ):
     dispatched = []
 
-    def mock_toggle_extension(plugin, app_options=None, level="sys_prefix"):
-        dispatched.append(plugin)
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        dispatched.extend(plugins)
 
-    monkeypatch.setattr(manager_module, "disable_extension", mock_toggle_extension)
-    monkeypatch.setattr(manager_module, "enable_extension", mock_toggle_extension)
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
 
     extension = "@jupyterlab/apputils-extension"
     plugin = f"{extension}:sanitizer"
@@ -157,3 +156,98 @@ async def test_pluginHandler_extension_lock_rejects_child_plugin_direct_post(
     assert payload["status"] == "error"
     assert plugin in payload["message"]
     assert dispatched == []
+
+
+async def test_pluginHandler_batch_toggle(
+    jp_serverapp, jp_fetch, make_labserver_extension_app, monkeypatch
+):
+    dispatched = []
+
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        dispatched.append(plugins)
+
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
+
+    labapp = plugin_handler_labapp(
+        jp_serverapp=jp_serverapp, make_labserver_extension_app=make_labserver_extension_app
+    )
+    labapp.initialize()
+
+    enable = ["@jupyterlab/apputils-extension:sanitizer"]
+    disable = ["@jupyterlab/application-extension:status", "@jupyterlab/theme-dark-extension"]
+    response = await jp_fetch(
+        "lab",
+        "api",
+        "plugins",
+        method="PATCH",
+        body=json.dumps({"enable": enable, "disable": disable}),
+    )
+    assert response.code == 200
+    payload = json.loads(response.body)
+    assert payload["status"] == "ok"
+    assert payload["needs_restart"] == ["frontend"]
+    # A single transaction is used for the whole batch
+    assert dispatched == [
+        {
+            "@jupyterlab/apputils-extension:sanitizer": False,
+            "@jupyterlab/application-extension:status": True,
+            "@jupyterlab/theme-dark-extension": True,
+        }
+    ]
+
+
+async def test_pluginHandler_batch_toggle_rejects_locked(
+    jp_serverapp, jp_fetch, make_labserver_extension_app, monkeypatch
+):
+    dispatched = []
+
+    def mock_toggle_extensions(plugins, app_options=None, level="sys_prefix"):
+        dispatched.append(plugins)
+
+    monkeypatch.setattr(manager_module, "toggle_extensions", mock_toggle_extensions)
+
+    extension = "@jupyterlab/apputils-extension"
+    lock_extension(extension)
+
+    labapp = plugin_handler_labapp(
+        jp_serverapp=jp_serverapp, make_labserver_extension_app=make_labserver_extension_app
+    )
+    labapp.initialize()
+
+    plugin = f"{extension}:sanitizer"
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch(
+            "lab",
+            "api",
+            "plugins",
+            method="PATCH",
+            body=json.dumps(
+                {"enable": ["@jupyterlab/application-extension:status"], "disable": [plugin]}
+            ),
+        )
+    assert e.value.code == 500
+    payload = json.loads(e.value.response.body)
+    assert payload["status"] == "error"
+    assert plugin in payload["message"]
+    assert dispatched == []
+
+
+@pytest.mark.parametrize(
+    "body",
+    (
+        {},
+        {"enable": "@jupyterlab/apputils-extension:sanitizer"},
+        {"disable": [""]},
+    ),
+)
+async def test_pluginHandler_batch_toggle_invalid_body(
+    jp_serverapp, jp_fetch, make_labserver_extension_app, body
+):
+    labapp = plugin_handler_labapp(
+        jp_serverapp=jp_serverapp, make_labserver_extension_app=make_labserver_extension_app
+    )
+    labapp.initialize()
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("lab", "api", "plugins", method="PATCH", body=json.dumps(body))
+    assert e.value.code == 422